@@ -4,10 +4,18 @@ Conversation state management for multi-turn dialogue.
 Handles session tracking, context management, and conversation history.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Deque
+from collections import deque
 from datetime import datetime
 from dataclasses import dataclass, field
 from enum import Enum
+from itertools import islice
+import os
+
+
+# Maximum conversation turns kept per session (one turn = user + assistant message)
+MAX_TURNS = int(os.getenv("CHAT_MAX_TURNS", "50"))
+MAX_MESSAGES = MAX_TURNS * 2
 
 
 class ConversationIntent(str, Enum):
@@ -102,20 +110,26 @@ class ConversationSession:
     started_at: datetime = field(default_factory=datetime.now)
     last_message_at: datetime = field(default_factory=datetime.now)
     message_count: int = 0
-    messages: List[ConversationMessage] = field(default_factory=list)
+    messages: Deque[ConversationMessage] = field(default_factory=lambda: deque(maxlen=MAX_MESSAGES))
     context: ConversationContext = field(default_factory=ConversationContext)
     is_active: bool = True
     metadata: Dict[str, Any] = field(default_factory=dict)
     
     def add_message(self, message: ConversationMessage) -> None:
-        """Add a message to the conversation."""
+        """Add a message to the conversation (oldest messages drop off past MAX_MESSAGES)."""
         self.messages.append(message)
         self.message_count += 1
-        self.last_message_at = datetime.now()
+        self.last_message_at = message.timestamp
+    
+    def reset_context(self) -> None:
+        """Clear messages and extracted context while keeping the session."""
+        self.messages.clear()
+        self.message_count = 0
+        self.context = ConversationContext()
     
     def get_recent_messages(self, n: int = 10) -> List[ConversationMessage]:
         """Get the n most recent messages."""
-        return self.messages[-n:]
+        return list(islice(self.messages, max(0, len(self.messages) - n), None))
     
     def get_history_text(self, n: int = 10) -> str:
         """Get conversation history as formatted text."""
@@ -125,19 +139,21 @@ class ConversationSession:
             for msg in recent
         ])
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
-        return {
+    def to_dict(self, include_messages: bool = True) -> Dict[str, Any]:
+        """Convert to dictionary for serialization (optionally without the message list)."""
+        data = {
             'session_id': self.session_id,
             'user_id': self.user_id,
             'started_at': self.started_at.isoformat(),
             'last_message_at': self.last_message_at.isoformat(),
             'message_count': self.message_count,
-            'messages': [msg.to_dict() for msg in self.messages],
             'context': self.context.to_dict(),
             'is_active': self.is_active,
             'metadata': self.metadata
         }
+        if include_messages:
+            data['messages'] = [msg.to_dict() for msg in self.messages]
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ConversationSession':
@@ -148,7 +164,10 @@ class ConversationSession:
             started_at=datetime.fromisoformat(data['started_at']),
             last_message_at=datetime.fromisoformat(data['last_message_at']),
             message_count=data['message_count'],
-            messages=[ConversationMessage.from_dict(m) for m in data.get('messages', [])],
+            messages=deque(
+                (ConversationMessage.from_dict(m) for m in data.get('messages', [])),
+                maxlen=MAX_MESSAGES
+            ),
             context=ConversationContext.from_dict(data.get('context', {})),
             is_active=data.get('is_active', True),
             metadata=data.get('metadata', {})
@@ -5,9 +5,14 @@ Handles natural language conversations, intent classification,
 and context-aware interactions with users.
 """
 
+import copy
 import time
+import hashlib
 import logging
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from cachetools import LRUCache
 
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
@@ -38,9 +43,17 @@ class ConversationalAgent(BaseAgent):
     - Integration with other agents
     """
     
+    # Short messages ("ok", "yes", "first candidate") repeat often enough that
+    # their classification is cached, keyed by the exact classifier input
+    INTENT_CACHE_SIZE = 4096
+    MAX_CACHED_MESSAGE_CHARS = 64
+    
     def __init__(self, llm: BaseChatModel):
         super().__init__(llm, name="ConversationalAgent")
         
+        self._intent_cache: LRUCache = LRUCache(maxsize=self.INTENT_CACHE_SIZE)
+        self._intent_cache_lock = threading.Lock()
+        
         # Initialize memory for conversation context
         self.memory = ConversationBufferWindowMemory(
             k=10,  # Keep last 10 messages
@@ -150,11 +163,26 @@ class ConversationalAgent(BaseAgent):
             # Get conversation history
             history = session.get_history_text(n=5)
             
-            # Classify intent
-            result = self.intent_chain.invoke({
-                "message": message,
-                "history": history
-            })
+            cache_key = self._intent_cache_key(message, history)
+            cached = None
+            if cache_key is not None:
+                with self._intent_cache_lock:
+                    cached = self._intent_cache.get(cache_key)
+            
+            if cached is not None:
+                # Copy so callers can adjust the result without touching the cache
+                result = copy.deepcopy(cached)
+                logger.debug(f"Intent cache hit for {cache_key}")
+            else:
+                # Classify intent
+                result = self.intent_chain.invoke({
+                    "message": message,
+                    "history": history
+                })
+                
+                if cache_key is not None and isinstance(result, dict):
+                    with self._intent_cache_lock:
+                        self._intent_cache[cache_key] = copy.deepcopy(result)
             
             # Parse result and validate intent
             intent_str = result.get('intent', 'clarification_needed')
@@ -193,6 +221,32 @@ class ConversationalAgent(BaseAgent):
                 ]
             )
     
+    def _intent_cache_key(
+        self,
+        message: str,
+        history: str
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Build the intent cache key for a message, or None if it should not be cached.
+        
+        The key covers everything the classifier sees, so a hit can only
+        return what the LLM would have produced for this conversation; the
+        extracted context (candidate names, filters) never leaks between
+        sessions whose histories differ.
+        
+        Args:
+            message: User's message
+            history: Conversation history text passed to the classifier
+            
+        Returns:
+            (normalized message, history digest) or None
+        """
+        normalized = " ".join(message.lower().split())
+        if not normalized or len(normalized) > self.MAX_CACHED_MESSAGE_CHARS:
+            return None
+        
+        return normalized, hashlib.sha256(history.encode("utf-8")).hexdigest()
+    
     def generate_response(
         self,
         message: str,
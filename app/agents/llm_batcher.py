@@ -0,0 +1,98 @@
+"""
+Micro-batching wrapper for chat model calls.
+
+Coalesces LLM calls that arrive within a short window into a single
+``batch()`` call, so concurrent chat requests reach the model server
+together instead of one at a time.
+"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, List, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable, RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedLLM(Runnable):
+    """
+    Runnable that groups concurrent invocations of a chat model.
+    
+    Callers block in ``invoke()`` while a background worker collects
+    requests for up to ``window_ms`` (or ``max_batch`` requests) and
+    sends them with one ``llm.batch()`` call. Because it is a Runnable,
+    it composes into prompt | llm | parser chains like the wrapped model.
+    """
+    
+    def __init__(self, llm: BaseChatModel, window_ms: int = 100, max_batch: int = 16):
+        """
+        Initialize the batcher.
+        
+        Args:
+            llm: Chat model to wrap
+            window_ms: How long to wait for more requests after the first one
+            max_batch: Maximum number of requests sent in one batch
+        """
+        self.llm = llm
+        self.window_seconds = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Tuple[Any, Optional[RunnableConfig], Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="BatchedLLM", daemon=True)
+        self._worker.start()
+        logger.info(f"BatchedLLM initialized (window: {window_ms}ms, max batch: {max_batch})")
+    
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        """
+        Queue a model call and wait for its batched result.
+        
+        Args:
+            input: Prompt value, message list, or string for the model
+            config: Optional runnable config (callbacks, tags)
+        
+        Returns:
+            The model's response for this input
+        """
+        future: Future = Future()
+        self._queue.put((input, config, future))
+        return future.result()
+    
+    def _run(self) -> None:
+        """Collect queued calls into windows and flush them."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window_seconds
+            
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            self._flush(batch)
+    
+    def _flush(self, batch: List[Tuple[Any, Optional[RunnableConfig], Future]]) -> None:
+        """Send one batch to the model and resolve each caller's future."""
+        inputs = [item[0] for item in batch]
+        configs = [item[1] for item in batch]
+        
+        try:
+            results = self.llm.batch(inputs, configs, return_exceptions=True)
+        except Exception as e:
+            logger.error(f"Batched LLM call failed: {e}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        
+        for (_, _, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -2,22 +2,42 @@
 Session manager for conversation sessions.
 
 Handles session storage, retrieval, and lifecycle management using Redis.
+Session I/O goes through an asyncio Redis client so chat handlers never
+block the event loop on a network round-trip.
+
+In Redis, each session is stored as two keys: ``session:{id}`` holds the
+session metadata and context, and ``session:{id}:messages`` is a list of
+serialized messages so new messages can be appended without rewriting the
+whole conversation.
+
+Recently used sessions are kept in an in-process cache for a short TTL and
+handed out as shared objects; callers that mutate a session hold
+session_lock() around get -> mutate -> persist, and mutate a copy so a
+failed turn never leaves unsaved changes in the cache. The cache is only safe
+with a single worker process: another uvicorn worker keeps serving its
+own cached copy and can overwrite newer state in Redis with it for up to
+cache_ttl_seconds. Run multiple workers with cache_ttl_seconds=0.
 """
 
-import json
 import uuid
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+import weakref
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 
+import orjson
+from cachetools import TTLCache
+
 try:
     import redis
+    import redis.asyncio as aioredis
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
     logging.warning("Redis not available - using in-memory session storage")
 
-from app.agents.conversation_state import ConversationSession, ConversationMessage
+from app.agents.conversation_state import ConversationSession, ConversationMessage, MAX_MESSAGES
 
 logger = logging.getLogger(__name__)
 
@@ -28,21 +48,43 @@ class SessionManager:
     Falls back to in-memory storage if Redis is unavailable.
     """
     
-    def __init__(self, redis_url: str = "redis://localhost:6379/0", ttl_hours: int = 24):
+    MAX_CONNECTIONS = 50
+    
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        ttl_hours: int = 24,
+        cache_ttl_seconds: int = 60
+    ):
         """
         Initialize session manager.
         
         Args:
             redis_url: Redis connection URL
             ttl_hours: Session TTL in hours (default: 24)
+            cache_ttl_seconds: How long recently used sessions are served from
+                the in-process cache before re-reading Redis (default: 60);
+                use 0 when running more than one worker process
         """
         self.ttl_seconds = ttl_hours * 3600
         self._in_memory_store: Dict[str, ConversationSession] = {}
+        # Only safe with a single worker process (see the module docstring)
+        self._session_cache: TTLCache = TTLCache(maxsize=10_000, ttl=cache_ttl_seconds)
+        # Held by a request while it mutates a session; freed once unused
+        self._session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
         
         if REDIS_AVAILABLE:
             try:
-                self.redis_client = redis.from_url(redis_url, decode_responses=True)
-                self.redis_client.ping()
+                # Check connectivity once, synchronously, before any event loop runs
+                probe = redis.from_url(redis_url, decode_responses=True)
+                probe.ping()
+                probe.close()
+                
+                self.redis_client = aioredis.from_url(
+                    redis_url,
+                    decode_responses=True,
+                    max_connections=self.MAX_CONNECTIONS
+                )
                 self.use_redis = True
                 logger.info(f"✓ SessionManager initialized with Redis (TTL: {ttl_hours}h)")
             except Exception as e:
@@ -54,7 +96,50 @@ class SessionManager:
             self.redis_client = None
             logger.info("SessionManager using in-memory storage")
     
-    def create_session(self, user_id: Optional[str] = None) -> ConversationSession:
+    @staticmethod
+    def _session_key(session_id: str) -> str:
+        """Redis key for session metadata and context."""
+        return f"session:{session_id}"
+    
+    @staticmethod
+    def _messages_key(session_id: str) -> str:
+        """Redis key for the session's message list."""
+        return f"session:{session_id}:messages"
+    
+    def session_lock(self, session_id: str) -> asyncio.Lock:
+        """
+        Get the lock serializing updates to a session.
+        
+        Sessions are shared objects, so a request must hold this lock from
+        get_session() through its mutations to save/append, or concurrent
+        requests can interleave changes and persist them out of order.
+        Only serializes requests within this process.
+        
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            asyncio.Lock for the session
+        """
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._session_locks[session_id] = lock
+        return lock
+    
+    def invalidate(self, session_id: str) -> None:
+        """
+        Drop a session from the in-process cache so the next get re-reads Redis.
+        
+        Used when a persist may have failed and the cached object can no
+        longer be trusted to match Redis.
+        
+        Args:
+            session_id: Session identifier
+        """
+        self._session_cache.pop(session_id, None)
+    
+    async def create_session(self, user_id: Optional[str] = None) -> ConversationSession:
         """
         Create a new conversation session.
         
@@ -70,12 +155,12 @@ class SessionManager:
             user_id=user_id
         )
         
-        self.save_session(session)
+        await self.save_session(session)
         logger.info(f"Created new session: {session_id}")
         
         return session
     
-    def get_session(self, session_id: str) -> Optional[ConversationSession]:
+    async def get_session(self, session_id: str) -> Optional[ConversationSession]:
         """
         Retrieve a session by ID.
         
@@ -87,10 +172,28 @@ class SessionManager:
         """
         try:
             if self.use_redis:
-                data = self.redis_client.get(f"session:{session_id}")
+                session = self._session_cache.get(session_id)
+                if session is not None:
+                    return session
+                
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.get(self._session_key(session_id))
+                    pipe.lrange(self._messages_key(session_id), 0, -1)
+                    data, raw_messages = await pipe.execute()
+                
                 if data:
-                    session_dict = json.loads(data)
-                    return ConversationSession.from_dict(session_dict)
+                    session_dict = orjson.loads(data)
+                    legacy = 'messages' in session_dict
+                    if not legacy:
+                        session_dict['messages'] = [orjson.loads(m) for m in raw_messages]
+                    session = ConversationSession.from_dict(session_dict)
+                    
+                    if legacy:
+                        # Older sessions stored messages inline; move them to the list
+                        await self.save_session(session)
+                    
+                    self._session_cache[session_id] = session
+                    return session
             else:
                 return self._in_memory_store.get(session_id)
             
@@ -100,7 +203,7 @@ class SessionManager:
             logger.error(f"Failed to retrieve session {session_id}: {e}")
             return None
     
-    def save_session(self, session: ConversationSession) -> bool:
+    async def save_session(self, session: ConversationSession) -> bool:
         """
         Save a session.
         
@@ -112,12 +215,19 @@ class SessionManager:
         """
         try:
             if self.use_redis:
-                session_data = json.dumps(session.to_dict())
-                self.redis_client.setex(
-                    f"session:{session.session_id}",
-                    self.ttl_seconds,
-                    session_data
-                )
+                messages_key = self._messages_key(session.session_id)
+                async with self.redis_client.pipeline() as pipe:
+                    pipe.setex(
+                        self._session_key(session.session_id),
+                        self.ttl_seconds,
+                        orjson.dumps(session.to_dict(include_messages=False))
+                    )
+                    pipe.delete(messages_key)
+                    if session.messages:
+                        pipe.rpush(messages_key, *(orjson.dumps(msg.to_dict()) for msg in session.messages))
+                        pipe.expire(messages_key, self.ttl_seconds)
+                    await pipe.execute()
+                self._session_cache[session.session_id] = session
             else:
                 self._in_memory_store[session.session_id] = session
             
@@ -127,7 +237,50 @@ class SessionManager:
             logger.error(f"Failed to save session {session.session_id}: {e}")
             return False
     
-    def delete_session(self, session_id: str) -> bool:
+    async def append_messages(
+        self,
+        session: ConversationSession,
+        messages: List[ConversationMessage]
+    ) -> bool:
+        """
+        Persist messages already added to a session without rewriting its history.
+        
+        Only the new messages are pushed to the message list; the session
+        metadata and context are rewritten since they are small. Use
+        save_session() for full rewrites such as a reset.
+        
+        Args:
+            session: ConversationSession the messages were added to
+            messages: Newly added messages, oldest first
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            if self.use_redis:
+                messages_key = self._messages_key(session.session_id)
+                async with self.redis_client.pipeline() as pipe:
+                    pipe.setex(
+                        self._session_key(session.session_id),
+                        self.ttl_seconds,
+                        orjson.dumps(session.to_dict(include_messages=False))
+                    )
+                    if messages:
+                        pipe.rpush(messages_key, *(orjson.dumps(msg.to_dict()) for msg in messages))
+                        pipe.ltrim(messages_key, -MAX_MESSAGES, -1)
+                    pipe.expire(messages_key, self.ttl_seconds)
+                    await pipe.execute()
+                self._session_cache[session.session_id] = session
+            else:
+                self._in_memory_store[session.session_id] = session
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to append messages to session {session.session_id}: {e}")
+            return False
+    
+    async def delete_session(self, session_id: str) -> bool:
         """
         Delete a session.
         
@@ -138,8 +291,13 @@ class SessionManager:
             True if successful, False otherwise
         """
         try:
+            self._session_cache.pop(session_id, None)
+            
             if self.use_redis:
-                self.redis_client.delete(f"session:{session_id}")
+                await self.redis_client.delete(
+                    self._session_key(session_id),
+                    self._messages_key(session_id)
+                )
             else:
                 self._in_memory_store.pop(session_id, None)
             
@@ -150,7 +308,7 @@ class SessionManager:
             logger.error(f"Failed to delete session {session_id}: {e}")
             return False
     
-    def extend_session(self, session_id: str) -> bool:
+    async def extend_session(self, session_id: str) -> bool:
         """
         Extend session TTL.
         
@@ -162,7 +320,10 @@ class SessionManager:
         """
         try:
             if self.use_redis:
-                self.redis_client.expire(f"session:{session_id}", self.ttl_seconds)
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.expire(self._session_key(session_id), self.ttl_seconds)
+                    pipe.expire(self._messages_key(session_id), self.ttl_seconds)
+                    await pipe.execute()
                 return True
             else:
                 # In-memory sessions don't expire
@@ -172,7 +333,7 @@ class SessionManager:
             logger.error(f"Failed to extend session {session_id}: {e}")
             return False
     
-    def list_active_sessions(self, user_id: Optional[str] = None) -> list[str]:
+    async def list_active_sessions(self, user_id: Optional[str] = None) -> list[str]:
         """
         List active session IDs, optionally filtered by user.
         
@@ -185,14 +346,17 @@ class SessionManager:
         try:
             if self.use_redis:
                 pattern = "session:*"
-                session_keys = self.redis_client.keys(pattern)
-                session_ids = [key.replace("session:", "") for key in session_keys]
+                session_keys = await self.redis_client.keys(pattern)
+                session_ids = [
+                    key.replace("session:", "") for key in session_keys
+                    if not key.endswith(":messages")
+                ]
                 
                 if user_id:
                     # Filter by user_id (requires loading each session)
                     filtered_ids = []
                     for sid in session_ids:
-                        session = self.get_session(sid)
+                        session = await self.get_session(sid)
                         if session and session.user_id == user_id:
                             filtered_ids.append(sid)
                     return filtered_ids
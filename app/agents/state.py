@@ -104,6 +104,32 @@ class AgentState(BaseModel):
     
     class Config:
         arbitrary_types_allowed = True
+    
+    def reset(self, job_description: str, resume_text: Optional[str] = None) -> "AgentState":
+        """
+        Clear all per-run results in place so the instance can be reused.
+        
+        Args:
+            job_description: Job description for the next run
+            resume_text: Optional resume text for the next run
+            
+        Returns:
+            This state, ready for a new workflow run
+        """
+        self.job_id = None
+        self.job_description = job_description
+        self.candidate_id = None
+        self.resume_text = resume_text
+        self.retrieved_candidates.clear()
+        self.analysis = None
+        self.interview_questions.clear()
+        self.agent_traces.clear()
+        self.current_agent = None
+        self.next_action = None
+        self.error = None
+        self.started_at = datetime.now()
+        self.completed_at = None
+        return self
 
 
 class MultiAgentResponse(BaseModel):
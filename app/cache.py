@@ -0,0 +1,110 @@
+"""
+Key-value cache for LLM responses.
+
+Backed by Redis when available so cached responses are shared across
+workers and survive restarts; falls back to an in-process TTL cache.
+Cache failures are logged and treated as misses, never raised.
+"""
+
+import logging
+from typing import Optional
+
+from cachetools import TTLCache
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Async string cache with a per-entry TTL.
+    """
+    
+    DEFAULT_TTL_SECONDS = 7 * 86400
+    
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        namespace: str = "llm_cache",
+        local_maxsize: int = 1024
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            redis_url: Redis connection URL
+            namespace: Prefix for Redis keys
+            local_maxsize: Maximum entries in the in-process fallback cache
+        """
+        self.namespace = namespace
+        self._local_cache: TTLCache = TTLCache(maxsize=local_maxsize, ttl=self.DEFAULT_TTL_SECONDS)
+        self.redis_client = None
+        
+        if REDIS_AVAILABLE:
+            try:
+                # Check connectivity once, synchronously, before any event loop runs
+                probe = redis.from_url(redis_url, decode_responses=True)
+                probe.ping()
+                probe.close()
+                
+                self.redis_client = aioredis.from_url(redis_url, decode_responses=True)
+                logger.info(f"✓ ResponseCache '{namespace}' using Redis")
+            except Exception as e:
+                logger.warning(f"Redis connection failed: {e}. ResponseCache using in-memory storage.")
+                self.redis_client = None
+        
+        if self.redis_client is None:
+            logger.info(f"ResponseCache '{namespace}' using in-memory storage")
+    
+    def _key(self, key: str) -> str:
+        """Namespaced Redis key."""
+        return f"{self.namespace}:{key}"
+    
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached value.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value, or None on a miss or error
+        """
+        if self.redis_client is None:
+            return self._local_cache.get(key)
+        
+        try:
+            return await self.redis_client.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"Cache lookup failed for {key}: {e}")
+            return None
+    
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        """
+        Store a value.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time to live in seconds (default: DEFAULT_TTL_SECONDS);
+                the in-memory fallback always uses the default
+        """
+        if self.redis_client is None:
+            self._local_cache[key] = value
+            return
+        
+        try:
+            await self.redis_client.set(self._key(key), value, ex=ttl or self.DEFAULT_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Cache store failed for {key}: {e}")
+    
+    async def aclose(self) -> None:
+        """Close the Redis connection pool."""
+        if self.redis_client is not None:
+            await self.redis_client.aclose()
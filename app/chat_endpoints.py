@@ -3,41 +3,160 @@ Chat endpoints for conversational AI agent.
 """
 
 from fastapi import APIRouter, HTTPException
-from datetime import datetime
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from asgiref.sync import sync_to_async
+from typing import AsyncIterator, Callable, Optional
+import copy
 import logging
+import queue
+import re
+import string
+
+import orjson
 
 from app.models import (
     ChatStartRequest,
     ChatStartResponse,
     ChatMessageRequest,
     ChatMessageResponse,
-    ChatHistoryResponse
+    ChatHistoryResponse,
+    SESSION_ID_PATTERN
 )
 from app.agents.session_manager import SessionManager
 from app.agents.conversational_agent import ConversationalAgent
-from app.agents.conversation_state import ConversationMessage
+from app.agents.conversation_state import ConversationSession, ConversationMessage, ConversationIntent
+from app.agents.state import AgentState
 
 logger = logging.getLogger(__name__)
 
+_SESSION_ID_RE = re.compile(SESSION_ID_PATTERN)
+
+# Words and phrases that refer to a candidate from previous search results
+_CANDIDATE_REF_TOKENS = frozenset({
+    'first', 'second', 'third', 'fourth', 'fifth',
+    '1st', '2nd', '3rd', '4th', '5th'
+})
+_CANDIDATE_REF_PHRASES = ('candidate 1', 'candidate 2', 'candidate 3')
+
+# Resolves "first"/"2nd"/"candidate 3" to a search result index in one pass;
+# groups 1-5 are the ordinals, group 6 is an explicit candidate number
+_ORDINAL_RE = re.compile(
+    r'\b(?:(first|1st)|(second|2nd)|(third|3rd)|(fourth|4th)|(fifth|5th)|candidate\s+(\d+))\b'
+)
+
+# Words that refer to every candidate in the search results
+_ALL_CANDIDATES_TOKENS = frozenset({'these', 'them', 'all'})
+
+# Maps punctuation to spaces so "first," and "(2nd)" tokenize cleanly
+_PUNCTUATION_TO_SPACE = str.maketrans(string.punctuation, ' ' * len(string.punctuation))
+
+# Phrases that ask for interview questions
+_INTERVIEW_PHRASES = (
+    'interview question', 'questions for', 'what to ask', 'what should i ask',
+    'interview them', 'questions to ask', 'ask these candidates',
+    'generate questions', 'get questions'
+)
+
+# Subset used to detect interview requests inside candidate analysis
+_ANALYSIS_INTERVIEW_PHRASES = (
+    'interview question', 'questions for', 'what to ask', 'what should i ask'
+)
+
+# Pre-built error details; clients switch on "code"
+_INVALID_SESSION_ID = {"code": "invalid_session_id", "message": "Invalid session ID format"}
+_SESSION_NOT_FOUND = {"code": "session_not_found", "message": "Session not found or expired"}
+
+# Intents the keyword fallback may override to candidate_analysis
+_OVERRIDABLE_INTENTS = frozenset({
+    ConversationIntent.CLARIFICATION_NEEDED,
+    ConversationIntent.JOB_SEARCH
+})
+
+async def _iter_history_json(session: ConversationSession) -> AsyncIterator[bytes]:
+    """
+    Serialize a session as ChatHistoryResponse JSON, one message at a time.
+    
+    Args:
+        session: Session whose history to stream
+        
+    Yields:
+        Chunks of the JSON document
+    """
+    # Snapshot the deque so a concurrent message can't break iteration
+    messages = list(session.messages)
+    
+    yield b'{"session_id":' + orjson.dumps(session.session_id) + b',"messages":['
+    for index, msg in enumerate(messages):
+        yield (b',' if index else b'') + orjson.dumps(msg.to_dict())
+    
+    # Remaining fields, spliced in after the messages array
+    yield b'],' + orjson.dumps({
+        'message_count': session.message_count,
+        'started_at': session.started_at,
+        'last_message_at': session.last_message_at,
+        'context': session.context.to_dict()  # Include full context
+    })[1:]
+
+
 # Create router
-router = APIRouter(prefix="/chat", tags=["chat"])
+router = APIRouter(prefix="/chat", tags=["chat"], default_response_class=ORJSONResponse)
 
 
 def create_chat_router(
     session_manager: SessionManager,
-    conversational_agent: ConversationalAgent
+    get_conversational_agent: Callable[[], ConversationalAgent]
 ) -> APIRouter:
     """
     Create chat router with dependencies injected.
     
     Args:
         session_manager: Session manager instance
-        conversational_agent: Conversational agent instance
+        get_conversational_agent: Returns the conversational agent; called
+            per request, so the agent can be built at app startup rather
+            than when the router is created
         
     Returns:
         Configured APIRouter
     """
     
+    # Reusable AgentState instances for the retriever/analyzer calls
+    state_pool: queue.LifoQueue = queue.LifoQueue(maxsize=64)
+    
+    def acquire_state(job_description: str, resume_text: Optional[str] = None) -> AgentState:
+        """Take a pooled AgentState (or build one) reset for a new run."""
+        try:
+            state = state_pool.get_nowait()
+        except queue.Empty:
+            return AgentState(job_description=job_description, resume_text=resume_text)
+        return state.reset(job_description=job_description, resume_text=resume_text)
+    
+    def release_state(state: AgentState) -> None:
+        """Return an AgentState to the pool once its results have been copied out."""
+        try:
+            state_pool.put_nowait(state)
+        except queue.Full:
+            pass
+    
+    def validate_session_id(session_id: str) -> None:
+        """Reject malformed session IDs before touching session storage."""
+        if not _SESSION_ID_RE.match(session_id):
+            raise HTTPException(
+                status_code=400,
+                detail=_INVALID_SESSION_ID
+            )
+    
+    async def get_session_or_404(session_id: str) -> ConversationSession:
+        """Fetch a session or raise a 404 if it is missing or expired."""
+        validate_session_id(session_id)
+        session = await session_manager.get_session(session_id)
+        if not session:
+            raise HTTPException(
+                status_code=404,
+                detail=_SESSION_NOT_FOUND
+            )
+        return session
+    
     @router.post("/start", response_model=ChatStartResponse)
     async def start_conversation(request: ChatStartRequest) -> ChatStartResponse:
         """
@@ -46,7 +165,7 @@ def create_chat_router(
         Returns a session ID that should be used for subsequent messages.
         """
         try:
-            session = session_manager.create_session(user_id=request.user_id)
+            session = await session_manager.create_session(user_id=request.user_id)
             
             return ChatStartResponse(
                 session_id=session.session_id,
@@ -54,28 +173,26 @@ def create_chat_router(
             )
             
         except Exception as e:
-            logger.error(f"Failed to start conversation: {e}")
+            logger.error("Failed to start conversation: %s", e, exc_info=True)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to start conversation: {str(e)}"
             )
     
     
-    @router.post("/message", response_model=ChatMessageResponse)
-    async def send_message(request: ChatMessageRequest) -> ChatMessageResponse:
+    async def process_message(request: ChatMessageRequest) -> ChatMessageResponse:
         """
-        Send a message in an existing conversation.
+        Run one conversation turn: classify, call agents, respond, persist.
         
-        The agent will classify intent, extract context, and generate a response.
+        The caller must hold the session's lock. The cached session is
+        shared between requests, so the turn works on a copy that replaces
+        it only once persisted; a failure leaves the cache as it was.
         """
         try:
+            conversational_agent = get_conversational_agent()
+            
             # Get session
-            session = session_manager.get_session(request.session_id)
-            if not session:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Session {request.session_id} not found or expired"
-                )
+            session = copy.deepcopy(await get_session_or_404(request.session_id))
             
             # Add user message to session
             user_message = ConversationMessage(
@@ -84,14 +201,13 @@ def create_chat_router(
             )
             session.add_message(user_message)
             
-            # Import agents for integration (moved to top to avoid reference errors)
-            from app.agents.conversation_state import ConversationIntent
+            # Agent imports stay lazy: the database tools run django.setup() on import
             from app.agents.retriever_agent import RetrieverAgent
             from app.agents.analyzer_agent import AnalyzerAgent
-            from app.agents.state import AgentState
             
             # Classify intent
-            intent_result = conversational_agent.classify_intent(
+            intent_result = await run_in_threadpool(
+                conversational_agent.classify_intent,
                 message=request.message,
                 session=session
             )
@@ -99,18 +215,14 @@ def create_chat_router(
             # FALLBACK 1: Override intent if we detect candidate reference with search results
             # This handles cases where LLM misclassifies "first candidate" as clarification_needed
             message_lower = request.message.lower()
-            has_candidate_reference = any(word in message_lower for word in [
-                'first', 'second', 'third', 'fourth', 'fifth',
-                '1st', '2nd', '3rd', '4th', '5th',
-                'candidate 1', 'candidate 2', 'candidate 3'
-            ])
+            message_tokens = frozenset(message_lower.translate(_PUNCTUATION_TO_SPACE).split())
+            has_candidate_reference = (
+                not message_tokens.isdisjoint(_CANDIDATE_REF_TOKENS) or
+                any(phrase in message_lower for phrase in _CANDIDATE_REF_PHRASES)
+            )
             
             # FALLBACK 2: Override if asking for interview questions
-            has_interview_request = any(phrase in message_lower for phrase in [
-                'interview question', 'questions for', 'what to ask', 'what should i ask',
-                'interview them', 'questions to ask', 'ask these candidates',
-                'generate questions', 'get questions'
-            ])
+            has_interview_request = any(phrase in message_lower for phrase in _INTERVIEW_PHRASES)
             
             # Override to candidate_analysis if:
             # 1. We have search results AND
@@ -118,9 +230,9 @@ def create_chat_router(
             # 3. Intent is either clarification_needed OR job_search (misclassified)
             if (session.context.search_results and 
                 (has_candidate_reference or has_interview_request) and 
-                intent_result.intent in [ConversationIntent.CLARIFICATION_NEEDED, ConversationIntent.JOB_SEARCH]):
+                intent_result.intent in _OVERRIDABLE_INTENTS):
                 
-                logger.info(f"Overriding intent from {intent_result.intent.value} to candidate_analysis")
+                logger.info("Overriding intent from %s to candidate_analysis", intent_result.intent.value)
                 intent_result.intent = ConversationIntent.CANDIDATE_ANALYSIS
                 intent_result.confidence = 0.9
                 
@@ -128,7 +240,8 @@ def create_chat_router(
                 if has_interview_request and not has_candidate_reference:
                     intent_result.context['candidate_references'] = ['first', 'all']
             
-            logger.info(f"Intent: {intent_result.intent.value} (confidence: {intent_result.confidence})")
+            intent_value = intent_result.intent.value
+            logger.info("Intent: %s (confidence: %s)", intent_value, intent_result.confidence)
             
             # Update context
             session.context.update(intent_result.context)
@@ -148,83 +261,83 @@ def create_chat_router(
                     experience = job_requirements.get('experience', '')
                     
                     # Create job description from extracted context
-                    job_desc_parts = []
-                    if experience:
-                        job_desc_parts.append(f"{experience} level")
-                    if skills:
-                        job_desc_parts.append(f"with skills in {', '.join(skills)}")
-                    
-                    job_description = " ".join(job_desc_parts) if job_desc_parts else request.message
+                    skills_text = ', '.join(skills) if skills else ''
+                    if experience and skills_text:
+                        job_description = f"{experience} level with skills in {skills_text}"
+                    elif experience:
+                        job_description = f"{experience} level"
+                    elif skills_text:
+                        job_description = f"with skills in {skills_text}"
+                    else:
+                        job_description = request.message
                     
                     # Create agent state
-                    state = AgentState(job_description=job_description)
+                    state = acquire_state(job_description)
                     
-                    # Call RetrieverAgent to get real candidates
-                    # Wrap in sync_to_async since Django ORM doesn't work in async context
-                    from asgiref.sync import sync_to_async
-                    
-                    def run_retriever():
-                        retriever = RetrieverAgent(conversational_agent.llm)
-                        return retriever.execute(state)
-                    
-                    state = await sync_to_async(run_retriever)()
-                    
-                    # Debug logging and print
-                    print(f"[DEBUG] RetrieverAgent returned {len(state.retrieved_candidates)} candidates")
-                    logger.info(f"RetrieverAgent returned {len(state.retrieved_candidates)} candidates")
-                    
-                    # Store results in session context
-                    if state.retrieved_candidates:
-                        print(f"[DEBUG] Processing {len(state.retrieved_candidates)} candidates")
-                        session.context.search_results = [
-                            {
-                                'candidate_id': c.candidate_id,
-                                'name': c.name,
-                                'email': c.email,
-                                'similarity_score': c.similarity_score,
-                                'resume_text': c.resume_text[:500]  # Store snippet
-                            }
-                            for c in state.retrieved_candidates[:5]  # Top 5
-                        ]
+                    try:
+                        # Call RetrieverAgent to get real candidates
+                        # Wrap in sync_to_async since Django ORM doesn't work in async context
+                        def run_retriever():
+                            retriever = RetrieverAgent(conversational_agent.llm)
+                            return retriever.execute(state)
                         
-                        print(f"[DEBUG] Stored {len(session.context.search_results)} candidates in session context")
-                        logger.info(f"Stored {len(session.context.search_results)} candidates in session context")
+                        state = await sync_to_async(run_retriever)()
                         
-                        agent_results = {
-                            'candidates': session.context.search_results,
-                            'count': len(state.retrieved_candidates)
-                        }
-                    else:
-                        print("[DEBUG] No candidates retrieved from RetrieverAgent")
-                        logger.warning("No candidates retrieved from RetrieverAgent")
-                        agent_results = {
-                            'candidates': [],
-                            'count': 0,
-                            'message': 'No candidates found matching your criteria.'
-                        }
+                        logger.info("RetrieverAgent returned %d candidates", len(state.retrieved_candidates))
+                        
+                        # Store results in session context
+                        if state.retrieved_candidates:
+                            session.context.search_results = [
+                                {
+                                    'candidate_id': c.candidate_id,
+                                    'name': c.name,
+                                    'email': c.email,
+                                    'similarity_score': c.similarity_score
+                                    # Resume text is loaded on demand by candidate_id
+                                }
+                                for c in state.retrieved_candidates[:5]  # Top 5
+                            ]
+                            
+                            logger.info("Stored %d candidates in session context", len(session.context.search_results))
+                            
+                            agent_results = {
+                                'candidates': session.context.search_results,
+                                'count': len(state.retrieved_candidates)
+                            }
+                        else:
+                            logger.warning("No candidates retrieved from RetrieverAgent")
+                            agent_results = {
+                                'candidates': [],
+                                'count': 0,
+                                'message': 'No candidates found matching your criteria.'
+                            }
+                    finally:
+                        release_state(state)
                 
                 elif intent_result.intent == ConversationIntent.CANDIDATE_ANALYSIS:
                     # Check if we have candidates in context
                     if session.context.search_results and len(session.context.search_results) > 0:
                         # Check if this is an interview question request
-                        message_lower = request.message.lower()
-                        is_interview_request = any(phrase in message_lower for phrase in [
-                            'interview question', 'questions for', 'what to ask', 'what should i ask'
-                        ])
+                        is_interview_request = any(
+                            phrase in message_lower for phrase in _ANALYSIS_INTERVIEW_PHRASES
+                        )
                         
                         # Try to identify which candidate they're asking about
-                        candidate_ref = request.message.lower()
                         candidate_data = None
+                        candidate_index = None
                         
-                        if 'first' in candidate_ref or '1' in candidate_ref:
-                            candidate_data = session.context.search_results[0]
-                        elif 'second' in candidate_ref or '2' in candidate_ref:
-                            candidate_data = session.context.search_results[1] if len(session.context.search_results) > 1 else None
-                        elif 'third' in candidate_ref or '3' in candidate_ref:
-                            candidate_data = session.context.search_results[2] if len(session.context.search_results) > 2 else None
-                        elif is_interview_request and ('these' in candidate_ref or 'them' in candidate_ref or 'all' in candidate_ref):
+                        ordinal_match = _ORDINAL_RE.search(message_lower)
+                        if ordinal_match:
+                            if ordinal_match.group(6):
+                                candidate_index = int(ordinal_match.group(6)) - 1
+                            else:
+                                candidate_index = ordinal_match.lastindex - 1
+                        elif is_interview_request and not message_tokens.isdisjoint(_ALL_CANDIDATES_TOKENS):
                             # Default to first candidate for "these candidates" or "all"
-                            candidate_data = session.context.search_results[0]
+                            candidate_index = 0
+                        
+                        if candidate_index is not None and 0 <= candidate_index < len(session.context.search_results):
+                            candidate_data = session.context.search_results[candidate_index]
                         
                         if candidate_data:
                             # Get job description from context
@@ -233,36 +346,52 @@ def create_chat_router(
                             experience = job_requirements.get('experience', '')
                             
                             # Build job description
-                            job_desc_parts = []
-                            if experience:
-                                job_desc_parts.append(f"{experience} level")
-                            if skills:
-                                job_desc_parts.append(f"with skills in {', '.join(skills)}")
-                            job_desc = " ".join(job_desc_parts) if job_desc_parts else "the role"
+                            skills_text = ', '.join(skills) if skills else ''
+                            if experience and skills_text:
+                                job_desc = f"{experience} level with skills in {skills_text}"
+                            elif experience:
+                                job_desc = f"{experience} level"
+                            elif skills_text:
+                                job_desc = f"with skills in {skills_text}"
+                            else:
+                                job_desc = "the role"
+                            
+                            # Load resume text by ID (older sessions stored a snippet inline)
+                            resume_text = candidate_data.get('resume_text')
+                            if resume_text is None:
+                                from app.agents.tools.database_tools import get_candidate_by_id
+                                
+                                candidate_record = await sync_to_async(get_candidate_by_id)(
+                                    candidate_data['candidate_id']
+                                )
+                                resume_text = candidate_record['resume_text'] if candidate_record else ''
                             
                             # Create agent state for analysis
-                            state = AgentState(
+                            state = acquire_state(
                                 job_description=str(job_desc),
-                                resume_text=candidate_data.get('resume_text', '')
+                                resume_text=resume_text
                             )
                             
-                            # Call AnalyzerAgent
-                            analyzer = AnalyzerAgent(conversational_agent.llm)
-                            state = analyzer.execute(state)
-                            
-                            if state.analysis:
-                                agent_results = {
-                                    'candidate': candidate_data,
-                                    'analysis': {
-                                        'match_score': state.analysis.match_score,
-                                        'technical_score': state.analysis.technical_score,
-                                        'experience_score': state.analysis.experience_score,
-                                        'summary': state.analysis.summary,
-                                        'strengths': state.analysis.strengths,
-                                        'missing_skills': state.analysis.missing_skills,
-                                        'interview_questions': state.analysis.interview_questions if hasattr(state.analysis, 'interview_questions') else []
+                            try:
+                                # Call AnalyzerAgent (LLM only, no ORM) off the event loop
+                                analyzer = AnalyzerAgent(conversational_agent.llm)
+                                state = await run_in_threadpool(analyzer.execute, state)
+                                
+                                if state.analysis:
+                                    agent_results = {
+                                        'candidate': candidate_data,
+                                        'analysis': {
+                                            'match_score': state.analysis.match_score,
+                                            'technical_score': state.analysis.technical_score,
+                                            'experience_score': state.analysis.experience_score,
+                                            'summary': state.analysis.summary,
+                                            'strengths': state.analysis.strengths,
+                                            'missing_skills': state.analysis.missing_skills,
+                                            'interview_questions': state.analysis.interview_questions if hasattr(state.analysis, 'interview_questions') else []
+                                        }
                                     }
-                                }
+                            finally:
+                                release_state(state)
                         else:
                             agent_results = {
                                 'error': f'Could not identify which candidate you are referring to. I found {len(session.context.search_results)} candidates from your previous search. Please specify "first candidate", "second candidate", etc.'
@@ -273,7 +402,8 @@ def create_chat_router(
                         }
                 
                 # Generate conversational response with real data
-                response_text = conversational_agent.generate_response(
+                response_text = await run_in_threadpool(
+                    conversational_agent.generate_response,
                     message=request.message,
                     intent_result=intent_result,
                     session=session,
@@ -288,56 +418,67 @@ def create_chat_router(
             )
             session.add_message(assistant_message)
             
-            # Save session
-            session_manager.save_session(session)
+            # Persist only this turn's messages plus the updated context
+            if not await session_manager.append_messages(session, [user_message, assistant_message]):
+                # Redis may or may not have the turn; re-read it next time
+                session_manager.invalidate(session.session_id)
+                logger.warning("Turn not persisted for session %s", session.session_id)
             
             return ChatMessageResponse(
                 session_id=session.session_id,
                 message=response_text,
-                intent=intent_result.intent.value,
+                intent=intent_value,
                 confidence=intent_result.confidence,
                 needs_clarification=intent_result.needs_clarification,
                 clarifying_questions=intent_result.clarifying_questions,
                 context=intent_result.context,
-                timestamp=datetime.now()
+                timestamp=assistant_message.timestamp
             )
             
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Failed to process message: {e}")
+            logger.error("Failed to process message: %s", e, exc_info=True)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to process message: {str(e)}"
             )
     
     
+    @router.post("/message", response_model=ChatMessageResponse)
+    async def send_message(request: ChatMessageRequest) -> ChatMessageResponse:
+        """
+        Send a message in an existing conversation.
+        
+        The agent will classify intent, extract context, and generate a response.
+        Turns of one session run one at a time, so concurrent messages can't
+        interleave their updates to the shared session or persist out of order.
+        """
+        validate_session_id(request.session_id)
+        async with session_manager.session_lock(request.session_id):
+            return await process_message(request)
+    
+    
     @router.get("/history/{session_id}", response_model=ChatHistoryResponse)
-    async def get_history(session_id: str) -> ChatHistoryResponse:
+    async def get_history(session_id: str) -> StreamingResponse:
         """
         Get conversation history for a session.
+        
+        The body matches ChatHistoryResponse but is streamed message by message
+        instead of being built as one list first.
         """
         try:
-            session = session_manager.get_session(session_id)
-            if not session:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Session {session_id} not found or expired"
-                )
+            session = await get_session_or_404(session_id)
             
-            return ChatHistoryResponse(
-                session_id=session.session_id,
-                messages=[msg.to_dict() for msg in session.messages],
-                message_count=session.message_count,
-                started_at=session.started_at,
-                last_message_at=session.last_message_at,
-                context=session.context.to_dict()  # Include full context
+            return StreamingResponse(
+                _iter_history_json(session),
+                media_type="application/json"
             )
             
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Failed to get history: {e}")
+            logger.error("Failed to get history: %s", e, exc_info=True)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to get history: {str(e)}"
@@ -350,26 +491,23 @@ def create_chat_router(
         Reset conversation context while keeping the session.
         """
         try:
-            session = session_manager.get_session(session_id)
-            if not session:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Session {session_id} not found or expired"
-                )
-            
-            # Clear messages and context
-            session.messages = []
-            session.message_count = 0
-            session.context = ConversationContext()
-            
-            session_manager.save_session(session)
+            validate_session_id(session_id)
+            async with session_manager.session_lock(session_id):
+                session = copy.deepcopy(await get_session_or_404(session_id))
+                
+                # Clear messages and context
+                session.reset_context()
+                
+                if not await session_manager.save_session(session):
+                    session_manager.invalidate(session_id)
+                    raise RuntimeError("session could not be saved")
             
             return {"message": "Conversation reset successfully"}
             
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Failed to reset conversation: {e}")
+            logger.error("Failed to reset conversation: %s", e, exc_info=True)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to reset conversation: {str(e)}"
@@ -382,11 +520,12 @@ def create_chat_router(
         End a conversation and delete the session.
         """
         try:
-            success = session_manager.delete_session(session_id)
+            validate_session_id(session_id)
+            success = await session_manager.delete_session(session_id)
             if not success:
                 raise HTTPException(
                     status_code=404,
-                    detail=f"Session {session_id} not found"
+                    detail=_SESSION_NOT_FOUND
                 )
             
             return {"message": "Conversation ended successfully"}
@@ -394,7 +533,7 @@ def create_chat_router(
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Failed to end conversation: {e}")
+            logger.error("Failed to end conversation: %s", e, exc_info=True)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to end conversation: {str(e)}"
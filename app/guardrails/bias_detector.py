@@ -2,14 +2,58 @@
 Bias detection for recruitment analysis.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
 import re
 
+import threading
+
+import orjson
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    logging.warning("pyahocorasick not installed. Bias keyword scan will use regex fallback.")
+
 from app.guardrails.models import BiasFinding
 
 logger = logging.getLogger(__name__)
 
+# (category, keyword, severity, start, end) of one keyword hit
+_KeywordMatch = Tuple[str, str, str, int, int]
+
+
+# Prompt for LLM-based implicit bias detection; {text} is the analysis text
+_LLM_BIAS_PROMPT = """Analyze this recruitment feedback for potential bias:
+
+{text}
+
+Look for:
+1. Age bias (preferring younger/older candidates, using age-related language)
+2. Gender bias (gendered language, assumptions about gender)
+3. Cultural bias (assumptions about background, nationality, ethnicity)
+4. Disability bias (assumptions about physical or mental capabilities)
+5. Appearance bias (comments on physical appearance)
+
+For each bias found, respond with JSON:
+{{
+    "bias_detected": true/false,
+    "category": "age/gender/race/disability/appearance",
+    "explanation": "Brief explanation of the bias",
+    "severity": "low/medium/high"
+}}
+
+If no bias detected, return: {{"bias_detected": false}}
+"""
+
 
 class BiasDetector:
     """
@@ -63,6 +107,39 @@ class BiasDetector:
         }
     }
     
+    # (keyword, category, severity) for every protected keyword, flattened once at class load
+    _FLAT_KEYWORDS = tuple(
+        (keyword.lower(), category, config["severity"])
+        for category, config in PROTECTED_ATTRIBUTES.items()
+        for keyword in config["keywords"]
+    )
+    
+    # First word of every keyword; a text containing none of them cannot match
+    _KEYWORD_LEAD_WORDS = frozenset(
+        re.match(r'\w+', keyword).group(0) for keyword, _, _ in _FLAT_KEYWORDS
+    )
+    
+    # One word-bounded alternation per category, compiled once at class load
+    _COMPILED_PATTERNS = {
+        category: re.compile(
+            r'\b(?:' + '|'.join(re.escape(k) for k in config["keywords"]) + r')\b',
+            re.IGNORECASE
+        )
+        for category, config in PROTECTED_ATTRIBUTES.items()
+    }
+    
+    # Aho-Corasick automaton over all keywords, built on first use
+    _AUTOMATON = None
+    
+    # Hyperscan database over all keywords with (category, keyword, severity) per pattern id,
+    # built on first use; scratch space is per thread since scans may run concurrently
+    _HS_DATABASE = None
+    _HS_PATTERNS = []
+    _HS_SCRATCH = threading.local()
+    
+    # Minimum combined text length worth an LLM bias check
+    MIN_LLM_SCAN_CHARS = 20
+    
     def __init__(self, use_llm: bool = False, llm=None):
         """
         Initialize bias detector.
@@ -78,12 +155,16 @@ class BiasDetector:
             logger.warning("LLM-based bias detection requested but no LLM provided")
             self.use_llm = False
     
-    def scan(self, analysis: Dict) -> List[BiasFinding]:
+    def scan(self, analysis: Dict, deep_scan: bool = False) -> List[BiasFinding]:
         """
         Detect potential bias in analysis.
         
+        The LLM check is skipped when the keyword scan already found a
+        high-severity term, unless deep_scan is requested.
+        
         Args:
             analysis: Analysis dictionary to check
+            deep_scan: Run the LLM check even if keywords already flagged high-severity bias
             
         Returns:
             List of BiasFinding objects
@@ -105,14 +186,30 @@ class BiasDetector:
             if isinstance(questions, list):
                 text_parts.extend(questions)
         
-        text = " ".join(str(part) for part in text_parts)
+        # Drop empty parts; nothing to scan means no findings
+        parts = [text for text in map(str, filter(None, text_parts)) if not text.isspace()]
+        if not parts:
+            return findings
         
-        # Keyword-based detection
-        findings.extend(self._keyword_scan(text))
+        # Keyword-based detection, one short part at a time, merged per (category, keyword)
+        keyword_findings: Dict[Tuple[str, str], BiasFinding] = {}
+        for part in parts:
+            for finding in self._keyword_scan(part):
+                seen = keyword_findings.get((finding.category, finding.keyword))
+                if seen is None:
+                    keyword_findings[(finding.category, finding.keyword)] = finding
+                else:
+                    seen.occurrences += finding.occurrences
+        findings.extend(keyword_findings.values())
         
-        # LLM-based implicit bias detection
-        if self.use_llm:
-            findings.extend(self._llm_scan(text))
+        # LLM-based implicit bias detection (skipped for trivially short input,
+        # and for input already flagged as high severity unless deep_scan)
+        if (
+            self.use_llm and
+            sum(len(part) for part in parts) >= self.MIN_LLM_SCAN_CHARS and
+            (deep_scan or not any(f.severity == "high" for f in findings))
+        ):
+            findings.extend(self._llm_scan(" ".join(parts)))
         
         return findings
     
@@ -126,33 +223,178 @@ class BiasDetector:
         Returns:
             List of BiasFinding objects
         """
-        findings = []
+        if HYPERSCAN_AVAILABLE:
+            matches = self._hyperscan_scan(text)
+        elif AHOCORASICK_AVAILABLE:
+            matches = self._automaton_scan(text)
+        else:
+            matches = self._regex_scan(text)
+        
+        # One finding per (category, keyword), keeping the first match's context
+        findings: Dict[Tuple[str, str], BiasFinding] = {}
+        for category, keyword, severity, start, end in matches:
+            finding = findings.get((category, keyword))
+            if finding is None:
+                findings[(category, keyword)] = self._make_finding(
+                    text, category, keyword, severity, start, end
+                )
+            else:
+                finding.occurrences += 1
+        
+        return list(findings.values())
+    
+    @classmethod
+    def _get_hyperscan_database(cls):
+        """
+        Compile (once) a caseless Hyperscan database over all protected keywords.
+        
+        Returns:
+            Compiled hyperscan.Database; pattern ids index into _HS_PATTERNS
+        """
+        if cls._HS_DATABASE is None:
+            patterns = [(category, keyword, severity) for keyword, category, severity in cls._FLAT_KEYWORDS]
+            database = hyperscan.Database()
+            database.compile(
+                expressions=[re.escape(keyword).encode() for _, keyword, _ in patterns],
+                ids=list(range(len(patterns))),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(patterns)
+            )
+            cls._HS_PATTERNS = patterns
+            cls._HS_DATABASE = database
+        return cls._HS_DATABASE
+    
+    def _hyperscan_scan(self, text: str) -> List[_KeywordMatch]:
+        """
+        Scan for all keywords in a single Hyperscan pass.
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            List of (category, keyword, severity, start, end) matches
+        """
+        database = self._get_hyperscan_database()
+        scratch = getattr(self._HS_SCRATCH, "scratch", None)
+        if scratch is None:
+            scratch = self._HS_SCRATCH.scratch = hyperscan.Scratch(database)
+        
+        data = text.encode("utf-8")
+        hits = []
+        database.scan(
+            data,
+            match_event_handler=lambda pattern_id, start, end, flags, context: hits.append(
+                (pattern_id, start, end)
+            ),
+            scratch=scratch
+        )
+        
+        matches = []
+        length = len(text)
+        is_ascii = text.isascii()
+        
+        for pattern_id, start, end in hits:
+            category, keyword, severity = self._HS_PATTERNS[pattern_id]
+            
+            # Hyperscan reports byte offsets; convert them for non-ASCII text
+            if not is_ascii:
+                start = len(data[:start].decode("utf-8"))
+                end = start + len(keyword)
+            
+            # Enforce word boundaries to avoid false positives
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if end < length and _is_word_char(text[end]):
+                continue
+            
+            matches.append((category, keyword, severity, start, end))
+        
+        return matches
+    
+    @classmethod
+    def _get_automaton(cls):
+        """
+        Build (once) an Aho-Corasick automaton over all protected keywords.
+        
+        Returns:
+            Automaton whose payloads are (category, keyword, severity) tuples
+        """
+        if cls._AUTOMATON is None:
+            automaton = ahocorasick.Automaton()
+            for keyword, category, severity in cls._FLAT_KEYWORDS:
+                automaton.add_word(keyword, (category, keyword, severity))
+            automaton.make_automaton()
+            cls._AUTOMATON = automaton
+        return cls._AUTOMATON
+    
+    def _automaton_scan(self, text: str) -> List[_KeywordMatch]:
+        """
+        Scan for all keywords in a single Aho-Corasick pass.
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            List of (category, keyword, severity, start, end) matches
+        """
+        matches = []
         text_lower = text.lower()
+        length = len(text_lower)
         
-        for category, config in self.PROTECTED_ATTRIBUTES.items():
-            keywords = config["keywords"]
-            severity = config["severity"]
+        for end_index, (category, keyword, severity) in self._get_automaton().iter(text_lower):
+            start = end_index - len(keyword) + 1
+            end = end_index + 1
             
-            for keyword in keywords:
-                # Use word boundaries to avoid false positives
-                pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-                matches = list(re.finditer(pattern, text_lower))
-                
-                for match in matches:
-                    # Extract context (50 chars before and after)
-                    start = max(0, match.start() - 50)
-                    end = min(len(text), match.end() + 50)
-                    context = text[start:end]
-                    
-                    findings.append(BiasFinding(
-                        category=category,
-                        keyword=keyword,
-                        context=context,
-                        severity=severity,
-                        explanation=f"Detected '{keyword}' which may indicate {category} bias"
-                    ))
+            # Enforce word boundaries to avoid false positives
+            if start > 0 and _is_word_char(text_lower[start - 1]):
+                continue
+            if end < length and _is_word_char(text_lower[end]):
+                continue
+            
+            matches.append((category, keyword, severity, start, end))
         
-        return findings
+        return matches
+    
+    def _regex_scan(self, text: str) -> List[_KeywordMatch]:
+        """
+        Scan for keywords with one compiled regex per category.
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            List of (category, keyword, severity, start, end) matches
+        """
+        matches = []
+        
+        # Cheap token pre-check before running one regex per category
+        if self._KEYWORD_LEAD_WORDS.isdisjoint(re.findall(r'\w+', text.lower())):
+            return matches
+        
+        for category, pattern in self._COMPILED_PATTERNS.items():
+            severity = self.PROTECTED_ATTRIBUTES[category]["severity"]
+            
+            for match in pattern.finditer(text):
+                matches.append((category, match.group(0).lower(), severity, match.start(), match.end()))
+        
+        return matches
+    
+    @staticmethod
+    def _make_finding(
+        text: str,
+        category: str,
+        keyword: str,
+        severity: str,
+        start: int,
+        end: int
+    ) -> BiasFinding:
+        """Create a BiasFinding with 50 chars of context on each side of the match."""
+        return BiasFinding(
+            category=category,
+            keyword=keyword,
+            context=text[max(0, start - 50):min(len(text), end + 50)],
+            severity=severity,
+            explanation=f"Detected '{keyword}' which may indicate {category} bias"
+        )
     
     def _llm_scan(self, text: str) -> List[BiasFinding]:
         """
@@ -168,34 +410,13 @@ class BiasDetector:
             return []
         
         try:
-            prompt = f"""Analyze this recruitment feedback for potential bias:
-
-{text}
-
-Look for:
-1. Age bias (preferring younger/older candidates, using age-related language)
-2. Gender bias (gendered language, assumptions about gender)
-3. Cultural bias (assumptions about background, nationality, ethnicity)
-4. Disability bias (assumptions about physical or mental capabilities)
-5. Appearance bias (comments on physical appearance)
-
-For each bias found, respond with JSON:
-{{
-    "bias_detected": true/false,
-    "category": "age/gender/race/disability/appearance",
-    "explanation": "Brief explanation of the bias",
-    "severity": "low/medium/high"
-}}
-
-If no bias detected, return: {{"bias_detected": false}}
-"""
+            prompt = _LLM_BIAS_PROMPT.format(text=text)
             
             response = self.llm.invoke(prompt)
             
             # Parse LLM response
-            import json
             try:
-                result = json.loads(response.content)
+                result = orjson.loads(response.content)
                 
                 if result.get("bias_detected"):
                     return [BiasFinding(
@@ -205,7 +426,7 @@ If no bias detected, return: {{"bias_detected": false}}
                         severity=result.get("severity", "medium"),
                         explanation=result.get("explanation", "LLM detected potential bias")
                     )]
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 logger.warning("Failed to parse LLM bias detection response")
         
         except Exception as e:
@@ -244,3 +465,8 @@ If no bias detected, return: {{"bias_detected": false}}
                 ))
         
         return findings
+
+
+def _is_word_char(char: str) -> bool:
+    """Match the regex \\w definition used for word boundaries."""
+    return char.isalnum() or char == '_'
@@ -2,31 +2,44 @@
 Data models for safety guardrails.
 """
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from dataclasses import dataclass, asdict
+from typing import List, Optional, Dict, Any, TypedDict
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
+import time
 
 
-class PIIFinding(BaseModel):
-    """Represents a detected PII entity."""
-    entity_type: str = Field(..., description="Type of PII (EMAIL, PHONE, etc.)")
-    text: str = Field(..., description="The actual PII text found")
-    start: int = Field(..., description="Start position in text")
-    end: int = Field(..., description="End position in text")
-    score: float = Field(..., description="Confidence score (0-1)")
-    redacted: bool = Field(default=False, description="Whether this was redacted")
+@dataclass(frozen=True, slots=True)
+class PIIFinding:
+    """
+    Represents a detected PII entity.
+    
+    A plain dataclass rather than a Pydantic model: findings are built by
+    detector code, often one per regex match, so per-instance validation
+    buys nothing. SafetyReport still serializes them.
+    """
+    entity_type: str  # Type of PII (EMAIL, PHONE, etc.)
+    text: str  # The actual PII text found
+    start: int  # Start position in text
+    end: int  # End position in text
+    score: float  # Confidence score (0-1)
+    redacted: bool = False  # Whether this was redacted
     
     @classmethod
-    def from_presidio(cls, result):
-        """Create from Presidio AnalyzerResult."""
+    def from_presidio(cls, result, offset: int = 0):
+        """Create from Presidio AnalyzerResult, shifting positions back by offset."""
         return cls(
             entity_type=result.entity_type,
             text="",  # Presidio doesn't return original text
-            start=result.start,
-            end=result.end,
+            start=result.start - offset,
+            end=result.end - offset,
             score=result.score,
             redacted=False
         )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return asdict(self)
 
 
 class BiasFinding(BaseModel):
@@ -36,6 +49,7 @@ class BiasFinding(BaseModel):
     context: str = Field(..., description="Context where bias was found")
     severity: str = Field(..., description="Severity: low, medium, high")
     explanation: Optional[str] = Field(None, description="LLM explanation of bias")
+    occurrences: int = Field(1, description="Number of times the keyword appeared")
 
 
 class ToxicityScore(BaseModel):
@@ -56,9 +70,21 @@ class ValidationResult(BaseModel):
     errors: List[str] = Field(default_factory=list, description="Validation errors")
 
 
+class SafetyReportDict(TypedDict):
+    """Shape of SafetyReport.to_dict(); for type checkers only, not validated at runtime."""
+    timestamp: str
+    pii_findings: List[Dict[str, Any]]
+    bias_findings: List[Dict[str, Any]]
+    toxicity_score: Optional[Dict[str, Any]]
+    validation_result: Optional[Dict[str, Any]]
+    has_issues: bool
+    has_critical_issues: bool
+    summary: str
+
+
 class SafetyReport(BaseModel):
     """Comprehensive safety report for an analysis."""
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp_ns: int = Field(default_factory=time.time_ns)  # Formatted only when serialized
     pii_findings: List[PIIFinding] = Field(default_factory=list)
     bias_findings: List[BiasFinding] = Field(default_factory=list)
     toxicity_score: Optional[ToxicityScore] = None
@@ -66,14 +92,24 @@ class SafetyReport(BaseModel):
     has_issues: bool = Field(default=False)
     has_critical_issues: bool = Field(default=False)
     
+    # summary() result, cleared whenever an add_* method changes the report
+    _summary: Optional[str] = PrivateAttr(default=None)
+    
+    @property
+    def timestamp(self) -> datetime:
+        """When the report was created, as a local datetime."""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
+    
     def add_pii_findings(self, findings: List[PIIFinding]):
         """Add PII findings to report."""
+        self._summary = None
         self.pii_findings.extend(findings)
         if findings:
             self.has_issues = True
     
     def add_bias_findings(self, findings: List[BiasFinding]):
         """Add bias findings to report."""
+        self._summary = None
         self.bias_findings.extend(findings)
         if findings:
             self.has_issues = True
@@ -83,6 +119,7 @@ class SafetyReport(BaseModel):
     
     def add_toxicity_score(self, score: ToxicityScore):
         """Add toxicity score to report."""
+        self._summary = None
         self.toxicity_score = score
         if score.is_toxic:
             self.has_issues = True
@@ -90,12 +127,19 @@ class SafetyReport(BaseModel):
     
     def add_validation_results(self, result: ValidationResult):
         """Add validation results to report."""
+        self._summary = None
         self.validation_result = result
         if not result.is_valid:
             self.has_issues = True
     
     def summary(self) -> str:
-        """Generate human-readable summary."""
+        """Generate human-readable summary (computed once until the report changes)."""
+        if self._summary is None:
+            self._summary = self._build_summary()
+        return self._summary
+    
+    def _build_summary(self) -> str:
+        """Build the summary text from the current findings."""
         parts = []
         
         if self.pii_findings:
@@ -115,15 +159,12 @@ class SafetyReport(BaseModel):
         
         return "; ".join(parts)
     
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self) -> SafetyReportDict:
         """Convert to dictionary for JSON serialization."""
-        return {
+        # One pydantic-core pass over the whole report, nested findings included
+        data = {
             "timestamp": self.timestamp.isoformat(),
-            "pii_findings": [f.model_dump() for f in self.pii_findings],
-            "bias_findings": [f.model_dump() for f in self.bias_findings],
-            "toxicity_score": self.toxicity_score.model_dump() if self.toxicity_score else None,
-            "validation_result": self.validation_result.model_dump() if self.validation_result else None,
-            "has_issues": self.has_issues,
-            "has_critical_issues": self.has_critical_issues,
-            "summary": self.summary()
+            **self.model_dump(mode="json", exclude={"timestamp_ns"})
         }
+        data["summary"] = self.summary()
+        return data
@@ -2,14 +2,35 @@
 Output validation using Guardrails AI and Pydantic.
 """
 
-from typing import Dict, Any, Optional
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Any, Optional, Type
 import logging
-from pydantic import BaseModel, Field, ValidationError, field_validator
+import re
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator
 
 from app.guardrails.models import ValidationResult
 
 logger = logging.getLogger(__name__)
 
+# Words long enough to count toward summary repetition (4+ word characters)
+_LONG_WORD_RE = re.compile(r'\w{4,}')
+
+# Content-quality phrases, each matched in one case-insensitive pass
+_PLACEHOLDER_RE = re.compile(
+    '|'.join(map(re.escape, ['lorem ipsum', 'todo', 'tbd', 'xxx', 'placeholder'])),
+    re.IGNORECASE
+)
+_GENERIC_QUESTION_RE = re.compile(
+    '|'.join(map(re.escape, [
+        "tell me about yourself",
+        "what are your strengths",
+        "what are your weaknesses",
+        "where do you see yourself in 5 years"
+    ])),
+    re.IGNORECASE
+)
+
 
 class ScreeningResponseSchema(BaseModel):
     """
@@ -75,6 +96,20 @@ class MultiAgentAnalysisSchema(BaseModel):
     confidence_score: float = Field(..., ge=0.0, le=1.0)
 
 
+@lru_cache(maxsize=None)
+def _get_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """
+    Get the shared TypeAdapter for a schema, building it on first use.
+    
+    Args:
+        schema: Pydantic model class to validate against
+        
+    Returns:
+        TypeAdapter reused by every OutputValidator instance
+    """
+    return TypeAdapter(schema)
+
+
 class OutputValidator:
     """
     Validate LLM outputs against defined schemas.
@@ -89,6 +124,10 @@ class OutputValidator:
             'screening': ScreeningResponseSchema,
             'multi_agent': MultiAgentAnalysisSchema
         }
+        
+        # Build validators up front so the first screening doesn't pay for it
+        for schema in self.schemas.values():
+            _get_adapter(schema)
     
     def validate(
         self,
@@ -116,7 +155,7 @@ class OutputValidator:
         
         try:
             # Validate with Pydantic
-            validated = schema(**output)
+            validated = _get_adapter(schema).validate_python(output)
             
             # Additional content validation
             content_errors = self._validate_content(output)
@@ -135,7 +174,8 @@ class OutputValidator:
             )
         
         except ValidationError as e:
-            errors = [f"{err['loc'][0]}: {err['msg']}" for err in e.errors()]
+            # Errors on the whole input (e.g. not a dict) have an empty loc
+            errors = [f"{err['loc'][0] if err['loc'] else 'output'}: {err['msg']}" for err in e.errors()]
             return ValidationResult(
                 is_valid=False,
                 validated_output=None,
@@ -165,39 +205,33 @@ class OutputValidator:
         summary = output.get('summary', '')
         if summary:
             # Check for placeholder text
-            placeholders = ['lorem ipsum', 'todo', 'tbd', 'xxx', 'placeholder']
-            if any(p in summary.lower() for p in placeholders):
+            if _PLACEHOLDER_RE.search(summary):
                 errors.append("Summary contains placeholder text")
             
             # Check for repetition
-            words = summary.lower().split()
-            if len(words) != len(set(words)):
-                word_counts = {}
-                for word in words:
-                    word_counts[word] = word_counts.get(word, 0) + 1
-                
-                repeated = [w for w, c in word_counts.items() if c > 3 and len(w) > 3]
-                if repeated:
-                    errors.append(f"Summary has excessive repetition: {repeated[:3]}")
+            word_counts = Counter(_LONG_WORD_RE.findall(summary.lower()))
+            repeated = [w for w, c in word_counts.items() if c > 3]
+            if repeated:
+                errors.append(f"Summary has excessive repetition: {repeated[:3]}")
         
         # Check interview questions quality
         questions = output.get('interview_questions', [])
         if questions:
-            # Check for duplicate questions
-            if len(questions) != len(set(questions)):
-                errors.append("Duplicate interview questions detected")
-            
-            # Check for generic questions
-            generic_questions = [
-                "tell me about yourself",
-                "what are your strengths",
-                "what are your weaknesses",
-                "where do you see yourself in 5 years"
-            ]
-            
+            # Check for duplicate and generic questions in one pass
+            seen = set()
+            has_duplicates = False
+            generic_errors = []
             for q in questions:
-                if any(generic in q.lower() for generic in generic_questions):
-                    errors.append(f"Generic interview question: {q[:50]}...")
+                if q in seen:
+                    has_duplicates = True
+                seen.add(q)
+                
+                if _GENERIC_QUESTION_RE.search(q):
+                    generic_errors.append(f"Generic interview question: {q[:50]}...")
+            
+            if has_duplicates:
+                errors.append("Duplicate interview questions detected")
+            errors.extend(generic_errors)
         
         # Check missing skills
         skills = output.get('missing_skills', [])
@@ -250,7 +284,8 @@ class OutputValidator:
         if 'interview_questions' in fixed:
             questions = fixed['interview_questions']
             if len(questions) < 3:
-                # Add generic questions to meet minimum
+                # Add generic questions to meet minimum (on a copy; the list may be shared with the caller)
+                questions = fixed['interview_questions'] = list(questions)
                 while len(questions) < 3:
                     questions.append(f"Question {len(questions) + 1}: Please elaborate on your experience.")
             elif len(questions) > 10:
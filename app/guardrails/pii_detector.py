@@ -2,11 +2,17 @@
 PII detection and redaction using Microsoft Presidio.
 """
 
-from typing import List, Dict, Any
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Sequence
 import logging
+import re
+import threading
+
+from cachetools import LRUCache
 
 try:
-    from presidio_analyzer import AnalyzerEngine
+    from presidio_analyzer import AnalyzerEngine, RecognizerResult
     from presidio_anonymizer import AnonymizerEngine
     PRESIDIO_AVAILABLE = True
 except ImportError:
@@ -17,6 +23,25 @@ from app.guardrails.models import PIIFinding
 
 logger = logging.getLogger(__name__)
 
+# Fallback patterns used when Presidio is unavailable
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')  # Simple US format
+
+# Guards first construction of the shared Presidio engines
+_ENGINE_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _get_analyzer() -> "AnalyzerEngine":
+    """Get the process-wide Presidio analyzer (loads the spaCy model once)."""
+    return AnalyzerEngine()
+
+
+@lru_cache(maxsize=1)
+def _get_anonymizer() -> "AnonymizerEngine":
+    """Get the process-wide Presidio anonymizer."""
+    return AnonymizerEngine()
+
 
 class PIIDetector:
     """
@@ -44,6 +69,21 @@ class PIIDetector:
         "URL"
     ]
     
+    # Pattern-based entities only; short technical strings such as skill names
+    # don't need NER, which mostly yields false PERSON/LOCATION hits there
+    CONTACT_ENTITIES = [
+        "EMAIL_ADDRESS",
+        "PHONE_NUMBER",
+        "IP_ADDRESS",
+        "URL"
+    ]
+    
+    # Joins texts for a single batched Presidio call; unlikely to sit inside an entity
+    BATCH_SEPARATOR = "\n\n<<<SEP>>>\n\n"
+    
+    # Recently analyzed texts, so redact() can reuse scan() results
+    RESULTS_CACHE_SIZE = 1024
+    
     def __init__(self, mode: str = "flag"):
         """
         Initialize PII detector.
@@ -52,10 +92,14 @@ class PIIDetector:
             mode: "flag" to detect only, "redact" to replace PII
         """
         self.mode = mode
+        self._results_cache: LRUCache = LRUCache(maxsize=self.RESULTS_CACHE_SIZE)
+        self._results_cache_lock = threading.Lock()
         
         if PRESIDIO_AVAILABLE:
-            self.analyzer = AnalyzerEngine()
-            self.anonymizer = AnonymizerEngine()
+            # Engines are shared by every detector in the process
+            with _ENGINE_LOCK:
+                self.analyzer = _get_analyzer()
+                self.anonymizer = _get_anonymizer()
             logger.info("Presidio PII detector initialized")
         else:
             self.analyzer = None
@@ -82,6 +126,7 @@ class PIIDetector:
                     entities=self.PII_ENTITIES,
                     language='en'
                 )
+                self._remember_results(text, results)
                 return [PIIFinding.from_presidio(r) for r in results]
             except Exception as e:
                 logger.error(f"Presidio analysis failed: {e}")
@@ -89,6 +134,111 @@ class PIIDetector:
         else:
             return self._fallback_scan(text)
     
+    def scan_batch(
+        self,
+        texts: List[str],
+        entities: Optional[Sequence[Optional[List[str]]]] = None
+    ) -> List[PIIFinding]:
+        """
+        Detect PII entities in several texts with one Presidio call.
+        
+        The texts are joined with BATCH_SEPARATOR and analyzed once; finding
+        offsets are mapped back so they are relative to their own text, as
+        with scan().
+        
+        Args:
+            texts: Texts to scan for PII
+            entities: Optional entity list per text (parallel to texts);
+                None entries, or no list at all, mean PII_ENTITIES
+            
+        Returns:
+            List of PIIFinding objects across all texts
+        """
+        if entities is None:
+            entities = [None] * len(texts)
+        pairs = [(text, allowed) for text, allowed in zip(texts, entities) if text]
+        if not pairs:
+            return []
+        texts = [text for text, _ in pairs]
+        allowed_by_text = [allowed for _, allowed in pairs]
+        
+        if not (PRESIDIO_AVAILABLE and self.analyzer):
+            return [
+                finding
+                for text, allowed in pairs
+                for finding in self._fallback_scan(text)
+                if allowed is None or finding.entity_type in allowed
+            ]
+        
+        # Only ask Presidio for entities some text actually wants
+        if any(allowed is None for allowed in allowed_by_text):
+            requested = self.PII_ENTITIES
+        else:
+            requested = sorted({entity for allowed in allowed_by_text for entity in allowed})
+        
+        # Start offset of each text within the joined string
+        offsets = []
+        position = 0
+        for text in texts:
+            offsets.append(position)
+            position += len(text) + len(self.BATCH_SEPARATOR)
+        
+        try:
+            results = self.analyzer.analyze(
+                text=self.BATCH_SEPARATOR.join(texts),
+                entities=requested,
+                language='en'
+            )
+        except Exception as e:
+            logger.error(f"Presidio analysis failed: {e}")
+            return [
+                finding
+                for text, allowed in pairs
+                for finding in self._fallback_scan(text)
+                if allowed is None or finding.entity_type in allowed
+            ]
+        
+        findings = []
+        results_by_text = [[] for _ in texts]
+        for result in results:
+            index = bisect_right(offsets, result.start) - 1
+            offset = offsets[index]
+            
+            # Drop anything that runs past its own text into the separator
+            if result.end - offset > len(texts[index]):
+                continue
+            
+            allowed = allowed_by_text[index]
+            if allowed is not None and result.entity_type not in allowed:
+                continue
+            
+            findings.append(PIIFinding.from_presidio(result, offset))
+            # Only unrestricted results are cached: redact() reads the cache
+            # by text and must see every PII entity, not a requested subset
+            if allowed is None:
+                results_by_text[index].append(RecognizerResult(
+                    entity_type=result.entity_type,
+                    start=result.start - offset,
+                    end=result.end - offset,
+                    score=result.score
+                ))
+        
+        for text, allowed, text_results in zip(texts, allowed_by_text, results_by_text):
+            if allowed is None:
+                self._remember_results(text, text_results)
+        
+        return findings
+    
+    def _remember_results(self, text: str, results: list) -> None:
+        """Keep Presidio results for a text so a following redact() can skip analysis."""
+        with self._results_cache_lock:
+            self._results_cache[text] = results
+    
+    def _recall_results(self, text: str) -> Optional[list]:
+        """Get cached Presidio results for a text, or None if it wasn't analyzed recently."""
+        with self._results_cache_lock:
+            return self._results_cache.get(text)
+    
     def _fallback_scan(self, text: str) -> List[PIIFinding]:
         """
         Simple regex-based PII detection as fallback.
@@ -99,12 +249,10 @@ class PIIDetector:
         Returns:
             List of PIIFinding objects
         """
-        import re
         findings = []
         
         # Email detection
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        for match in re.finditer(email_pattern, text):
+        for match in _EMAIL_RE.finditer(text):
             findings.append(PIIFinding(
                 entity_type="EMAIL_ADDRESS",
                 text=match.group(),
@@ -115,8 +263,7 @@ class PIIDetector:
             ))
         
         # Phone number detection (simple US format)
-        phone_pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
-        for match in re.finditer(phone_pattern, text):
+        for match in _PHONE_RE.finditer(text):
             findings.append(PIIFinding(
                 entity_type="PHONE_NUMBER",
                 text=match.group(),
@@ -128,12 +275,14 @@ class PIIDetector:
         
         return findings
     
-    def redact(self, text: str) -> str:
+    def redact(self, text: str, analyzer_results: Optional[list] = None) -> str:
         """
         Redact PII from text.
         
         Args:
             text: Text to redact
+            analyzer_results: Presidio results for this text; defaults to the
+                results of a recent scan, analyzing again only if there are none
             
         Returns:
             Text with PII replaced by [REDACTED_TYPE]
@@ -143,11 +292,19 @@ class PIIDetector:
         
         if PRESIDIO_AVAILABLE and self.anonymizer:
             try:
-                results = self.analyzer.analyze(
-                    text=text,
-                    entities=self.PII_ENTITIES,
-                    language='en'
-                )
+                results = analyzer_results
+                if results is None:
+                    results = self._recall_results(text)
+                if results is None:
+                    results = self.analyzer.analyze(
+                        text=text,
+                        entities=self.PII_ENTITIES,
+                        language='en'
+                    )
+                
+                # Nothing detected, nothing to anonymize
+                if not results:
+                    return text
                 
                 anonymized = self.anonymizer.anonymize(
                     text=text,
@@ -171,21 +328,11 @@ class PIIDetector:
         Returns:
             Redacted text
         """
-        import re
-        
         # Redact emails
-        text = re.sub(
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            '[REDACTED_EMAIL]',
-            text
-        )
+        text = _EMAIL_RE.sub('[REDACTED_EMAIL]', text)
         
         # Redact phone numbers
-        text = re.sub(
-            r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
-            '[REDACTED_PHONE]',
-            text
-        )
+        text = _PHONE_RE.sub('[REDACTED_PHONE]', text)
         
         return text
     
@@ -197,21 +344,29 @@ class PIIDetector:
             data: Dictionary with potential PII
             
         Returns:
-            Dictionary with PII redacted
+            Dictionary with PII redacted; the input itself (and any unchanged
+            nested dict or list) is returned as-is when nothing was redacted
         """
-        redacted = {}
+        redacted = None  # Copied on the first changed value
         
         for key, value in data.items():
             if isinstance(value, str):
-                redacted[key] = self.redact(value)
+                new_value = self.redact(value)
             elif isinstance(value, list):
-                redacted[key] = [
+                new_value = [
                     self.redact(item) if isinstance(item, str) else item
                     for item in value
                 ]
+                if new_value == value:
+                    new_value = value
             elif isinstance(value, dict):
-                redacted[key] = self.redact_dict(value)
+                new_value = self.redact_dict(value)
             else:
-                redacted[key] = value
+                continue
+            
+            if new_value is not value and new_value != value:
+                if redacted is None:
+                    redacted = dict(data)
+                redacted[key] = new_value
         
-        return redacted
+        return data if redacted is None else redacted
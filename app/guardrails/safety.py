@@ -4,10 +4,16 @@ Main safety guardrails orchestrator.
 Coordinates all safety checks for AI-generated content.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import asyncio
+import hashlib
 import logging
+import threading
 
-from app.guardrails.models import SafetyReport
+import orjson
+from cachetools import LRUCache
+
+from app.guardrails.models import SafetyReport, ToxicityScore
 from app.guardrails.pii_detector import PIIDetector
 from app.guardrails.bias_detector import BiasDetector
 from app.guardrails.toxicity_filter import ToxicityFilter
@@ -25,14 +31,20 @@ class SafetyGuardrails:
     2. Bias detection
     3. Toxicity filtering
     4. Output validation
+    
+    Reports are cached by analysis content, so re-validating an identical
+    analysis (fix-and-retry loops, reprocessing) skips the model calls.
     """
     
+    REPORT_CACHE_SIZE = 256
+    
     def __init__(
         self,
         pii_mode: str = "flag",
         use_llm_bias: bool = False,
         llm=None,
-        toxicity_threshold: float = 0.7
+        toxicity_threshold: float = 0.7,
+        toxicity_use_onnx: bool = False
     ):
         """
         Initialize safety guardrails.
@@ -42,12 +54,19 @@ class SafetyGuardrails:
             use_llm_bias: Whether to use LLM for implicit bias detection
             llm: Language model for bias detection
             toxicity_threshold: Threshold for toxicity (0-1)
+            toxicity_use_onnx: Whether to run toxicity scoring on the int8 ONNX model
         """
         self.pii_detector = PIIDetector(mode=pii_mode)
         self.bias_detector = BiasDetector(use_llm=use_llm_bias, llm=llm)
-        self.toxicity_filter = ToxicityFilter(threshold=toxicity_threshold)
+        self.toxicity_filter = ToxicityFilter(
+            threshold=toxicity_threshold,
+            use_onnx=toxicity_use_onnx
+        )
         self.output_validator = OutputValidator()
         
+        self._report_cache: LRUCache = LRUCache(maxsize=self.REPORT_CACHE_SIZE)
+        self._report_cache_lock = threading.Lock()
+        
         logger.info(f"SafetyGuardrails initialized (PII mode: {pii_mode})")
     
     def validate_analysis(
@@ -65,6 +84,11 @@ class SafetyGuardrails:
         Returns:
             SafetyReport with all findings
         """
+        cache_key = self._report_cache_key(analysis, schema_name)
+        cached = self._get_cached_report(cache_key)
+        if cached is not None:
+            return cached
+        
         report = SafetyReport()
         
         try:
@@ -90,12 +114,139 @@ class SafetyGuardrails:
             
             logger.info(f"Safety check complete: {report.summary()}")
             
+            self._store_report(cache_key, report)
+            
         except Exception as e:
             logger.error(f"Safety validation failed: {e}")
             # Don't fail the entire analysis, just log the error
         
         return report
     
+    async def avalidate_analysis(
+        self,
+        analysis: Dict[str, Any],
+        schema_name: str = 'screening'
+    ) -> SafetyReport:
+        """
+        Run all safety checks on AI analysis concurrently.
+        
+        PII, bias, and toxicity checks are independent, so they run in
+        parallel on executor threads and the wall-clock cost is that of
+        the slowest one rather than their sum.
+        
+        Args:
+            analysis: Analysis dictionary to check
+            schema_name: Schema to validate against
+            
+        Returns:
+            SafetyReport with all findings
+        """
+        cache_key = self._report_cache_key(analysis, schema_name)
+        cached = self._get_cached_report(cache_key)
+        if cached is not None:
+            return cached
+        
+        report = SafetyReport()
+        loop = asyncio.get_running_loop()
+        
+        pii_findings, bias_findings, toxicity_score = await asyncio.gather(
+            loop.run_in_executor(None, self._check_pii, analysis),
+            loop.run_in_executor(None, self.bias_detector.scan, analysis),
+            self._acheck_toxicity(analysis),
+            return_exceptions=True
+        )
+        
+        # Collect every check's result before reporting failures
+        failed = False
+        for name, result in (
+            ("PII", pii_findings),
+            ("bias", bias_findings),
+            ("toxicity", toxicity_score),
+        ):
+            if isinstance(result, Exception):
+                logger.error(f"Safety validation failed ({name} check): {result}")
+                failed = True
+        
+        if not isinstance(pii_findings, Exception):
+            report.add_pii_findings(pii_findings)
+        if not isinstance(bias_findings, Exception):
+            report.add_bias_findings(bias_findings)
+        if toxicity_score and not isinstance(toxicity_score, Exception):
+            report.add_toxicity_score(toxicity_score)
+        
+        try:
+            validation_result = self.output_validator.validate(
+                analysis,
+                schema_name=schema_name
+            )
+            report.add_validation_results(validation_result)
+        except Exception as e:
+            logger.error(f"Safety validation failed (output validation): {e}")
+            failed = True
+        
+        logger.info(f"Safety check complete: {report.summary()}")
+        
+        if not failed:
+            self._store_report(cache_key, report)
+        
+        return report
+    
+    def _get_cached_report(self, cache_key: Optional[Tuple[str, bytes]]) -> Optional[SafetyReport]:
+        """
+        Look up a cached report.
+        
+        Args:
+            cache_key: Key from _report_cache_key, or None
+            
+        Returns:
+            A copy of the cached SafetyReport, or None on a miss
+        """
+        if cache_key is None:
+            return None
+        
+        with self._report_cache_lock:
+            cached = self._report_cache.get(cache_key)
+        if cached is None:
+            return None
+        
+        logger.debug("Safety check served from cache")
+        return cached.model_copy(deep=True)
+    
+    def _store_report(self, cache_key: Optional[Tuple[str, bytes]], report: SafetyReport) -> None:
+        """
+        Cache a copy of a completed report.
+        
+        Args:
+            cache_key: Key from _report_cache_key, or None to skip caching
+            report: Report to cache
+        """
+        if cache_key is None:
+            return
+        
+        with self._report_cache_lock:
+            self._report_cache[cache_key] = report.model_copy(deep=True)
+    
+    @staticmethod
+    def _report_cache_key(analysis: Dict[str, Any], schema_name: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Build a content-based cache key for an analysis.
+        
+        Args:
+            analysis: Analysis dictionary
+            schema_name: Schema the analysis is validated against
+            
+        Returns:
+            (schema_name, digest) or None if the analysis can't be canonicalized
+        """
+        try:
+            canonical = orjson.dumps(
+                analysis,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+            )
+        except TypeError:
+            return None
+        return schema_name, hashlib.blake2b(canonical, digest_size=16).digest()
+    
     def _check_pii(self, analysis: Dict[str, Any]) -> list:
         """
         Check all string fields for PII.
@@ -106,25 +257,30 @@ class SafetyGuardrails:
         Returns:
             List of PIIFinding objects
         """
-        findings = []
+        texts = []
+        entities = []
         
         # Check summary
-        if 'summary' in analysis:
-            findings.extend(self.pii_detector.scan(analysis['summary']))
+        if isinstance(analysis.get('summary'), str):
+            texts.append(analysis['summary'])
+            entities.append(None)
         
-        # Check missing skills
+        # Check missing skills (technology names: contact details only, no NER entities)
         if 'missing_skills' in analysis:
             for skill in analysis['missing_skills']:
                 if isinstance(skill, str):
-                    findings.extend(self.pii_detector.scan(skill))
+                    texts.append(skill)
+                    entities.append(self.pii_detector.CONTACT_ENTITIES)
         
         # Check interview questions
         if 'interview_questions' in analysis:
             for question in analysis['interview_questions']:
                 if isinstance(question, str):
-                    findings.extend(self.pii_detector.scan(question))
+                    texts.append(question)
+                    entities.append(None)
         
-        return findings
+        # One Presidio pass over every field instead of one per field
+        return self.pii_detector.scan_batch(texts, entities)
     
     def _check_toxicity(self, analysis: Dict[str, Any]):
         """
@@ -134,23 +290,72 @@ class SafetyGuardrails:
             analysis: Analysis to check
             
         Returns:
-            ToxicityScore or None
+            ToxicityScore with the highest score per category across fields, or None
         """
-        # Combine all text for toxicity check
-        text_parts = []
+        # Score every field in one batch so long analyses aren't truncated as one input
+        scores = self.toxicity_filter.score_batch(list(self._iter_text_fields(analysis)))
+        return self._aggregate_toxicity(scores)
+    
+    async def _acheck_toxicity(self, analysis: Dict[str, Any]) -> Optional[ToxicityScore]:
+        """
+        Check all string fields for toxicity without blocking the event loop.
         
+        Args:
+            analysis: Analysis to check
+            
+        Returns:
+            ToxicityScore with the highest score per category across fields, or None
+        """
+        scores = await self.toxicity_filter.ascore_batch(list(self._iter_text_fields(analysis)))
+        return self._aggregate_toxicity(scores)
+    
+    @staticmethod
+    def _aggregate_toxicity(scores: List[ToxicityScore]) -> Optional[ToxicityScore]:
+        """
+        Combine per-field toxicity scores into one.
+        
+        Args:
+            scores: Per-field ToxicityScore objects
+            
+        Returns:
+            ToxicityScore with the highest score per category, or None if empty
+        """
+        if not scores:
+            return None
+        
+        return ToxicityScore(
+            toxicity=max(s.toxicity for s in scores),
+            severe_toxicity=max(s.severe_toxicity for s in scores),
+            obscene=max(s.obscene for s in scores),
+            threat=max(s.threat for s in scores),
+            insult=max(s.insult for s in scores),
+            identity_attack=max(s.identity_attack for s in scores),
+            is_toxic=any(s.is_toxic for s in scores)
+        )
+    
+    def _iter_text_fields(self, analysis: Dict[str, Any]) -> Iterator[str]:
+        """
+        Yield the summary, missing skills, and interview questions as strings.
+        
+        Skill names only need the model if they contain a trigger stem, so
+        the rest are left out.
+        
+        Args:
+            analysis: Analysis to read
+            
+        Yields:
+            Each field value converted to str
+        """
         if 'summary' in analysis:
-            text_parts.append(str(analysis['summary']))
+            yield str(analysis['summary'])
         
         if 'missing_skills' in analysis:
-            text_parts.extend([str(s) for s in analysis['missing_skills']])
+            yield from self.toxicity_filter.screen_keywords(
+                [str(skill) for skill in analysis['missing_skills']]
+            )
         
         if 'interview_questions' in analysis:
-            text_parts.extend([str(q) for q in analysis['interview_questions']])
-        
-        combined_text = " ".join(text_parts)
-        
-        return self.toxicity_filter.score(combined_text)
+            yield from map(str, analysis['interview_questions'])
     
     def redact_pii(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -183,8 +388,47 @@ class SafetyGuardrails:
         """
         # Run safety checks
         report = self.validate_analysis(analysis, schema_name)
+        return self._sanitize(analysis, report, schema_name, auto_redact), report
+    
+    async def avalidate_and_sanitize(
+        self,
+        analysis: Dict[str, Any],
+        schema_name: str = 'screening',
+        auto_redact: bool = True
+    ) -> tuple[Dict[str, Any], SafetyReport]:
+        """
+        Validate analysis concurrently and sanitize if needed.
         
-        # Sanitize if needed
+        Args:
+            analysis: Analysis to validate
+            schema_name: Schema to use
+            auto_redact: Whether to automatically redact PII
+            
+        Returns:
+            Tuple of (sanitized_analysis, safety_report)
+        """
+        report = await self.avalidate_analysis(analysis, schema_name)
+        return self._sanitize(analysis, report, schema_name, auto_redact), report
+    
+    def _sanitize(
+        self,
+        analysis: Dict[str, Any],
+        report: SafetyReport,
+        schema_name: str,
+        auto_redact: bool
+    ) -> Dict[str, Any]:
+        """
+        Apply PII redaction and validation fixes according to a report.
+        
+        Args:
+            analysis: Analysis to sanitize
+            report: Safety report for the analysis
+            schema_name: Schema to use
+            auto_redact: Whether to automatically redact PII
+            
+        Returns:
+            Sanitized copy of the analysis
+        """
         sanitized = analysis.copy()
         
         if auto_redact and report.pii_findings:
@@ -199,4 +443,4 @@ class SafetyGuardrails:
             )
             logger.info("Applied automatic fixes to validation errors")
         
-        return sanitized, report
+        return sanitized
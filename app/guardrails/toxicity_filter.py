@@ -2,20 +2,150 @@
 Toxicity filtering using Detoxify model.
 """
 
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import hashlib
 import logging
+import os
+import re
+import threading
+
+import numpy as np
+from cachetools import LRUCache
 
 try:
+    import torch
     from detoxify import Detoxify
     DETOXIFY_AVAILABLE = True
 except ImportError:
     DETOXIFY_AVAILABLE = False
     logging.warning("Detoxify not installed. Toxicity filtering will be disabled.")
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
 from app.guardrails.models import ToxicityScore
 
 logger = logging.getLogger(__name__)
 
+# Detoxify output labels, in ToxicityScore field order (toxicity first)
+TOXICITY_LABELS = ('toxicity', 'severe_toxicity', 'obscene', 'threat', 'insult', 'identity_attack')
+
+ONNX_CACHE_DIR = Path(os.getenv("TOXICITY_ONNX_DIR", Path.home() / ".cache" / "detoxify-onnx"))
+
+
+class _OnnxDetoxify:
+    """
+    Int8-quantized ONNX Runtime replacement for Detoxify.predict.
+    
+    Exports the Detoxify transformer to ONNX once, quantizes its weights
+    to int8, and serves predictions with the same dict-of-lists output
+    as Detoxify so callers don't need to change.
+    """
+    
+    def __init__(self, detoxify_model: "Detoxify", checkpoint: str = 'original'):
+        """
+        Build (or load) the quantized model.
+        
+        Args:
+            detoxify_model: Loaded Detoxify model to export
+            checkpoint: Detoxify checkpoint name, used for the cache file name
+        """
+        self.tokenizer = detoxify_model.tokenizer
+        self.class_names = list(detoxify_model.class_names)
+        
+        quantized_path = ONNX_CACHE_DIR / f"{checkpoint}-int8.onnx"
+        if not quantized_path.exists():
+            self._export(detoxify_model.model, quantized_path)
+        
+        self._ort_session = ort.InferenceSession(
+            str(quantized_path),
+            providers=["CPUExecutionProvider"]
+        )
+    
+    def _export(self, model, quantized_path: Path) -> None:
+        """
+        Export the transformer to ONNX and quantize it to int8.
+        
+        Args:
+            model: Underlying Hugging Face sequence classification model
+            quantized_path: Where to write the quantized model
+        """
+        import torch
+        
+        quantized_path.parent.mkdir(parents=True, exist_ok=True)
+        fp32_path = quantized_path.with_name(quantized_path.stem + "-fp32.onnx")
+        
+        sample = self.tokenizer(["example"], return_tensors="pt")
+        model.eval()
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(fp32_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=14
+        )
+        quantize_dynamic(str(fp32_path), str(quantized_path), weight_type=QuantType.QInt8)
+        fp32_path.unlink(missing_ok=True)
+        logger.info(f"Exported int8 ONNX toxicity model to {quantized_path}")
+    
+    def predict(self, texts: List[str]) -> Dict[str, List[float]]:
+        """
+        Score texts, matching Detoxify.predict's output for a list input.
+        
+        Args:
+            texts: Texts to score
+            
+        Returns:
+            Dictionary mapping each class name to one probability per text
+        """
+        encoded = self.tokenizer(texts, truncation=True, padding=False)
+        return self.predict_encoded(encoded["input_ids"])
+    
+    def predict_encoded(self, input_ids: List[List[int]]) -> Dict[str, List[float]]:
+        """
+        Score already-tokenized texts.
+        
+        Args:
+            input_ids: Unpadded token IDs per text
+            
+        Returns:
+            Dictionary mapping each class name to one probability per text
+        """
+        inputs = self.tokenizer.pad({"input_ids": input_ids}, return_tensors="np")
+        logits = self._ort_session.run(
+            None,
+            {
+                "input_ids": inputs["input_ids"].astype(np.int64),
+                "attention_mask": inputs["attention_mask"].astype(np.int64),
+            }
+        )[0]
+        probabilities = 1 / (1 + np.exp(-logits))
+        
+        return {
+            name: probabilities[:, i].tolist()
+            for i, name in enumerate(self.class_names)
+        }
+
 
 class ToxicityFilter:
     """
@@ -28,30 +158,105 @@ class ToxicityFilter:
     - Threats
     - Insults
     - Identity attacks
+    
+    Scores are cached by text hash, so repeated boilerplate (identical
+    summaries, recurring skill names) skips model inference. Short
+    strings and single identifier-like tokens (skill names, emails,
+    numbers) get neutral scores without inference unless they contain
+    a known trigger stem.
     """
     
     TOXICITY_THRESHOLD = 0.7  # 0-1 scale
+    MAX_SEQUENCE_TOKENS = 512  # BERT's position embedding limit
+    SCORE_CACHE_SIZE = 4096
+    MAX_BUCKET_SIZE = 32  # Texts per model call
+    MAX_BUCKET_TOKENS = 4096  # Padded tokens per model call
+    MIN_SCORING_CHARS = 8  # Shorter text skips the model unless it has a trigger stem
+    
+    # A single token made of identifier/email/number characters, e.g. "C++", "node.js"
+    _SAFE_TOKEN_RE = re.compile(r'^[A-Za-z0-9._\-@+#/]+$')
+    
+    # Stems that always send text to the model, however short or token-like
+    _TRIGGER_STEMS = (
+        'idiot', 'stupid', 'dumb', 'moron', 'retard', 'loser', 'ugly',
+        'hate', 'kill', 'die', 'fuck', 'shit', 'bitch', 'crap', 'damn',
+        'ass', 'bastard', 'suck', 'trash', 'scum'
+    )
+    _TRIGGER_AUTOMATON = None
+    
+    # Keys holding skill/agent name lists; only trigger-stem matches are scored
+    KEYWORD_LIST_KEYS = frozenset({'missing_skills', 'strengths', 'agents_used'})
     
-    def __init__(self, threshold: float = 0.7):
+    def __init__(self, threshold: float = 0.7, use_onnx: bool = False):
         """
         Initialize toxicity filter.
         
         Args:
             threshold: Toxicity threshold (0-1). Content above this is flagged.
+            use_onnx: Serve predictions from an int8-quantized ONNX Runtime
+                export of the model instead of PyTorch
         """
         self.threshold = threshold
         
+        # Single worker: inference runs off the event loop without concurrent torch calls
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="detoxify")
+        
+        self._score_cache: LRUCache = LRUCache(maxsize=self.SCORE_CACHE_SIZE)
+        self._score_cache_lock = threading.Lock()
+        
+        self.device = "cpu"
+        
         if DETOXIFY_AVAILABLE:
+            # The ONNX export runs on CPU, so only the PyTorch path uses the GPU
+            if not use_onnx:
+                self.device = os.getenv(
+                    "DETOXIFY_DEVICE",
+                    "cuda" if torch.cuda.is_available() else "cpu"
+                )
+            
             try:
-                self.model = Detoxify('original')
-                logger.info("Detoxify model loaded successfully")
+                self.model = Detoxify('original', device=self.device)
+                logger.info(f"Detoxify model loaded successfully (device: {self.device})")
             except Exception as e:
                 logger.error(f"Failed to load Detoxify model: {e}")
                 self.model = None
+            
+            if self.model and self.device.startswith("cuda"):
+                self._warm_up_gpu()
+            
+            if self.model and use_onnx:
+                self._use_onnx_model()
         else:
             self.model = None
             logger.warning("Detoxify not available, toxicity filtering disabled")
     
+    def _warm_up_gpu(self) -> None:
+        """Enable cuDNN autotuning and run one prediction so the first request isn't slow."""
+        torch.backends.cudnn.benchmark = True
+        try:
+            with self._inference_context():
+                self.model.predict(["warmup"])
+        except Exception as e:
+            logger.warning(f"Detoxify GPU warm-up failed: {e}")
+    
+    def _inference_context(self):
+        """FP16 autocast for PyTorch models on CUDA, otherwise a no-op context."""
+        if self.device.startswith("cuda") and isinstance(self.model, Detoxify):
+            return torch.autocast("cuda", dtype=torch.float16)
+        return nullcontext()
+    
+    def _use_onnx_model(self) -> None:
+        """Swap the PyTorch model for its int8 ONNX Runtime export, if possible."""
+        if not ONNXRUNTIME_AVAILABLE:
+            logger.warning("onnxruntime not installed, using PyTorch Detoxify model")
+            return
+        
+        try:
+            self.model = _OnnxDetoxify(self.model)
+            logger.info("Using int8-quantized ONNX toxicity model")
+        except Exception as e:
+            logger.error(f"Failed to build ONNX toxicity model, using PyTorch: {e}")
+    
     def score(self, text: str) -> Optional[ToxicityScore]:
         """
         Score text for toxicity.
@@ -65,34 +270,268 @@ class ToxicityFilter:
         if not text:
             return None
         
+        scores = self.score_batch([text])
+        return scores[0] if scores else None
+    
+    def score_batch(self, texts: List[str]) -> List[ToxicityScore]:
+        """
+        Score several texts with one Detoxify forward pass.
+        
+        Args:
+            texts: Texts to analyze; empty strings are skipped
+            
+        Returns:
+            One ToxicityScore per non-empty text, or an empty list if scoring failed
+        """
+        texts = [text for text in texts if text]
+        if not texts:
+            return []
+        
+        matrix = self.score_matrix(texts)
+        if matrix is None:
+            return []
+        
+        # Threshold every text in one comparison, convert each row in one call
+        is_toxic = (matrix[:, 0] > self.threshold).tolist()
+        return [
+            ToxicityScore.model_construct(**dict(zip(TOXICITY_LABELS, row)), is_toxic=toxic)
+            for row, toxic in zip(matrix.tolist(), is_toxic)
+        ]
+    
+    def score_matrix(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Score texts as a raw (texts x labels) array, without pydantic models.
+        
+        Columns follow TOXICITY_LABELS. Empty text, text skipped by the
+        pre-filter, and all text when the model is unavailable get zero rows.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            Array of shape (len(texts), len(TOXICITY_LABELS)), or None if scoring failed
+        """
+        matrix = np.zeros((len(texts), len(TOXICITY_LABELS)))
         if not self.model:
-            # Return neutral scores if model not available
-            return ToxicityScore(
-                toxicity=0.0,
-                severe_toxicity=0.0,
-                obscene=0.0,
-                threat=0.0,
-                insult=0.0,
-                identity_attack=0.0,
-                is_toxic=False
-            )
+            return matrix
         
-        try:
-            results = self.model.predict(text)
-            
-            return ToxicityScore(
-                toxicity=float(results['toxicity']),
-                severe_toxicity=float(results['severe_toxicity']),
-                obscene=float(results['obscene']),
-                threat=float(results['threat']),
-                insult=float(results['insult']),
-                identity_attack=float(results['identity_attack']),
-                is_toxic=float(results['toxicity']) > self.threshold
-            )
+        # None marks text that gets a zero row without inference
+        keys = [
+            self._score_cache_key(text) if text and self._needs_scoring(text) else None
+            for text in texts
+        ]
+        with self._score_cache_lock:
+            rows = {key: self._score_cache.get(key) for key in keys if key is not None}
         
-        except Exception as e:
-            logger.error(f"Toxicity scoring failed: {e}")
+        # Only run the model on texts not seen before (each distinct text once)
+        missing = {
+            key: text for key, text in zip(keys, texts)
+            if key is not None and rows[key] is None
+        }
+        
+        if missing:
+            try:
+                results = self._predict_bucketed(list(missing.values()))
+                values = np.column_stack([
+                    np.asarray(results[label], dtype=np.float64) for label in TOXICITY_LABELS
+                ])
+            except Exception as e:
+                logger.error(f"Batch toxicity scoring failed: {e}")
+                return None
+            
+            # Rows are cached as immutable tuples, so hits need no copying
+            new_rows = dict(zip(missing, map(tuple, values.tolist())))
+            rows.update(new_rows)
+            with self._score_cache_lock:
+                self._score_cache.update(new_rows)
+        
+        for i, key in enumerate(keys):
+            if key is not None:
+                matrix[i] = rows[key]
+        
+        return matrix
+    
+    def _needs_scoring(self, text: str) -> bool:
+        """
+        Decide whether text is worth a model call.
+        
+        Args:
+            text: Non-empty text to check
+            
+        Returns:
+            False for short, letter-free, or single token-like text without a trigger stem
+        """
+        if self._has_trigger_stem(text.lower()):
+            return True
+        
+        stripped = text.strip()
+        if len(stripped) < self.MIN_SCORING_CHARS:
+            return False
+        if not any(char.isalpha() for char in stripped):
+            return False
+        if self._SAFE_TOKEN_RE.match(stripped):
+            return False
+        
+        return True
+    
+    @classmethod
+    def _has_trigger_stem(cls, lowered: str) -> bool:
+        """
+        Check lowercased text for any trigger stem.
+        
+        Args:
+            lowered: Lowercased text
+            
+        Returns:
+            True if a trigger stem occurs anywhere in the text
+        """
+        if not AHOCORASICK_AVAILABLE:
+            return any(stem in lowered for stem in cls._TRIGGER_STEMS)
+        
+        if cls._TRIGGER_AUTOMATON is None:
+            automaton = ahocorasick.Automaton()
+            for stem in cls._TRIGGER_STEMS:
+                automaton.add_word(stem, stem)
+            automaton.make_automaton()
+            cls._TRIGGER_AUTOMATON = automaton
+        
+        return next(cls._TRIGGER_AUTOMATON.iter(lowered), None) is not None
+    
+    def _predict_bucketed(self, texts: List[str]) -> Dict[str, List[float]]:
+        """
+        Run the model on length-sorted sub-batches to limit padding.
+        
+        The tokenizer pads every text in a call to the longest one, so
+        mixing a long summary with short skill names wastes most of the
+        compute on padding tokens.
+        
+        Args:
+            texts: Texts to score
+            
+        Returns:
+            Dictionary mapping each class name to one score per text, in input order
+        """
+        # Tokenize once; the IDs give the lengths and are reused for inference
+        input_ids = self._encode(texts)
+        if input_ids is None:
+            lengths = [len(text) for text in texts]
+        else:
+            lengths = [len(ids) for ids in input_ids]
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+        
+        results: Dict[str, List[float]] = {}
+        bucket: List[int] = []
+        
+        def flush() -> None:
+            with self._inference_context():
+                if input_ids is None:
+                    bucket_results = self.model.predict([texts[i] for i in bucket])
+                else:
+                    bucket_results = self._predict_encoded([input_ids[i] for i in bucket])
+            for name, values in bucket_results.items():
+                column = results.setdefault(name, [0.0] * len(texts))
+                for i, value in zip(bucket, values):
+                    column[i] = value
+            bucket.clear()
+        
+        for i in order:
+            # Sorted order means lengths[i] is the bucket's padded length
+            if bucket and (
+                len(bucket) >= self.MAX_BUCKET_SIZE
+                or (len(bucket) + 1) * lengths[i] > self.MAX_BUCKET_TOKENS
+            ):
+                flush()
+            bucket.append(i)
+        flush()
+        
+        return results
+    
+    def _encode(self, texts: List[str]) -> Optional[List[List[int]]]:
+        """
+        Tokenize texts without padding.
+        
+        Args:
+            texts: Texts to tokenize
+            
+        Returns:
+            Token IDs per text, or None if the model can't score pre-tokenized input
+        """
+        if not isinstance(self.model, _OnnxDetoxify) and not (
+            DETOXIFY_AVAILABLE and isinstance(self.model, Detoxify)
+        ):
             return None
+        
+        encoded = self.model.tokenizer(
+            texts,
+            truncation=True,
+            max_length=self.MAX_SEQUENCE_TOKENS,
+            padding=False
+        )
+        return encoded['input_ids']
+    
+    def _predict_encoded(self, input_ids: List[List[int]]) -> Dict[str, List[float]]:
+        """
+        Score pre-tokenized texts, skipping Detoxify's own tokenization.
+        
+        Args:
+            input_ids: Unpadded token IDs per text
+            
+        Returns:
+            Dictionary mapping each class name to one probability per text
+        """
+        if isinstance(self.model, _OnnxDetoxify):
+            return self.model.predict_encoded(input_ids)
+        
+        inputs = self.model.tokenizer.pad({'input_ids': input_ids}, return_tensors='pt')
+        inputs = inputs.to(self.model.device)
+        
+        with torch.no_grad():
+            logits = self.model.model(**inputs)[0]
+        probabilities = torch.sigmoid(logits).float().cpu().numpy()
+        
+        return {
+            name: probabilities[:, i]
+            for i, name in enumerate(self.model.class_names)
+        }
+    
+    @staticmethod
+    def _score_cache_key(text: str) -> bytes:
+        """
+        Build the score cache key for a text.
+        
+        Args:
+            text: Text being scored
+            
+        Returns:
+            16-byte BLAKE2b digest of the text
+        """
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    
+    async def ascore(self, text: str) -> Optional[ToxicityScore]:
+        """
+        Score text for toxicity without blocking the event loop.
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            ToxicityScore object or None if model unavailable
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.score, text)
+    
+    async def ascore_batch(self, texts: List[str]) -> List[ToxicityScore]:
+        """
+        Score several texts without blocking the event loop.
+        
+        Args:
+            texts: Texts to analyze; empty strings are skipped
+            
+        Returns:
+            One ToxicityScore per non-empty text, or an empty list if scoring failed
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.score_batch, texts)
     
     def filter(self, text: str) -> str:
         """
@@ -107,40 +546,111 @@ class ToxicityFilter:
         Raises:
             ToxicContentError: If content is toxic
         """
-        score = self.score(text)
+        is_toxic, toxicity = self._toxicity_check(text)
         
-        if score and score.is_toxic:
+        if is_toxic:
             raise ToxicContentError(
-                f"Toxic content detected (score: {score.toxicity:.2f})"
+                f"Toxic content detected (score: {toxicity:.2f})"
             )
         
         return text
     
-    def score_dict(self, data: dict) -> dict:
+    def _toxicity_check(self, text: str) -> Tuple[bool, float]:
+        """
+        Decide pass/fail for one text without building a ToxicityScore for the caller.
+        
+        Safe-looking text and cache hits return without constructing a
+        score; only a cache miss runs the model.
+        
+        Args:
+            text: Text to check
+            
+        Returns:
+            (is_toxic, toxicity) for the text
+        """
+        if not text or not self.model or not self._needs_scoring(text):
+            return False, 0.0
+        
+        with self._score_cache_lock:
+            row = self._score_cache.get(self._score_cache_key(text))
+        
+        if row is None:
+            matrix = self.score_matrix([text])
+            if matrix is None:
+                return False, 0.0
+            row = matrix[0]
+        
+        toxicity = float(row[0])
+        return toxicity > self.threshold, toxicity
+    
+    def score_dict(self, data: dict, skip_keys: Optional[frozenset] = None) -> dict:
         """
         Score all string values in a dictionary.
         
+        Nested dicts, lists, and tuples are walked too; their strings are
+        keyed by path, e.g. "interview_questions[0]" or "profile.summary".
+        
         Args:
             data: Dictionary to score
+            skip_keys: Top-level keys whose strings are only scored if they
+                contain a trigger stem (default: KEYWORD_LIST_KEYS)
             
         Returns:
             Dictionary mapping keys to toxicity scores
         """
-        scores = {}
+        if skip_keys is None:
+            skip_keys = self.KEYWORD_LIST_KEYS
         
+        # Collect (path, text) pairs in one walk, then score them all in one batch
+        paths = []
+        texts = []
         for key, value in data.items():
-            if isinstance(value, str):
-                score = self.score(value)
-                if score:
-                    scores[key] = score
-            elif isinstance(value, list):
-                for i, item in enumerate(value):
-                    if isinstance(item, str):
-                        score = self.score(item)
-                        if score:
-                            scores[f"{key}[{i}]"] = score
-        
-        return scores
+            for path, text in self._iter_strings(value, key):
+                if key in skip_keys and not self._has_trigger_stem(text.lower()):
+                    continue
+                paths.append(path)
+                texts.append(text)
+        
+        return dict(zip(paths, self.score_batch(texts)))
+    
+    def screen_keywords(self, keywords: List[str]) -> List[str]:
+        """
+        Keep only the keywords that need model scoring.
+        
+        Skill and agent names are structurally safe, so a trigger-stem
+        match decides whether they are worth a model call at all.
+        
+        Args:
+            keywords: Short keyword strings such as skill names
+            
+        Returns:
+            Keywords containing a trigger stem, in input order
+        """
+        return [keyword for keyword in keywords if self._has_trigger_stem(keyword.lower())]
+    
+    @classmethod
+    def _iter_strings(cls, obj: Any, prefix: Optional[str] = None) -> Iterator[Tuple[Any, str]]:
+        """
+        Yield every non-empty string in a nested structure with its path.
+        
+        Args:
+            obj: Dict, list, tuple, or string to walk
+            prefix: Path of obj within the top-level dict (None at the top)
+            
+        Yields:
+            (path, text) tuples; top-level dict keys are yielded unchanged
+        """
+        obj_type = type(obj)
+        
+        if obj_type is str or isinstance(obj, str):
+            if obj:
+                yield prefix, obj
+        elif obj_type is dict or isinstance(obj, dict):
+            for key, value in obj.items():
+                yield from cls._iter_strings(value, key if prefix is None else f"{prefix}.{key}")
+        elif obj_type is list or obj_type is tuple or isinstance(obj, (list, tuple)):
+            for i, item in enumerate(obj):
+                yield from cls._iter_strings(item, f"{prefix}[{i}]")
 
 
 class ToxicContentError(Exception):
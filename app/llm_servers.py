@@ -0,0 +1,615 @@
+"""
+Direct clients for LLM and embedding servers.
+
+Talk to llama.cpp's ``llama-server``, HuggingFace text-generation-inference
+(TGI), text-embeddings-inference (TEI) and the OpenAI API directly instead
+of through Ollama or LangChain's chat models. JSON output is constrained
+by a schema the server compiles to a grammar once per schema (no
+trailing-whitespace decode tail).
+"""
+
+import queue
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+# Connection pool for LLM HTTP clients, sized so concurrent requests are not
+# queued client-side (httpx defaults to 20 keep-alive connections)
+LLM_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+
+class LlamaCppLLM(Runnable):
+    """
+    Runnable that sends prompts to llama-server's ``/completion`` endpoint.
+    
+    Returns the generated text as a string, so it composes into
+    prompt | llm chains like the LangChain chat models.
+    """
+    
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8080",
+        json_schema: Optional[Dict[str, Any]] = None,
+        n_predict: int = 1024,
+        temperature: float = 0.3,
+        timeout: float = 120.0
+    ):
+        """
+        Initialize the client.
+        
+        Args:
+            base_url: llama-server base URL
+            json_schema: JSON schema the output must follow (None for free text)
+            n_predict: Maximum tokens to generate
+            temperature: Sampling temperature
+            timeout: Request timeout in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = f"llamacpp@{self.base_url}"
+        
+        # Request options are fixed per client, so build them once
+        self._options: Dict[str, Any] = {
+            "n_predict": n_predict,
+            "temperature": temperature,
+            "cache_prompt": True,
+        }
+        if json_schema is not None:
+            self._options["json_schema"] = json_schema
+        
+        self._client = httpx.Client(base_url=self.base_url, timeout=timeout)
+        self._async_client = httpx.AsyncClient(
+            base_url=self.base_url, timeout=timeout, limits=LLM_HTTP_LIMITS
+        )
+        logger.info(f"LlamaCppLLM initialized ({self.base_url})")
+    
+    def _payload(self, input: Any, overrides: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the /completion request body for a prompt, applying per-call options."""
+        prompt = input.to_string() if isinstance(input, PromptValue) else str(input)
+        return {"prompt": prompt, **self._options, **overrides}
+    
+    @staticmethod
+    def _content(response: httpx.Response) -> str:
+        """Extract the generated text, raising on HTTP errors."""
+        response.raise_for_status()
+        return response.json()["content"]
+    
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> str:
+        """
+        Generate a completion.
+        
+        Args:
+            input: Prompt value or string
+            config: Optional runnable config (unused)
+            **kwargs: Per-call request options (e.g. json_schema, n_predict),
+                usually bound with .bind()
+        
+        Returns:
+            Generated text
+        """
+        payload = self._payload(input, kwargs)
+        return self._content(self._client.post("/completion", json=payload))
+    
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> str:
+        """
+        Generate a completion without blocking the event loop.
+        
+        Args:
+            input: Prompt value or string
+            config: Optional runnable config (unused)
+            **kwargs: Per-call request options (e.g. json_schema, n_predict),
+                usually bound with .bind()
+        
+        Returns:
+            Generated text
+        """
+        payload = self._payload(input, kwargs)
+        response = await self._async_client.post("/completion", json=payload)
+        return self._content(response)
+    
+    @staticmethod
+    def _slot_request(action: str, filename: str, slot_id: int) -> Dict[str, Any]:
+        """Build the POST /slots/{id} request for a save or restore."""
+        return {
+            "url": f"/slots/{slot_id}",
+            "params": {"action": action},
+            "json": {"filename": filename},
+        }
+    
+    async def save_slot(self, filename: str, slot_id: int = 0) -> None:
+        """
+        Save a slot's KV cache to a file on the server.
+        
+        Requires llama-server to be started with --slot-save-path.
+        
+        Args:
+            filename: File name under the server's slot save path
+            slot_id: Slot to save
+        """
+        response = await self._async_client.post(**self._slot_request("save", filename, slot_id))
+        response.raise_for_status()
+    
+    async def restore_slot(self, filename: str, slot_id: int = 0) -> bool:
+        """
+        Restore a slot's KV cache from a file saved with save_slot().
+        
+        Args:
+            filename: File name under the server's slot save path
+            slot_id: Slot to restore into
+        
+        Returns:
+            True if the cache was restored, False if the server couldn't load it
+        """
+        response = await self._async_client.post(**self._slot_request("restore", filename, slot_id))
+        return response.is_success
+    
+    def save_slot_sync(self, filename: str, slot_id: int = 0) -> None:
+        """Blocking version of save_slot()."""
+        response = self._client.post(**self._slot_request("save", filename, slot_id))
+        response.raise_for_status()
+    
+    def restore_slot_sync(self, filename: str, slot_id: int = 0) -> bool:
+        """Blocking version of restore_slot()."""
+        response = self._client.post(**self._slot_request("restore", filename, slot_id))
+        return response.is_success
+    
+    def slot_count(self) -> Optional[int]:
+        """
+        Ask the server how many slots (parallel sequences, -np) it runs.
+        
+        Returns:
+            Number of slots, or None if the server doesn't expose /slots
+        """
+        try:
+            response = self._client.get("/slots")
+            response.raise_for_status()
+            return len(response.json()) or None
+        except (httpx.HTTPError, ValueError, TypeError) as e:
+            logger.warning(f"Could not read llama-server slots: {e}")
+            return None
+    
+    async def aclose(self) -> None:
+        """Close the HTTP connection pools."""
+        self._client.close()
+        await self._async_client.aclose()
+
+
+class LlamaCppSlotCache(Runnable):
+    """
+    Persists llama-server KV caches per prompt prefix (e.g. per job description).
+    
+    Each call names a cache key. The first call for a key saves the slot's
+    KV cache to a file; later calls (in this or another process, or after a
+    server restart) restore it, so the shared prefix isn't prefilled again.
+    Requires llama-server's --slot-save-path to point at cache_dir (e.g. a
+    shared volume); the least recently used files are deleted once the
+    directory exceeds max_bytes.
+    """
+    
+    def __init__(
+        self,
+        llm: LlamaCppLLM,
+        cache_dir: Path,
+        slots: Optional[int] = None,
+        max_bytes: int = 2 << 30
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            llm: llama.cpp client to run prompts on
+            cache_dir: Local path of the server's --slot-save-path
+            slots: Number of server slots (llama-server -np) to use; read
+                from the server's /slots endpoint when None. At most this
+                many requests run at once through the cache.
+            max_bytes: Size budget for cache files
+        """
+        self.llm = llm
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        
+        if slots is None:
+            slots = llm.slot_count() or 1
+        
+        # Slots are handed out one request at a time so a restore can't
+        # clobber a slot that is mid-generation. A thread-safe queue, since
+        # invoke() may run in worker threads alongside ainvoke()
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        for slot_id in range(slots):
+            self._free_slots.put_nowait(slot_id)
+        # Futures of ainvoke() calls waiting for a slot, woken on release.
+        # Slots are only ever taken with get_nowait() on the event loop, so
+        # a cancelled waiter can't strand one
+        self._waiters: set = set()
+        self._waiters_lock = threading.Lock()
+        # Cache key whose prefix each slot currently holds
+        self._slot_keys: Dict[int, str] = {}
+        # Keys being saved by an in-flight request, so concurrent first
+        # requests for a key don't all write the same file
+        self._saving: set = set()
+        self._saving_lock = threading.Lock()
+        logger.info(f"LlamaCppSlotCache initialized ({self.cache_dir}, {slots} slots)")
+    
+    def _claim_save(self, cache_key: str) -> bool:
+        """Reserve saving a key's cache file; False if another request is saving it."""
+        with self._saving_lock:
+            if cache_key in self._saving:
+                return False
+            self._saving.add(cache_key)
+            return True
+    
+    def _release(self, slot_id: int, saved_key: Optional[str]) -> None:
+        """Return a slot to the pool and drop the save reservation, if any."""
+        if saved_key is not None:
+            with self._saving_lock:
+                self._saving.discard(saved_key)
+        self._free_slots.put_nowait(slot_id)
+        
+        # Wake every async waiter; they race for the slot with get_nowait()
+        # and the losers wait again
+        with self._waiters_lock:
+            waiters = list(self._waiters)
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(self._wake, waiter)
+    
+    @staticmethod
+    def _wake(waiter: asyncio.Future) -> None:
+        """Resolve a waiter's future unless it is already done (or cancelled)."""
+        if not waiter.done():
+            waiter.set_result(None)
+    
+    async def _acquire_slot(self) -> int:
+        """
+        Wait for a free slot without blocking the event loop or a thread.
+        
+        Returns:
+            Slot id; the caller must hand it back with _release()
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            waiter = (loop, loop.create_future())
+            # Register before checking, so a release in between still wakes us
+            with self._waiters_lock:
+                self._waiters.add(waiter)
+            try:
+                try:
+                    return self._free_slots.get_nowait()
+                except queue.Empty:
+                    pass
+                await waiter[1]
+            finally:
+                with self._waiters_lock:
+                    self._waiters.discard(waiter)
+    
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> str:
+        """
+        Generate a completion, reusing the saved KV cache for the key.
+        
+        Blocks until a slot is free; see ainvoke().
+        """
+        cache_key = kwargs.pop("cache_key")
+        filename = f"{cache_key}.bin"
+        path = self.cache_dir / filename
+        
+        slot_id = self._free_slots.get()
+        needs_save = False
+        try:
+            if self._slot_keys.get(slot_id) != cache_key:
+                if path.exists() and self.llm.restore_slot_sync(filename, slot_id):
+                    path.touch()
+                else:
+                    needs_save = self._claim_save(cache_key)
+            
+            result = self.llm.invoke(input, config, id_slot=slot_id, **kwargs)
+            self._slot_keys[slot_id] = cache_key
+            
+            if needs_save:
+                try:
+                    self.llm.save_slot_sync(filename, slot_id)
+                    self._evict()
+                except Exception as e:
+                    logger.warning(f"Failed to save prompt cache {filename}: {e}")
+            return result
+        finally:
+            self._release(slot_id, cache_key if needs_save else None)
+    
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> str:
+        """
+        Generate a completion, reusing the saved KV cache for the key.
+        
+        Args:
+            input: Prompt value or string
+            config: Optional runnable config (unused)
+            **kwargs: cache_key (required, e.g. bound with .bind()) plus
+                per-call request options for the llama.cpp client
+        
+        Returns:
+            Generated text
+        """
+        cache_key = kwargs.pop("cache_key")
+        filename = f"{cache_key}.bin"
+        path = self.cache_dir / filename
+        
+        slot_id = await self._acquire_slot()
+        needs_save = False
+        try:
+            if self._slot_keys.get(slot_id) != cache_key:
+                if path.exists() and await self.llm.restore_slot(filename, slot_id):
+                    path.touch()
+                else:
+                    needs_save = self._claim_save(cache_key)
+            
+            result = await self.llm.ainvoke(input, config, id_slot=slot_id, **kwargs)
+            self._slot_keys[slot_id] = cache_key
+            
+            if needs_save:
+                try:
+                    await self.llm.save_slot(filename, slot_id)
+                    self._evict()
+                except Exception as e:
+                    logger.warning(f"Failed to save prompt cache {filename}: {e}")
+            return result
+        finally:
+            self._release(slot_id, cache_key if needs_save else None)
+    
+    def _evict(self) -> None:
+        """Delete the least recently used cache files until under max_bytes."""
+        files = sorted(self.cache_dir.glob("*.bin"), key=lambda f: f.stat().st_mtime)
+        total = sum(f.stat().st_size for f in files)
+        
+        for file in files:
+            if total <= self.max_bytes:
+                break
+            total -= file.stat().st_size
+            file.unlink(missing_ok=True)
+            logger.debug(f"Evicted prompt cache {file.name}")
+    
+    async def aclose(self) -> None:
+        """Close the underlying client."""
+        await self.llm.aclose()
+
+
+class TGILLM(Runnable):
+    """
+    Runnable that sends prompts to a text-generation-inference ``/generate`` endpoint.
+    
+    Returns the generated text as a string, so it composes into
+    prompt | llm chains like the LangChain chat models.
+    """
+    
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8081",
+        json_schema: Optional[Dict[str, Any]] = None,
+        max_new_tokens: int = 1024,
+        temperature: float = 0.3,
+        timeout: float = 120.0
+    ):
+        """
+        Initialize the client.
+        
+        Args:
+            base_url: TGI base URL
+            json_schema: JSON schema the output must follow (None for free text)
+            max_new_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            timeout: Request timeout in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = f"tgi@{self.base_url}"
+        
+        self._parameters: Dict[str, Any] = {
+            "max_new_tokens": max_new_tokens,
+            "temperature": temperature,
+        }
+        if json_schema is not None:
+            self._parameters["grammar"] = {"type": "json", "value": json_schema}
+        
+        self._client = httpx.Client(base_url=self.base_url, timeout=timeout)
+        self._async_client = httpx.AsyncClient(
+            base_url=self.base_url, timeout=timeout, limits=LLM_HTTP_LIMITS
+        )
+        logger.info(f"TGILLM initialized ({self.base_url})")
+    
+    def _payload(self, input: Any, overrides: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the /generate request body for a prompt, applying per-call parameters."""
+        prompt = input.to_string() if isinstance(input, PromptValue) else str(input)
+        parameters = {**self._parameters, **overrides}
+        json_schema = parameters.pop("json_schema", None)
+        if json_schema is not None:
+            parameters["grammar"] = {"type": "json", "value": json_schema}
+        return {"inputs": prompt, "parameters": parameters}
+    
+    @staticmethod
+    def _content(response: httpx.Response) -> str:
+        """Extract the generated text, raising on HTTP errors."""
+        response.raise_for_status()
+        return response.json()["generated_text"]
+    
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> str:
+        """
+        Generate a completion.
+        
+        Args:
+            input: Prompt value or string
+            config: Optional runnable config (unused)
+            **kwargs: Per-call request options (e.g. json_schema, max_new_tokens),
+                usually bound with .bind()
+        
+        Returns:
+            Generated text
+        """
+        payload = self._payload(input, kwargs)
+        return self._content(self._client.post("/generate", json=payload))
+    
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> str:
+        """
+        Generate a completion without blocking the event loop.
+        
+        Args:
+            input: Prompt value or string
+            config: Optional runnable config (unused)
+            **kwargs: Per-call request options (e.g. json_schema, max_new_tokens),
+                usually bound with .bind()
+        
+        Returns:
+            Generated text
+        """
+        payload = self._payload(input, kwargs)
+        response = await self._async_client.post("/generate", json=payload)
+        return self._content(response)
+    
+    async def aclose(self) -> None:
+        """Close the HTTP connection pools."""
+        self._client.close()
+        await self._async_client.aclose()
+
+
+class TEIEmbeddings:
+    """
+    Embedding client for a text-embeddings-inference ``/embed`` endpoint.
+    
+    Exposes generate_batch_embeddings() like the project EmbeddingService,
+    so it can be passed to SemanticCache in its place.
+    """
+    
+    def __init__(self, base_url: str = "http://localhost:8082", timeout: float = 30.0):
+        """
+        Initialize the client.
+        
+        Args:
+            base_url: TEI base URL
+            timeout: Request timeout in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.Client(base_url=self.base_url, timeout=timeout)
+        logger.info(f"TEIEmbeddings initialized ({self.base_url})")
+    
+    def generate_batch_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a batch of texts in one request.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            One embedding per text
+        """
+        response = self._client.post("/embed", json={"inputs": texts, "truncate": True})
+        response.raise_for_status()
+        return response.json()
+    
+    def close(self) -> None:
+        """Close the HTTP connection pool."""
+        self._client.close()
+
+
+class OpenAIChatLLM(Runnable):
+    """
+    Runnable that calls the OpenAI chat completions API with Structured Outputs.
+    
+    Uses the openai SDK directly, without LangChain's chat model layer, and
+    returns the message content as a string so it composes into
+    prompt | llm chains.
+    """
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-mini",
+        json_schema: Optional[Dict[str, Any]] = None,
+        schema_name: str = "response",
+        temperature: float = 0.3
+    ):
+        """
+        Initialize the client.
+        
+        Args:
+            api_key: OpenAI API key
+            model: Chat model name
+            json_schema: Strict JSON schema the output must follow (None for free text)
+            schema_name: Name reported for the schema
+            temperature: Sampling temperature
+        """
+        self.model = model
+        self.schema_name = schema_name
+        self.json_schema = json_schema
+        self.temperature = temperature
+        
+        self._client = OpenAI(api_key=api_key)
+        self._async_client = AsyncOpenAI(
+            api_key=api_key, http_client=httpx.AsyncClient(limits=LLM_HTTP_LIMITS)
+        )
+        logger.info(f"OpenAIChatLLM initialized ({model})")
+    
+    def _request(self, input: Any, overrides: Dict[str, Any]) -> Dict[str, Any]:
+        """Build chat completion arguments for a prompt, applying per-call options."""
+        prompt = input.to_string() if isinstance(input, PromptValue) else str(input)
+        options = dict(overrides)
+        json_schema = options.pop("json_schema", self.json_schema)
+        
+        request = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature,
+            **options,
+        }
+        if json_schema is not None:
+            request["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": self.schema_name, "strict": True, "schema": json_schema},
+            }
+        return request
+    
+    @staticmethod
+    def _content(completion: Any) -> str:
+        """Extract the generated text, raising if the model refused."""
+        message = completion.choices[0].message
+        if getattr(message, "refusal", None):
+            raise ValueError(f"Model refused to respond: {message.refusal}")
+        return message.content
+    
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> str:
+        """
+        Generate a completion.
+        
+        Args:
+            input: Prompt value or string
+            config: Optional runnable config (unused)
+            **kwargs: Per-call options (e.g. json_schema, max_tokens),
+                usually bound with .bind()
+        
+        Returns:
+            Generated text
+        """
+        completion = self._client.chat.completions.create(**self._request(input, kwargs))
+        return self._content(completion)
+    
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> str:
+        """
+        Generate a completion without blocking the event loop.
+        
+        Args:
+            input: Prompt value or string
+            config: Optional runnable config (unused)
+            **kwargs: Per-call options (e.g. json_schema, max_tokens),
+                usually bound with .bind()
+        
+        Returns:
+            Generated text
+        """
+        completion = await self._async_client.chat.completions.create(**self._request(input, kwargs))
+        return self._content(completion)
+    
+    async def aclose(self) -> None:
+        """Close the HTTP connection pools."""
+        self._client.close()
+        await self._async_client.aclose()
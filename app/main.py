@@ -1,14 +1,11 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 from dotenv import load_dotenv
 import os
+import asyncio
 import logging
 
-# LangSmith imports for tracing
-from langsmith import traceable
-from langsmith import Client as LangSmithClient
-
 from app.models import (
     ScreeningRequest,
     ScreeningResponse,
@@ -19,20 +16,23 @@ from app.models import (
     DetailedAnalysis,
     CandidateMatchInfo
 )
-from app.screening_service import ResumeScreeningService
+from app.screening_service import ResumeScreeningService, get_screening_service
 from app.agents.session_manager import SessionManager
 from app.agents.conversational_agent import ConversationalAgent
 from app.agents.conversation_state import ConversationMessage, ConversationIntent
+from app.request_context import request_id_var, configure_logging, sanitize_request_id
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging; every line carries the per-request correlation ID
+configure_logging(os.getenv("LOG_LEVEL", "INFO"))
 logger = logging.getLogger(__name__)
 
 # Initialize LangSmith client (optional - graceful degradation if not configured)
 try:
     if os.getenv("LANGCHAIN_TRACING_V2", "false").lower() == "true":
+        from langsmith import Client as LangSmithClient
         langsmith_client = LangSmithClient()
         logger.info("✓ LangSmith tracing enabled")
     else:
@@ -59,65 +59,93 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """Attach a correlation ID to the request for logging."""
+    request_id = sanitize_request_id(request.headers.get("X-Request-ID", ""))
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 # Initialize Prometheus metrics
 Instrumentator().instrument(app).expose(app)
 
-# Initialize the screening service
-screening_service = ResumeScreeningService()
-
 # Initialize session manager for conversations
 redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-session_manager = SessionManager(redis_url=redis_url, ttl_hours=24)
+session_manager = SessionManager(
+    redis_url=redis_url,
+    ttl_hours=24,
+    cache_ttl_seconds=int(os.getenv("SESSION_CACHE_TTL_SECONDS", "60"))
+)
 
-# Initialize multi-agent orchestrator (lazy loading)
+# Multi-agent orchestrator and conversational agent (built at startup)
 _orchestrator = None
 _conversational_agent = None
+_warmup_task = None
+
+
+def _build_llm(openai_temperature: float):
+    """
+    Build the chat model for the configured LLM provider.
+    
+    The provider SDKs are imported here so that importing this module
+    (e.g. in tests) doesn't pay for them.
+    
+    Args:
+        openai_temperature: Sampling temperature when using OpenAI
+    
+    Returns:
+        ChatOllama or ChatOpenAI instance
+    """
+    llm_provider = os.getenv("LLM_PROVIDER", "ollama").lower()
+    
+    if llm_provider == "ollama":
+        from langchain_ollama import ChatOllama
+        return ChatOllama(
+            model=os.getenv("OLLAMA_MODEL", "llama3.2"),
+            base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
+            keep_alive=os.getenv("LLM_KEEP_ALIVE", "30m")
+        )
+    
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        temperature=openai_temperature
+    )
 
 
 def get_orchestrator():
-    """Lazy load the orchestrator to avoid import issues."""
+    """Return the orchestrator, building it on first use if startup didn't."""
     global _orchestrator
     if _orchestrator is None:
         from app.agents.orchestrator import RecruitmentOrchestrator
-        from langchain_ollama import ChatOllama
-        from langchain_openai import ChatOpenAI
-        
-        llm_provider = os.getenv("LLM_PROVIDER", "ollama").lower()
         
-        if llm_provider == "ollama":
-            llm = ChatOllama(
-                model=os.getenv("OLLAMA_MODEL", "llama3.2"),
-                base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-            )
-        else:
-            llm = ChatOpenAI(
-                model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-                temperature=0.3
-            )
-        
-        _orchestrator = RecruitmentOrchestrator(llm)
+        _orchestrator = RecruitmentOrchestrator(_build_llm(openai_temperature=0.3))
     
     return _orchestrator
 
 
 def get_conversational_agent():
-    """Lazy load the conversational agent."""
+    """Return the conversational agent, building it on first use if startup didn't."""
     global _conversational_agent
     if _conversational_agent is None:
-        from langchain_ollama import ChatOllama
-        from langchain_openai import ChatOpenAI
+        # Higher temperature for more conversational responses
+        llm = _build_llm(openai_temperature=0.7)
         
-        llm_provider = os.getenv("LLM_PROVIDER", "ollama").lower()
-        
-        if llm_provider == "ollama":
-            llm = ChatOllama(
-                model=os.getenv("OLLAMA_MODEL", "llama3.2"),
-                base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-            )
-        else:
-            llm = ChatOpenAI(
-                model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-                temperature=0.7  # Higher temperature for more conversational responses
+        # Optionally coalesce concurrent chat LLM calls into batches
+        batch_window_ms = int(os.getenv("LLM_BATCH_WINDOW_MS", "0"))
+        if batch_window_ms > 0:
+            from app.agents.llm_batcher import BatchedLLM
+            llm = BatchedLLM(
+                llm,
+                window_ms=batch_window_ms,
+                max_batch=int(os.getenv("LLM_MAX_BATCH", "16"))
             )
         
         _conversational_agent = ConversationalAgent(llm)
@@ -125,11 +153,45 @@ def get_conversational_agent():
     return _conversational_agent
 
 
+@app.on_event("startup")
+async def warm_up_agents():
+    """Build the screening service and agents, and start warming the LLM prompt cache."""
+    global _warmup_task
+    
+    if os.getenv("APP_SKIP_HEAVY_INIT"):
+        # Tests that only exercise routes skip the screening service and
+        # agents; they are built on first use instead
+        return
+    
+    # Build the shared screening service up front so config errors surface at startup
+    screening_service = get_screening_service()
+    
+    if os.getenv("LLM_WARMUP", "true").lower() == "true":
+        # Prefill the prompt cache in the background; startup doesn't wait on the LLM
+        _warmup_task = asyncio.create_task(screening_service.warmup())
+    
+    try:
+        get_orchestrator()
+        get_conversational_agent()
+        logger.info("✓ Agents initialized")
+    except Exception as e:
+        # Fall back to building on first request
+        logger.warning(f"Agent warm-up failed, will retry on first request: {e}")
+
+
+@app.on_event("shutdown")
+async def close_screening_service():
+    """Close the screening service's connection pools if it was built."""
+    if get_screening_service.cache_info().currsize:
+        await get_screening_service().aclose()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
     return {
         "status": "healthy",
+        "ready": _orchestrator is not None,
         "service": "AI Resume Screening Service",
         "version": "2.0.0",
         "features": ["single-llm-analysis", "multi-agent-orchestration"]
@@ -137,12 +199,16 @@ async def root():
 
 
 @app.post("/analyze", response_model=ScreeningResponse)
-async def analyze_resume(request: ScreeningRequest) -> ScreeningResponse:
+async def analyze_resume(
+    request: ScreeningRequest,
+    screening_service: ResumeScreeningService = Depends(get_screening_service)
+) -> ScreeningResponse:
     """
     Analyze a resume against a job description (single LLM call).
 
     Args:
         request: ScreeningRequest containing job_description and resume_text
+        screening_service: Shared screening service (injected)
 
     Returns:
         ScreeningResponse with structured evaluation including:
@@ -224,15 +290,16 @@ async def agent_analyze(request: AgentAnalysisRequest) -> AgentAnalysisResponse:
                 job_id=request.job_id
             )
             
-            # Convert to response model
-            response = AgentAnalysisResponse(
+            # Convert to response model; the agent results are already validated
+            # pydantic models, so build the response without re-validating them
+            response = AgentAnalysisResponse.model_construct(
                 match_score=result.match_score,
                 summary=result.summary,
                 missing_skills=result.missing_skills,
                 interview_questions=result.interview_questions,
-                detailed_analysis=DetailedAnalysis(**result.detailed_analysis.model_dump()) if result.detailed_analysis else None,
+                detailed_analysis=DetailedAnalysis.model_construct(**dict(result.detailed_analysis)) if result.detailed_analysis else None,
                 retrieved_candidates=[
-                    CandidateMatchInfo(
+                    CandidateMatchInfo.model_construct(
                         candidate_id=c.candidate_id,
                         name=c.name,
                         email=c.email,
@@ -240,11 +307,11 @@ async def agent_analyze(request: AgentAnalysisRequest) -> AgentAnalysisResponse:
                     ) for c in result.retrieved_candidates
                 ],
                 agent_traces=[
-                    AgentTraceInfo(
+                    AgentTraceInfo.model_construct(
                         agent_name=trace.agent_name,
                         reasoning=trace.reasoning,
                         tools_called=[
-                            ToolCallInfo(
+                            ToolCallInfo.model_construct(
                                 tool_name=tc.tool_name,
                                 execution_time_ms=tc.execution_time_ms,
                                 success=tc.error is None
@@ -284,10 +351,9 @@ async def agent_analyze(request: AgentAnalysisRequest) -> AgentAnalysisResponse:
 
 # Import and register chat router
 from app.chat_endpoints import create_chat_router
-from app.agents.conversation_state import ConversationContext
 
-# Create and include chat router
-chat_router = create_chat_router(session_manager, get_conversational_agent())
+# Create and include chat router; the agent is built by the startup handler
+chat_router = create_chat_router(session_manager, get_conversational_agent)
 app.include_router(chat_router, prefix="/api/ai")
 
 
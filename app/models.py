@@ -104,6 +104,9 @@ class AgentAnalysisResponse(BaseModel):
 # Conversational Chat Models
 # ============================================
 
+# Session IDs are lowercase UUID4 strings issued by SessionManager
+SESSION_ID_PATTERN = r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+
 class ChatStartRequest(BaseModel):
     """Request to start a new conversation."""
     user_id: Optional[str] = Field(None, description="Optional user identifier")
@@ -117,7 +120,7 @@ class ChatStartResponse(BaseModel):
 
 class ChatMessageRequest(BaseModel):
     """Request to send a message in a conversation."""
-    session_id: str
+    session_id: str = Field(..., pattern=SESSION_ID_PATTERN)
     message: str
 
 
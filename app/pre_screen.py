@@ -0,0 +1,180 @@
+"""
+Cheap keyword pre-screen for resume screening.
+
+Decides obvious mismatches without calling the LLM: the skills named in
+the job description are extracted with a fixed vocabulary, and a resume
+that mentions almost none of them and shares little vocabulary with the
+job description (TF-IDF cosine) gets a locally built low-score response.
+"""
+
+import re
+import logging
+from typing import Any, Dict, List, Optional
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.models import ScreeningResponse
+
+logger = logging.getLogger(__name__)
+
+# Skills recognized in job descriptions and resumes. Names that are also
+# ordinary words ("go", "r", "rest", "spring", "express") are left out.
+SKILL_VOCABULARY = (
+    "python", "java", "javascript", "typescript", "c++", "c#", "golang", "rust",
+    "ruby", "php", "scala", "kotlin", "swift", "sql", "nosql", "bash",
+    "django", "flask", "fastapi", "node.js", "react",
+    "angular", "vue", "next.js", "graphql", "grpc", ".net", "rails",
+    "postgresql", "mysql", "mongodb", "redis", "elasticsearch",
+    "kafka", "rabbitmq", "celery", "spark", "hadoop", "airflow", "dbt", "snowflake",
+    "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "ansible",
+    "jenkins", "ci/cd", "github actions", "linux", "git", "microservices",
+    "machine learning", "deep learning", "nlp", "computer vision", "pytorch",
+    "tensorflow", "scikit-learn", "pandas", "numpy", "llm", "langchain",
+    "html", "css", "figma", "agile", "scrum", "devops",
+)
+
+# Alternative spellings, mapped to their SKILL_VOCABULARY name so a job
+# asking for "PostgreSQL" matches a resume listing "Postgres"
+SKILL_ALIASES = {
+    "postgres": "postgresql",
+    "nodejs": "node.js",
+    "node js": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "nextjs": "next.js",
+    "angularjs": "angular",
+    "dotnet": ".net",
+    "asp.net": ".net",
+    "k8s": "kubernetes",
+    "sklearn": "scikit-learn",
+    "ruby on rails": "rails",
+    "amazon web services": "aws",
+    "google cloud": "gcp",
+}
+
+# Longest names first so "javascript" wins over "java" and "postgresql"
+# over "postgres"; the lookarounds stop "java" matching inside
+# "javascript", "c" names inside "c++"/"c#", and "net" inside ".net"
+_SKILL_RE = re.compile(
+    r'(?<![\w+#.])(' + '|'.join(
+        re.escape(skill)
+        for skill in sorted((*SKILL_VOCABULARY, *SKILL_ALIASES), key=len, reverse=True)
+    ) + r')(?![\w+#])',
+    re.IGNORECASE
+)
+
+
+def extract_skills(text: str) -> List[str]:
+    """
+    Find vocabulary skills in a text.
+    
+    Args:
+        text: Job description or resume text
+    
+    Returns:
+        Distinct lowercase skills in order of first mention, with aliases
+        replaced by their canonical name
+    """
+    skills = (match.lower() for match in _SKILL_RE.findall(text))
+    return list(dict.fromkeys(SKILL_ALIASES.get(skill, skill) for skill in skills))
+
+
+class PreScreener:
+    """
+    Rejects obvious mismatches before they reach the LLM.
+    
+    Only clear rejections are decided locally. Strong matches still go to
+    the LLM: their summary and interview questions are the ones recruiters
+    act on, and canned text would be a poor substitute.
+    """
+    
+    MIN_REQUIRED_SKILLS = 3
+    
+    def __init__(self, max_coverage: float = 0.1, max_similarity: float = 0.1):
+        """
+        Initialize the pre-screener.
+        
+        Args:
+            max_coverage: Highest share of required skills a resume may
+                mention and still be rejected
+            max_similarity: Highest TF-IDF cosine similarity between job
+                description and resume that still counts as a mismatch
+        """
+        self.max_coverage = max_coverage
+        self.max_similarity = max_similarity
+    
+    @staticmethod
+    def _similarity(job_description: str, resume_text: str) -> float:
+        """TF-IDF cosine similarity between the two texts."""
+        try:
+            matrix = TfidfVectorizer(stop_words='english').fit_transform([job_description, resume_text])
+        except ValueError:
+            # No usable vocabulary
+            return 0.0
+        # Rows are L2-normalized, so the dot product is cosine similarity
+        return float((matrix[0] @ matrix[1].T).toarray()[0, 0])
+    
+    def screen(self, job_description: str, resume_text: str) -> Optional[ScreeningResponse]:
+        """
+        Decide a screening locally if the resume is an obvious mismatch.
+        
+        Args:
+            job_description: The job description text
+            resume_text: The resume/CV text
+        
+        Returns:
+            A low-score ScreeningResponse, or None if the LLM should decide
+        """
+        required = extract_skills(job_description)
+        if len(required) < self.MIN_REQUIRED_SKILLS:
+            # Too few recognizable skills to judge fit from keywords
+            return None
+        
+        found = set(extract_skills(resume_text))
+        missing = [skill for skill in required if skill not in found]
+        coverage = 1 - len(missing) / len(required)
+        if coverage > self.max_coverage:
+            return None
+        
+        similarity = self._similarity(job_description, resume_text)
+        if similarity > self.max_similarity:
+            return None
+        
+        match_score = round(100 * (coverage + similarity) / 2)
+        logger.info(
+            f"Pre-screen rejected resume (skill coverage: {coverage:.2f}, "
+            f"similarity: {similarity:.2f})"
+        )
+        return ScreeningResponse.model_construct(
+            match_score=match_score,
+            summary=(
+                f"The resume mentions {len(required) - len(missing)} of the {len(required)} "
+                f"key skills required for this role. The candidate appears to be a poor fit "
+                f"for the listed requirements."
+            ),
+            missing_skills=missing,
+            interview_questions=self._questions(missing),
+            safety_report=None,
+        )
+    
+    @staticmethod
+    def _questions(missing: List[str]) -> List[Dict[str, Any]]:
+        """Build interview questions probing the most important missing skills."""
+        return [
+            {
+                "question": (
+                    f"This role relies on {skill}. What experience, if any, do you have "
+                    f"with it, and how would you get up to speed?"
+                ),
+                "category": "technical",
+                "difficulty": "easy",
+                "expected_answer_points": [
+                    f"Honest account of any exposure to {skill}",
+                    "Related or transferable experience",
+                    "Concrete plan for learning it",
+                ],
+            }
+            for skill in missing[:3]
+        ]
@@ -0,0 +1,146 @@
+"""
+Input pre-processing for screening prompts.
+
+Shrinks job descriptions and resumes before they are sent to the LLM:
+boilerplate that carries no signal (URLs, emails, page numbers,
+"references available" lines) is removed and over-long texts are cut
+down to a token budget, keeping the sections most relevant to the job.
+Prefill cost grows with input length, so this directly lowers latency.
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+logger = logging.getLogger(__name__)
+
+_URL_RE = re.compile(r'(?:https?://|www\.)\S+', re.IGNORECASE)
+_EMAIL_RE = re.compile(r'\b[\w.+-]+@[\w-]+\.[\w.-]+\b')
+# Whole lines only, removed with their newline so no blank line (and thus
+# no fake paragraph break) is left behind. Page markers must be explicit:
+# bare "03/2019" or "- 2021 -" lines are dates, not page numbers.
+_NOISE_LINE_RE = re.compile(
+    r'^[^\S\n]*(?:'
+    r'references?[^\S\n]+(?:are[^\S\n]+)?(?:available[^\S\n]+)?(?:up)?on[^\S\n]+request\.?'
+    r'|page[^\S\n]+\d+(?:[^\S\n]+of[^\S\n]+\d+)?'
+    r'|\d+[^\S\n]+of[^\S\n]+\d+'
+    r')[^\S\n]*(?:\n|$)',
+    re.IGNORECASE | re.MULTILINE
+)
+_INLINE_SPACE_RE = re.compile(r'[^\S\n]+')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n+')
+
+# A section is only partially kept if at least this many tokens remain
+_MIN_PARTIAL_TOKENS = 32
+# Relevance-ranked sections must fill at least this share of the budget,
+# otherwise the cleaned text is hard-truncated instead
+_MIN_KEPT_FRACTION = 0.5
+
+
+def _estimate_tokens(text: str, encoder=None) -> int:
+    """Token count with the encoder, or a chars/4 estimate without one."""
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return len(text) // 4
+
+
+def _truncate(text: str, max_tokens: int, encoder=None) -> str:
+    """Hard-truncate text to max_tokens."""
+    if encoder is not None:
+        tokens = encoder.encode(text, disallowed_special=())
+        return encoder.decode(tokens[:max_tokens]) if len(tokens) > max_tokens else text
+    return text[:max_tokens * 4]
+
+
+def clean(text: str) -> str:
+    """
+    Remove boilerplate and redundant whitespace, keeping paragraph breaks.
+    
+    Args:
+        text: Raw job description or resume text
+    
+    Returns:
+        Cleaned text
+    """
+    text = _NOISE_LINE_RE.sub('', text)
+    
+    lines = []
+    for line in text.split('\n'):
+        cleaned = _INLINE_SPACE_RE.sub(' ', _EMAIL_RE.sub('', _URL_RE.sub('', line))).strip()
+        # Drop lines that held only a URL/email, so they don't become
+        # paragraph breaks; keep lines that were blank to begin with
+        if cleaned or not line.strip():
+            lines.append(cleaned)
+    
+    return _BLANK_LINES_RE.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def _rank_sections(sections: List[str], query: str) -> List[int]:
+    """
+    Order sections by TF-IDF similarity to the query, most relevant first.
+    
+    Args:
+        sections: Text sections to rank
+        query: Text to rank against (e.g. the job description)
+    
+    Returns:
+        Section indices, most relevant first
+    """
+    try:
+        matrix = TfidfVectorizer(stop_words='english').fit_transform(sections + [query])
+    except ValueError:
+        # Only stop words / no vocabulary: keep the original order
+        return list(range(len(sections)))
+    
+    # Rows are L2-normalized, so the dot product is cosine similarity
+    scores = (matrix[:-1] @ matrix[-1].T).toarray().ravel()
+    return sorted(range(len(sections)), key=lambda i: -scores[i])
+
+
+def shrink(text: str, max_tokens: int, encoder=None, query: Optional[str] = None) -> str:
+    """
+    Clean text and fit it into a token budget.
+    
+    When the cleaned text is over budget and a query is given, paragraphs
+    are kept in order of relevance to the query (then restored to document
+    order); the first one that doesn't fit is cut to the remaining budget
+    rather than dropped. If that keeps too little, the cleaned text is
+    hard-truncated instead.
+    
+    Args:
+        text: Text to shrink
+        max_tokens: Token budget
+        encoder: tiktoken encoding for counting/truncation; estimates
+            from length when None
+        query: Text used to rank paragraphs when dropping some
+    
+    Returns:
+        Text within roughly max_tokens tokens
+    """
+    text = clean(text)
+    if _estimate_tokens(text, encoder) <= max_tokens:
+        return text
+    
+    if query:
+        sections = text.split('\n\n')
+        kept: Dict[int, str] = {}
+        remaining = max_tokens
+        for i in _rank_sections(sections, query):
+            cost = _estimate_tokens(sections[i], encoder)
+            if cost <= remaining:
+                kept[i] = sections[i]
+                remaining -= cost
+            else:
+                # Keep the start of a relevant section rather than dropping it
+                kept[i] = _truncate(sections[i], remaining, encoder)
+                remaining = 0
+            if remaining < _MIN_PARTIAL_TOKENS:
+                break
+        
+        if max_tokens - remaining >= max_tokens * _MIN_KEPT_FRACTION:
+            text = '\n\n'.join(kept[i] for i in sorted(kept))
+            logger.debug(f"Kept {len(kept)}/{len(sections)} sections within {max_tokens} tokens")
+    
+    return _truncate(text, max_tokens, encoder)
@@ -2,17 +2,17 @@
 Prompt templates for resume screening AI.
 """
 
-RESUME_SCREENING_PROMPT = """You are a Senior Tech Recruiter with extensive experience in evaluating candidates.
-
-Your task is to analyze the following resume against the job description and provide a structured evaluation.
+# Bump whenever a prompt changes so cached LLM responses are invalidated
+PROMPT_VERSION = "v4"
 
-Job Description:
-{job_description}
+# Static instructions come first and the job description/resume last, so the
+# instruction block is an identical prefix across calls and can be served
+# from the provider's prompt cache.
+RESUME_SCREENING_PROMPT = """You are a Senior Tech Recruiter with extensive experience in evaluating candidates.
 
-Resume:
-{resume_text}
+Your task is to analyze the resume at the end of this message against the job description and provide a structured evaluation.
 
-Please analyze the resume and provide your response in the following JSON format ONLY. Do not include any text before or after the JSON:
+Provide your response in the following JSON format ONLY. Do not include any text before or after the JSON:
 
 {{
   "match_score": 85,
@@ -66,4 +66,66 @@ IMPORTANT:
 - Return ONLY valid JSON. No additional text, explanations, or markdown formatting.
 - Make expected_answer_points SPECIFIC and MEANINGFUL - they should reflect actual knowledge/skills needed for the role
 - Questions should be tailored to the candidate's experience level and the job requirements
+
+---
+Job Description:
+{job_description}
+
+Resume:
+{resume_text}
 """
+
+# Screens several resumes against one job description in a single call. The
+# instructions and job description form a shared prefix, so their prefill is
+# paid once per batch instead of once per resume.
+BATCH_RESUME_SCREENING_PROMPT = """You are a Senior Tech Recruiter with extensive experience in evaluating candidates.
+
+Your task is to analyze each numbered resume at the end of this message against the job description and provide a structured evaluation for every resume.
+
+Provide your response in the following JSON format ONLY. Do not include any text before or after the JSON:
+
+{{
+  "results": [
+    {{
+      "match_score": 85,
+      "summary": "Strong candidate with relevant experience in backend development and cloud infrastructure. Missing some frontend skills but shows good potential for growth.",
+      "missing_skills": ["React", "TypeScript", "GraphQL"],
+      "interview_questions": [
+        {{
+          "question": "Can you walk us through your experience with implementing CI/CD pipelines? How do you ensure pipeline consistency across different environments?",
+          "category": "technical",
+          "difficulty": "medium",
+          "expected_answer_points": [
+            "Experience with tools like Jenkins, GitLab CI, or GitHub Actions",
+            "Understanding of environment parity and configuration management",
+            "Knowledge of testing strategies in CI/CD (unit, integration, e2e)"
+          ]
+        }}
+      ]
+    }}
+  ]
+}}
+
+Requirements:
+1. results: Exactly one evaluation per resume, in the same order as the resumes (Resume 1 first)
+2. match_score: A number from 0 to 100 indicating how well the candidate fits the role
+3. summary: Maximum 2 sentences describing the candidate's fit
+4. missing_skills: List of key skills from the job description that are missing from the resume
+5. interview_questions: Exactly 3 specific, role-relevant questions per resume. For EACH question provide:
+   - question: A detailed, specific interview question relevant to the role
+   - category: Must be "technical", "behavioral", or "situational"
+   - difficulty: Must be "easy", "medium", or "hard"
+   - expected_answer_points: 2-4 specific points that demonstrate what a strong answer should cover (be concrete and specific, not generic)
+
+IMPORTANT: 
+- Return ONLY valid JSON. No additional text, explanations, or markdown formatting.
+- Evaluate each resume independently; never mix details from different resumes
+- Questions should be tailored to each candidate's experience level and the job requirements
+
+---
+Job Description:
+{job_description}
+
+Resumes ({resume_count} total, return {resume_count} results):
+
+{resumes_block}"""
@@ -0,0 +1,80 @@
+"""
+Request-scoped context for correlating log records.
+"""
+
+import re
+import uuid
+import logging
+import logging.config
+from contextvars import ContextVar
+
+# Correlation ID of the request currently being handled ("-" outside a request)
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+MAX_REQUEST_ID_LENGTH = 64
+_REQUEST_ID_INVALID_RE = re.compile(r'[^A-Za-z0-9-]')
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Inject the current request ID into log records.
+    
+    Makes ``%(request_id)s`` available to log formatters.
+    """
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+def sanitize_request_id(value: str) -> str:
+    """
+    Make a client-supplied X-Request-ID safe to log and echo back.
+    
+    Characters outside ``[A-Za-z0-9-]`` are dropped (so the header can't
+    inject newlines or fake fields into log lines) and the result is
+    capped at MAX_REQUEST_ID_LENGTH.
+    
+    Args:
+        value: Raw header value (may be empty)
+    
+    Returns:
+        Sanitized ID, or a fresh one if nothing usable is left
+    """
+    request_id = _REQUEST_ID_INVALID_RE.sub('', value or '')[:MAX_REQUEST_ID_LENGTH]
+    return request_id or uuid.uuid4().hex
+
+
+def configure_logging(level: str = "INFO") -> None:
+    """
+    Configure root logging with the request ID in every line.
+    
+    The filter is attached to the root handler created here, so records
+    from all loggers that propagate to root carry ``request_id``.
+    
+    Args:
+        level: Root log level name
+    """
+    logging.config.dictConfig({
+        "version": 1,
+        "disable_existing_loggers": False,
+        "filters": {
+            "request_id": {"()": RequestIdFilter},
+        },
+        "formatters": {
+            "default": {"format": LOG_FORMAT},
+        },
+        "handlers": {
+            "console": {
+                "class": "logging.StreamHandler",
+                "formatter": "default",
+                "filters": ["request_id"],
+            },
+        },
+        "root": {
+            "level": level.upper(),
+            "handlers": ["console"],
+        },
+    })
@@ -3,39 +3,166 @@ Resume screening service using LLM with safety guardrails.
 """
 
 import os
-import json
+import asyncio
+import hashlib
+from pathlib import Path
 import logging
-from typing import Dict, Any
+import functools
+from contextlib import aclosing
+from typing import Dict, Any, List, Optional
+import orjson
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-from langchain_openai import ChatOpenAI
 from langchain_ollama import ChatOllama
 from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
 
 from app.models import ScreeningRequest, ScreeningResponse
-from app.prompts import RESUME_SCREENING_PROMPT
+from app.prompts import RESUME_SCREENING_PROMPT, BATCH_RESUME_SCREENING_PROMPT, PROMPT_VERSION
 from app.guardrails.safety import SafetyGuardrails
+from app.cache import ResponseCache
+from app.semantic_cache import SemanticCache
+from app.preprocess import shrink
+from app.pre_screen import PreScreener
+from app.llm_servers import LlamaCppLLM, LlamaCppSlotCache, TGILLM, OpenAIChatLLM, TEIEmbeddings, LLM_HTTP_LIMITS
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1)
+def _get_token_encoder():
+    """
+    Load the tiktoken encoding used to size prompts, once per process.
+
+    Uses cl100k_base; other model tokenizers differ, so counts are only
+    used as estimates for budgets. Loaded on first use rather than at
+    import because tiktoken may need to download the encoding.
+
+    Returns:
+        tiktoken Encoding, or None if unavailable
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, estimating tokens from length: {e}")
+        return None
+
+
+class _JSONObjectScanner:
+    """
+    Finds where the first top-level JSON object in a stream of text ends.
+
+    Tracks brace depth in one pass over the chunks, ignoring braces inside
+    strings, so a streamed response can be cut off as soon as the object
+    closes instead of waiting for trailing whitespace or prose. A balanced
+    span that isn't valid JSON (e.g. "{JSON}" in "Here is the {JSON}: {...}")
+    is skipped and scanning resumes after it.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._depth = 0
+        self._started = False
+        self._start = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Consume the next chunk of text.
+
+        Args:
+            chunk: Newly streamed text
+
+        Returns:
+            The complete JSON object text once it has closed, else None
+        """
+        offset = len(self.text)
+        self.text += chunk
+
+        for i, char in enumerate(chunk, start=offset):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = self._started
+            elif char == "{":
+                if not self._started:
+                    self._started = True
+                    self._start = i
+                self._depth += 1
+            elif char == "}" and self._started:
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = self.text[self._start:i + 1]
+                    try:
+                        orjson.loads(candidate)
+                    except orjson.JSONDecodeError:
+                        # Braces in prose; look for the next object
+                        self._started = False
+                        continue
+                    return candidate
+
+        return None
+
+
 class ResumeScreeningService:
     """Service for screening resumes using LLM with safety guardrails."""
 
+    # Limits for one multi-resume prompt in analyze_batch()
+    BATCH_MAX_RESUMES = 8
+    BATCH_MAX_TOKENS = 16384
+    BATCH_OUTPUT_TOKENS_PER_RESUME = 512
+
+    # Ollama model families that load a vision encoder; screening is text-only
+    MULTIMODAL_MODEL_PREFIXES = (
+        "llava", "bakllava", "gemma3", "qwen2-vl", "qwen2.5vl", "llama3.2-vision",
+        "minicpm-v", "moondream", "granite3.2-vision", "mistral-small3.1",
+    )
+
+    # Input budgets; longer texts are trimmed before prompting
+    JD_MAX_TOKENS = 1200
+    RESUME_MAX_TOKENS = 1800
+
     def __init__(self):
         """Initialize the screening service with LLM and safety guardrails."""
         llm_provider = os.getenv("LLM_PROVIDER", "ollama").lower()
+        self.llm_provider = llm_provider
+        self.prompt_slot_cache = None
 
         if llm_provider == "ollama":
             ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
             ollama_model = os.getenv("OLLAMA_MODEL", "llama3.2")
+            self._check_text_only_model(ollama_model)
+            # Keep the model resident between requests to avoid reload latency
+            keep_alive = os.getenv("LLM_KEEP_ALIVE", "30m")
 
+            # Ollama's 2048-token default context would truncate the prompt.
+            # Single and batch prompts share one num_ctx: a request with a
+            # different num_ctx makes Ollama reload the model, so batches are
+            # sized to the configured context instead of getting their own
+            num_ctx = int(os.getenv("OLLAMA_NUM_CTX", str(self.BATCH_MAX_TOKENS)))
+            self.BATCH_MAX_TOKENS = num_ctx
             self.llm = ChatOllama(
-                model=ollama_model, base_url=ollama_base_url, format="json"
+                model=ollama_model, base_url=ollama_base_url, format="json",
+                num_ctx=num_ctx, keep_alive=keep_alive,
+                client_kwargs={"limits": LLM_HTTP_LIMITS}
             )
+            batch_llm = self.llm
             print(f"✓ Using Ollama with model: {ollama_model}")
             self.use_ollama = True
+            self.model_name = f"ollama:{ollama_model}"
 
         elif llm_provider == "openai":
             openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -46,38 +173,197 @@ class ResumeScreeningService:
 
             openai_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
-            self.llm = ChatOpenAI(
-                model=openai_model, temperature=0.3, openai_api_key=openai_api_key
+            # Structured Outputs guarantee schema-valid JSON
+            self.llm = OpenAIChatLLM(
+                api_key=openai_api_key,
+                model=openai_model,
+                json_schema=self._strict_output_schema(),
+                schema_name="ScreeningResponse",
+                temperature=0.3,
             )
+            batch_llm = self.llm.bind(json_schema=self._strict_batch_output_schema())
             print(f"✓ Using OpenAI with model: {openai_model}")
             self.use_ollama = False
+            self.model_name = f"openai:{openai_model}"
+
+        elif llm_provider == "llamacpp":
+            llamacpp_url = os.getenv("LLAMACPP_URL", "http://localhost:8080")
+
+            self.llm = LlamaCppLLM(
+                base_url=llamacpp_url,
+                json_schema=self._output_schema(),
+                n_predict=int(os.getenv("LLAMACPP_N_PREDICT", "1024")),
+                temperature=0.3,
+            )
+            batch_llm = self.llm.bind(
+                json_schema=self._batch_output_schema(),
+                n_predict=self.BATCH_MAX_RESUMES * self.BATCH_OUTPUT_TOKENS_PER_RESUME,
+            )
+            # Optional on-disk KV cache per job description; LLM_CACHE_DIR must
+            # be the server's --slot-save-path (e.g. a shared volume).
+            # LLAMACPP_SLOTS caps concurrent cached requests; by default it
+            # matches the server's slot count (-np) from GET /slots
+            cache_dir = os.getenv("LLM_CACHE_DIR")
+            if cache_dir:
+                slots = os.getenv("LLAMACPP_SLOTS")
+                self.prompt_slot_cache = LlamaCppSlotCache(
+                    self.llm,
+                    Path(cache_dir),
+                    slots=int(slots) if slots else None,
+                    max_bytes=int(os.getenv("LLM_CACHE_MAX_MB", "2048")) << 20,
+                )
+            print(f"✓ Using llama.cpp server at: {llamacpp_url}")
+            self.use_ollama = False
+            self.model_name = f"llamacpp:{os.getenv('LLAMACPP_MODEL', llamacpp_url)}"
+
+        elif llm_provider == "tgi":
+            tgi_url = os.getenv("TGI_URL", "http://localhost:8081")
+
+            self.llm = TGILLM(
+                base_url=tgi_url,
+                json_schema=self._output_schema(),
+                max_new_tokens=1024,
+                temperature=0.3,
+            )
+            batch_llm = self.llm.bind(
+                json_schema=self._batch_output_schema(),
+                max_new_tokens=self.BATCH_MAX_RESUMES * self.BATCH_OUTPUT_TOKENS_PER_RESUME,
+            )
+            print(f"✓ Using text-generation-inference at: {tgi_url}")
+            self.use_ollama = False
+            self.model_name = f"tgi:{os.getenv('TGI_MODEL', tgi_url)}"
 
         else:
             raise ValueError(
-                f"Unsupported LLM provider: {llm_provider}. Use 'ollama' or 'openai'"
+                f"Unsupported LLM provider: {llm_provider}. Use 'ollama', 'openai', 'llamacpp' or 'tgi'"
             )
 
-        # Initialize the output parser
-        self.parser = PydanticOutputParser(pydantic_object=ScreeningResponse)
-
         # Create the prompt template from imported prompt
         self.prompt_template = PromptTemplate(
             template=RESUME_SCREENING_PROMPT,
             input_variables=["job_description", "resume_text"],
         )
 
-        # Create the chain
+        # Kept for callers that compose the chain; the service renders
+        # prompts with str.format and calls the LLM directly
         self.chain = self.prompt_template | self.llm
+
+        # Caps in-flight LLM calls across all concurrent requests
+        self._llm_semaphore = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "32")))
+
+        # Multi-resume chain for analyze_batch()
+        self.batch_prompt_template = PromptTemplate(
+            template=BATCH_RESUME_SCREENING_PROMPT,
+            input_variables=["job_description", "resume_count", "resumes_block"],
+        )
+        self.batch_chain = self.batch_prompt_template | batch_llm
+        self.batch_llm = batch_llm
         
         # Initialize safety guardrails
         self.safety = SafetyGuardrails(
             pii_mode="flag",  # Flag PII but don't auto-redact
             use_llm_bias=False,  # Disable LLM bias detection for performance
             llm=None,
-            toxicity_threshold=0.7
+            toxicity_threshold=0.7,
+            toxicity_use_onnx=os.getenv("TOXICITY_USE_ONNX", "false").lower() == "true"
+        )
+        
+        # Exact-match cache of final responses, shared across workers via Redis
+        self.response_cache = ResponseCache(
+            redis_url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            namespace="screening"
         )
+        
+        # Optional near-duplicate cache (off by default: it trades exactness for hits)
+        self.semantic_cache = None
+        if os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true":
+            # TEI serves embeddings much faster than the in-process model
+            tei_url = os.getenv("TEI_URL")
+            self.semantic_cache = SemanticCache(
+                embedding_service=TEIEmbeddings(tei_url) if tei_url else None,
+                threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", SemanticCache.DEFAULT_THRESHOLD))
+            )
+
+        # Optional keyword pre-screen that rejects obvious mismatches without the LLM
+        self.pre_screener = None
+        if os.getenv("PRE_SCREEN_ENABLED", "false").lower() == "true":
+            self.pre_screener = PreScreener()
         logger.info("ResumeScreeningService initialized with safety guardrails")
 
+    def _check_text_only_model(self, model: str) -> None:
+        """
+        Refuse multimodal Ollama models unless explicitly allowed.
+
+        Ollama runs the vision modules of multimodal models on every request
+        even without images, roughly halving throughput for text-only work.
+
+        Args:
+            model: Ollama model name (e.g. "gemma3:4b")
+
+        Raises:
+            ValueError: If the model is multimodal and LLM_ALLOW_MULTIMODAL is not "true"
+        """
+        if not model.lower().startswith(self.MULTIMODAL_MODEL_PREFIXES):
+            return
+
+        if os.getenv("LLM_ALLOW_MULTIMODAL", "false").lower() == "true":
+            logger.warning(f"Using multimodal model {model} for text-only screening; expect slower responses")
+            return
+
+        raise ValueError(
+            f"OLLAMA_MODEL '{model}' is a multimodal model and would run its vision encoder "
+            f"on every request. Use a text-only model (e.g. llama3.2, qwen2.5) or set "
+            f"LLM_ALLOW_MULTIMODAL=true to use it anyway"
+        )
+
+    async def warmup(self) -> None:
+        """
+        Prefill the static prompt prefix on local model servers.
+
+        Sends one screening prompt with placeholder inputs and a single
+        output token, so the instruction block's KV cache is already built
+        when the first real request arrives. For llama.cpp, the prefix cache
+        is restored from / saved to LLAMACPP_SLOT_CACHE_FILE when set, so it
+        survives server restarts. OpenAI caches prefixes on its own and is
+        not warmed. Failures are logged, never raised.
+        """
+        if self.llm_provider == "openai":
+            return
+
+        slot_file = os.getenv("LLAMACPP_SLOT_CACHE_FILE") if self.llm_provider == "llamacpp" else None
+        prompt = RESUME_SCREENING_PROMPT.format(job_description="WARMUP", resume_text="WARMUP")
+
+        if self.llm_provider == "ollama":
+            # Keep the configured options (num_ctx) so Ollama doesn't reload the model
+            options = {**self.llm._default_params["options"], "num_predict": 1}
+            llm = self.llm.bind(options=options)
+        elif self.llm_provider == "llamacpp":
+            llm = self.llm.bind(n_predict=1)
+        else:
+            llm = self.llm.bind(max_new_tokens=1)
+
+        try:
+            if slot_file and await self.llm.restore_slot(slot_file):
+                logger.info(f"✓ LLM prompt cache restored from {slot_file}")
+                return
+
+            async with self._llm_semaphore:
+                await llm.ainvoke(prompt)
+
+            if slot_file:
+                await self.llm.save_slot(slot_file)
+            logger.info("✓ LLM prompt cache warmed")
+        except Exception as e:
+            logger.warning(f"LLM warm-up failed: {e}")
+
+    async def aclose(self) -> None:
+        """Close the LLM, embedding and cache connections on shutdown."""
+        if hasattr(self.llm, "aclose"):
+            await self.llm.aclose()
+        if self.semantic_cache is not None:
+            self.semantic_cache.close()
+        await self.response_cache.aclose()
+
     async def analyze(
         self, job_description: str, resume_text: str
     ) -> ScreeningResponse:
@@ -91,11 +377,447 @@ class ResumeScreeningService:
         Returns:
             ScreeningResponse with structured evaluation and safety report
         """
-        try:
-            # Get the raw response from LLM
-            result = await self.chain.ainvoke(
-                {"job_description": job_description, "resume_text": resume_text}
+        cache_key = self._response_cache_key(job_description, resume_text)
+        cached = await self.response_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Screening response served from cache")
+            return ScreeningResponse.model_validate_json(cached)
+
+        if self.pre_screener is not None:
+            # Keyword/TF-IDF scoring is CPU-bound; keep it off the event loop
+            response = await asyncio.to_thread(self.pre_screener.screen, job_description, resume_text)
+            if response is not None:
+                return response
+
+        query = None
+        if self.semantic_cache is not None:
+            # Embedding is CPU-bound; keep it off the event loop
+            cached, query = await asyncio.to_thread(
+                self.semantic_cache.lookup, job_description, resume_text
+            )
+            if cached is not None:
+                logger.info("Screening response served from semantic cache")
+                return ScreeningResponse.model_validate_json(cached)
+
+        response = await self._analyze_uncached(job_description, resume_text)
+        response_json = response.model_dump_json()
+        await self.response_cache.set(cache_key, response_json)
+        if query is not None:
+            self.semantic_cache.add(query, response_json)
+        return response
+
+    @staticmethod
+    @functools.cache
+    def _output_schema() -> Dict[str, Any]:
+        """
+        JSON schema for the fields the LLM generates (built once and cached;
+        callers must not mutate it).
+
+        Returns:
+            ScreeningResponse schema without the service-populated safety_report
+        """
+        schema = ScreeningResponse.model_json_schema()
+        schema["properties"].pop("safety_report", None)
+        schema["required"] = ["match_score", "summary", "missing_skills", "interview_questions"]
+        return schema
+
+    @classmethod
+    @functools.cache
+    def _batch_output_schema(cls) -> Dict[str, Any]:
+        """
+        JSON schema for a multi-resume response.
+
+        Returns:
+            Object schema with a "results" array of screening outputs
+        """
+        return {
+            "type": "object",
+            "properties": {
+                "results": {"type": "array", "items": cls._output_schema()}
+            },
+            "required": ["results"],
+        }
+
+    @staticmethod
+    @functools.cache
+    def _strict_output_schema() -> Dict[str, Any]:
+        """
+        Screening output schema for OpenAI Structured Outputs.
+
+        Strict mode requires every property to be required and every object
+        closed, so interview questions are spelled out instead of using the
+        free-form dicts in ScreeningResponse.
+
+        Returns:
+            Strict JSON schema for one screening result
+        """
+        string_list = {"type": "array", "items": {"type": "string"}}
+        question = {
+            "type": "object",
+            "properties": {
+                "question": {"type": "string"},
+                "category": {"type": "string", "enum": ["technical", "behavioral", "situational"]},
+                "difficulty": {"type": "string", "enum": ["easy", "medium", "hard"]},
+                "expected_answer_points": string_list,
+            },
+            "required": ["question", "category", "difficulty", "expected_answer_points"],
+            "additionalProperties": False,
+        }
+        return {
+            "type": "object",
+            "properties": {
+                "match_score": {"type": "integer"},
+                "summary": {"type": "string"},
+                "missing_skills": string_list,
+                "interview_questions": {"type": "array", "items": question},
+            },
+            "required": ["match_score", "summary", "missing_skills", "interview_questions"],
+            "additionalProperties": False,
+        }
+
+    @classmethod
+    @functools.cache
+    def _strict_batch_output_schema(cls) -> Dict[str, Any]:
+        """
+        Multi-resume output schema for OpenAI Structured Outputs.
+
+        Returns:
+            Strict JSON schema with a "results" array of screening results
+        """
+        return {
+            "type": "object",
+            "properties": {
+                "results": {"type": "array", "items": cls._strict_output_schema()}
+            },
+            "required": ["results"],
+            "additionalProperties": False,
+        }
+
+    def _prefix_cache_key(self, job_description: str) -> str:
+        """
+        Build the prompt-prefix cache key for a job description.
+
+        Args:
+            job_description: The job description text
+
+        Returns:
+            Short SHA-256 hex digest of the prompt version, model, and job description
+        """
+        parts = (PROMPT_VERSION, self.model_name, job_description)
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    def _response_cache_key(self, job_description: str, resume_text: str) -> str:
+        """
+        Build the response cache key for a screening request.
+
+        Args:
+            job_description: The job description text
+            resume_text: The resume/CV text
+
+        Returns:
+            SHA-256 hex digest of the prompt version, model, and inputs
+        """
+        parts = (PROMPT_VERSION, self.model_name, job_description, resume_text)
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    async def analyze_many(
+        self, job_description: str, resumes: List[str]
+    ) -> List[ScreeningResponse]:
+        """
+        Analyze several resumes concurrently, one LLM call per resume.
+
+        In-flight LLM calls are capped by LLM_MAX_CONCURRENCY; use
+        analyze_batch() to share one prompt across resumes instead.
+
+        Args:
+            job_description: The job description text
+            resumes: Resume/CV texts to screen
+
+        Returns:
+            One ScreeningResponse per resume, in input order
+        """
+        return list(await asyncio.gather(
+            *(self.analyze(job_description, text) for text in resumes)
+        ))
+
+    async def analyze_batch(
+        self, job_description: str, resumes: List[str]
+    ) -> List[ScreeningResponse]:
+        """
+        Analyze several resumes against the same job description.
+
+        Resumes missing from the response cache are screened several per LLM
+        call, so the instructions and job description are processed once per
+        chunk instead of once per resume.
+
+        Args:
+            job_description: The job description text
+            resumes: Resume/CV texts to screen
+
+        Returns:
+            One ScreeningResponse per resume, in input order
+        """
+        cache_keys = [self._response_cache_key(job_description, text) for text in resumes]
+        cached = await asyncio.gather(*(self.response_cache.get(key) for key in cache_keys))
+
+        responses: List[Optional[ScreeningResponse]] = [None] * len(resumes)
+        # Identical resumes only need to be screened once
+        pending: Dict[str, List[int]] = {}
+        for i, value in enumerate(cached):
+            if value is not None:
+                responses[i] = ScreeningResponse.model_validate_json(value)
+            else:
+                pending.setdefault(resumes[i], []).append(i)
+
+        if pending and self.pre_screener is not None:
+            screened = await asyncio.to_thread(self._pre_screen_all, job_description, list(pending))
+            for text, response in screened.items():
+                if response is not None:
+                    for i in pending.pop(text):
+                        responses[i] = response
+
+        if pending:
+            logger.info(
+                f"Batch screening: {len(resumes) - sum(map(len, pending.values()))} cached, "
+                f"{len(pending)} to screen"
+            )
+            # Token counting is CPU-bound; keep it off the event loop
+            chunks = await asyncio.to_thread(self._chunk_resumes, job_description, list(pending))
+            chunk_responses = await asyncio.gather(
+                *(self._analyze_chunk(job_description, chunk) for chunk in chunks)
+            )
+
+            for chunk, results in zip(chunks, chunk_responses):
+                for text, response in zip(chunk, results):
+                    response_json = response.model_dump_json()
+                    for i in pending[text]:
+                        responses[i] = response
+                        await self.response_cache.set(cache_keys[i], response_json)
+
+        return responses
+
+    def _count_tokens(self, text: str) -> int:
+        """
+        Estimate the prompt tokens in a text.
+
+        Args:
+            text: Text to measure
+
+        Returns:
+            Approximate token count
+        """
+        encoder = _get_token_encoder()
+        if encoder is not None:
+            return len(encoder.encode(text, disallowed_special=()))
+        return len(text) // 4
+
+    def _shrink_job_description(self, job_description: str) -> str:
+        """Trim a job description to JD_MAX_TOKENS."""
+        return shrink(job_description, self.JD_MAX_TOKENS, _get_token_encoder())
+
+    def _shrink_resume(self, resume_text: str, job_description: str) -> str:
+        """Trim a resume to RESUME_MAX_TOKENS, keeping the sections most relevant to the job."""
+        return shrink(
+            resume_text, self.RESUME_MAX_TOKENS, _get_token_encoder(), query=job_description
+        )
+
+    def _chunk_resumes(self, job_description: str, resumes: List[str]) -> List[List[str]]:
+        """
+        Split resumes into chunks that fit one batch prompt.
+
+        Args:
+            job_description: The job description text
+            resumes: Resume texts to screen
+
+        Returns:
+            Chunks of at most BATCH_MAX_RESUMES resumes whose prompt and
+            expected output fit in BATCH_MAX_TOKENS
+        """
+        budget = (
+            self.BATCH_MAX_TOKENS
+            - self._count_tokens(BATCH_RESUME_SCREENING_PROMPT)
+            - min(self._count_tokens(job_description), self.JD_MAX_TOKENS)
+        )
+
+        chunks: List[List[str]] = []
+        current: List[str] = []
+        used = 0
+        for text in resumes:
+            cost = (
+                min(self._count_tokens(text), self.RESUME_MAX_TOKENS)
+                + self.BATCH_OUTPUT_TOKENS_PER_RESUME
             )
+            if current and (len(current) >= self.BATCH_MAX_RESUMES or used + cost > budget):
+                chunks.append(current)
+                current, used = [], 0
+            current.append(text)
+            used += cost
+
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _analyze_chunk(
+        self, job_description: str, resumes: List[str]
+    ) -> List[ScreeningResponse]:
+        """
+        Screen a chunk of resumes with one LLM call.
+
+        Falls back to one call per resume if the model does not return
+        exactly one result per resume, and re-screens individually any
+        resume whose result fails validation.
+
+        Args:
+            job_description: The job description text
+            resumes: Resume texts in this chunk
+
+        Returns:
+            ScreeningResponses in the same order as resumes
+        """
+        if len(resumes) == 1:
+            return [await self._analyze_uncached(job_description, resumes[0])]
+
+        prompt = await asyncio.to_thread(self._render_batch_prompt, job_description, resumes)
+        content = await self._astream_json(self.batch_llm, prompt)
+        data = self._parse_json_output(content)
+
+        items = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(items, list) or len(items) != len(resumes):
+            logger.warning(
+                f"Batch response did not contain {len(resumes)} results; "
+                f"screening resumes individually"
+            )
+            return list(await asyncio.gather(
+                *(self._analyze_uncached(job_description, text) for text in resumes)
+            ))
+
+        responses = await asyncio.gather(
+            *(self._build_response(item) for item in items), return_exceptions=True
+        )
+        failed = [i for i, response in enumerate(responses) if isinstance(response, BaseException)]
+        for i in failed:
+            if not isinstance(responses[i], Exception):
+                # Cancellation and the like are not bad output
+                raise responses[i]
+        if failed:
+            logger.warning(
+                f"{len(failed)} of {len(resumes)} batch results were invalid; "
+                f"screening those resumes individually"
+            )
+            retried = await asyncio.gather(
+                *(self._analyze_uncached(job_description, resumes[i]) for i in failed)
+            )
+            for i, response in zip(failed, retried):
+                responses[i] = response
+
+        return list(responses)
+
+    async def _analyze_uncached(
+        self, job_description: str, resume_text: str
+    ) -> ScreeningResponse:
+        """
+        Run the LLM and safety checks for a screening request.
+
+        Args:
+            job_description: The job description text
+            resume_text: The resume/CV text
+
+        Returns:
+            ScreeningResponse with structured evaluation and safety report
+        """
+        # Trimming tokenizes and ranks sections; keep it off the event loop
+        prompt = await asyncio.to_thread(self._render_prompt, job_description, resume_text)
+        llm = self.llm
+        if self.prompt_slot_cache is not None:
+            # Reuse the saved KV cache for this job description's prompt prefix
+            llm = self.prompt_slot_cache.bind(cache_key=self._prefix_cache_key(job_description))
+
+        content = await self._astream_json(llm, prompt)
+        data = self._parse_json_output(content)
+        return await self._build_response(data)
+
+    def _render_prompt(self, job_description: str, resume_text: str) -> str:
+        """
+        Trim the inputs and render the single-resume screening prompt.
+
+        Args:
+            job_description: The job description text
+            resume_text: The resume/CV text
+
+        Returns:
+            The rendered prompt
+        """
+        return RESUME_SCREENING_PROMPT.format(
+            job_description=self._shrink_job_description(job_description),
+            resume_text=self._shrink_resume(resume_text, job_description),
+        )
+
+    def _render_batch_prompt(self, job_description: str, resumes: List[str]) -> str:
+        """
+        Trim the inputs and render the multi-resume screening prompt.
+
+        Args:
+            job_description: The job description text
+            resumes: Resume texts in this chunk
+
+        Returns:
+            The rendered prompt
+        """
+        resumes_block = "\n".join(
+            f"## Resume {i}\n{self._shrink_resume(text, job_description)}\n"
+            for i, text in enumerate(resumes, start=1)
+        )
+        return BATCH_RESUME_SCREENING_PROMPT.format(
+            job_description=self._shrink_job_description(job_description),
+            resume_count=len(resumes),
+            resumes_block=resumes_block,
+        )
+
+    def _pre_screen_all(
+        self, job_description: str, resumes: List[str]
+    ) -> Dict[str, Optional[ScreeningResponse]]:
+        """
+        Run the keyword pre-screen on several resumes.
+
+        Args:
+            job_description: The job description text
+            resumes: Resume texts to pre-screen
+
+        Returns:
+            Map of resume text to its local response, or None if the LLM should decide
+        """
+        return {text: self.pre_screener.screen(job_description, text) for text in resumes}
+
+    async def _astream_json(self, llm, prompt: str) -> str:
+        """
+        Stream an LLM's output and stop once its JSON object is complete.
+
+        Ends the stream as soon as the top-level object closes, so the
+        caller doesn't wait for any trailing whitespace or prose the model
+        keeps generating (or markdown fences around the object).
+
+        The prompt is rendered by the caller with str.format rather than
+        through the PromptTemplate chains, which add per-call validation and
+        callback overhead for a fixed template.
+
+        Args:
+            llm: Model or server client to stream from
+            prompt: Fully rendered prompt
+
+        Returns:
+            The JSON object text, or the full output if no complete object was found
+        """
+        scanner = _JSONObjectScanner()
+        try:
+            async with self._llm_semaphore:
+                # Closing the generator early cancels the underlying HTTP stream
+                async with aclosing(llm.astream(prompt)) as stream:
+                    async for chunk in stream:
+                        # Chat models yield message chunks, the server clients strings
+                        text = chunk.content if hasattr(chunk, "content") else str(chunk)
+                        json_text = scanner.feed(text)
+                        if json_text is not None:
+                            return json_text
         except Exception as e:
             error_msg = str(e)
             if "Connection" in error_msg or "refused" in error_msg:
@@ -106,29 +828,37 @@ class ResumeScreeningService:
                 )
             raise
 
-        # Extract content based on response type
-        if hasattr(result, "content"):
-            content = result.content
-        else:
-            content = str(result)
+        return scanner.text.strip()
+
+    @staticmethod
+    def _parse_json_output(content: str) -> Any:
+        """
+        Parse the JSON payload of an LLM response.
+
+        Args:
+            content: JSON text returned by _astream_json()
+
+        Returns:
+            Parsed JSON data
+        """
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError as e:
+            raise ValueError(f"Failed to parse JSON response: {e}\\nResponse: {content}")
+
+    async def _build_response(self, data: Dict[str, Any]) -> ScreeningResponse:
+        """
+        Run safety checks on parsed LLM output and build the response.
+
+        Args:
+            data: Parsed screening fields from the LLM
 
-        # Parse JSON response
+        Returns:
+            ScreeningResponse with structured evaluation and safety report
+        """
         try:
-            # Clean the response (remove markdown code blocks if present)
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-
-            # Parse JSON
-            data = json.loads(content)
-
-            # Run safety checks
-            sanitized_data, safety_report = self.safety.validate_and_sanitize(
+            # Run safety checks concurrently, off the event loop
+            sanitized_data, safety_report = await self.safety.avalidate_and_sanitize(
                 data,
                 schema_name='screening',
                 auto_redact=False  # Don't auto-redact, just flag
@@ -138,15 +868,30 @@ class ResumeScreeningService:
             if safety_report.has_issues:
                 logger.warning(f"Safety issues detected: {safety_report.summary()}")
             
-            # Add safety report to response
-            sanitized_data['safety_report'] = safety_report.to_dict()
+            # Validate and create response from the LLM fields
+            sanitized_data.pop('safety_report', None)
+            response = ScreeningResponse(**sanitized_data)
 
-            # Validate and create response
-            return ScreeningResponse(**sanitized_data)
+            # The safety report comes from our own guardrails and is already
+            # JSON-ready; attach it without re-validating the nested dict
+            response.safety_report = safety_report.to_dict()
+            return response
 
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse JSON response: {e}\\nResponse: {content}")
         except Exception as e:
             raise ValueError(
-                f"Failed to create ScreeningResponse: {e}\\nData: {data if 'data' in locals() else content}"
+                f"Failed to create ScreeningResponse: {e}\\nData: {data}"
             )
+
+
+@functools.lru_cache(maxsize=1)
+def get_screening_service() -> ResumeScreeningService:
+    """
+    Return the process-wide screening service.
+
+    The service owns LLM clients, HTTP connection pools and caches, so it is
+    built once and shared by all requests (e.g. via FastAPI Depends).
+
+    Returns:
+        The shared ResumeScreeningService
+    """
+    return ResumeScreeningService()
@@ -0,0 +1,172 @@
+"""
+Semantic cache for screening responses.
+
+Catches near-duplicate requests that the exact-match cache misses: the
+same resume re-pasted with different whitespace or tiny edits, or a
+boilerplate variant of a job description. The job description and resume
+are embedded separately and a cached response is reused only when both
+are similar enough to an earlier request.
+"""
+
+import re
+import logging
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# (job description vector, resume vector)
+QueryVectors = Tuple[np.ndarray, np.ndarray]
+
+
+class SemanticCache:
+    """
+    In-process nearest-neighbour cache keyed by embedding similarity.
+    
+    Vectors are L2-normalized and kept in fixed-size ring buffers, so a
+    lookup is one matrix-vector product per field (exact inner-product
+    search). Once full, the oldest entries are overwritten.
+    
+    Embedding models only see the first few hundred tokens of each text,
+    so a high threshold is needed to avoid reusing a response for a
+    resume that differs further down.
+    """
+    
+    DEFAULT_THRESHOLD = 0.94
+    
+    def __init__(
+        self,
+        embedding_service=None,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_entries: int = 10_000
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            embedding_service: Object with generate_batch_embeddings(texts);
+                defaults to the project EmbeddingService, loaded on first use
+            threshold: Minimum cosine similarity for both the job description
+                and the resume to count as a hit
+            max_entries: Maximum number of cached responses
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._embedding_service = embedding_service
+        self._disabled = False
+        
+        self._lock = threading.Lock()
+        self._jd_vectors: Optional[np.ndarray] = None
+        self._resume_vectors: Optional[np.ndarray] = None
+        self._responses: list = [None] * max_entries
+        self._size = 0
+        self._next = 0
+    
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Canonicalize text before embedding (case and whitespace)."""
+        return _WHITESPACE_RE.sub(' ', text).strip().lower()
+    
+    def _embed(self, job_description: str, resume_text: str) -> Optional[QueryVectors]:
+        """
+        Embed a request's job description and resume.
+        
+        Args:
+            job_description: The job description text
+            resume_text: The resume/CV text
+        
+        Returns:
+            L2-normalized (job description, resume) vectors, or None if embedding failed
+        """
+        if self._disabled:
+            return None
+        
+        try:
+            if self._embedding_service is None:
+                from recruitment.services.embedding_service import EmbeddingService
+                self._embedding_service = EmbeddingService()
+            
+            embeddings = self._embedding_service.generate_batch_embeddings([
+                self._normalize(job_description),
+                self._normalize(resume_text)
+            ])
+        except Exception as e:
+            # Don't retry a missing model on every request
+            logger.warning(f"Semantic cache disabled, embedding failed: {e}")
+            self._disabled = True
+            return None
+        
+        if any(embedding is None for embedding in embeddings):
+            return None
+        
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        return vectors[0], vectors[1]
+    
+    def lookup(
+        self,
+        job_description: str,
+        resume_text: str
+    ) -> Tuple[Optional[str], Optional[QueryVectors]]:
+        """
+        Find a cached response for a similar request.
+        
+        Args:
+            job_description: The job description text
+            resume_text: The resume/CV text
+        
+        Returns:
+            (cached response or None, query vectors to pass to add() on a miss)
+        """
+        query = self._embed(job_description, resume_text)
+        if query is None:
+            return None, None
+        
+        with self._lock:
+            if self._size == 0:
+                return None, query
+            
+            jd_scores = self._jd_vectors[:self._size] @ query[0]
+            resume_scores = self._resume_vectors[:self._size] @ query[1]
+            # Both fields must match; the weaker similarity decides
+            scores = np.minimum(jd_scores, resume_scores)
+            best = int(np.argmax(scores))
+            
+            if scores[best] >= self.threshold:
+                logger.debug(f"Semantic cache hit (similarity: {scores[best]:.3f})")
+                return self._responses[best], query
+        
+        return None, query
+    
+    def add(self, query: QueryVectors, response: str) -> None:
+        """
+        Cache a response under a request's vectors.
+        
+        Args:
+            query: Vectors returned by lookup() for the request
+            response: Serialized response to cache
+        """
+        jd_vector, resume_vector = query
+        
+        with self._lock:
+            if self._jd_vectors is None:
+                dimension = jd_vector.shape[0]
+                self._jd_vectors = np.zeros((self.max_entries, dimension), dtype=np.float32)
+                self._resume_vectors = np.zeros((self.max_entries, dimension), dtype=np.float32)
+            
+            slot = self._next
+            self._jd_vectors[slot] = jd_vector
+            self._resume_vectors[slot] = resume_vector
+            self._responses[slot] = response
+            
+            self._next = (slot + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+    
+    def close(self) -> None:
+        """Release the embedding service's resources, if it holds any."""
+        if hasattr(self._embedding_service, "close"):
+            self._embedding_service.close()
@@ -0,0 +1,115 @@
+"""
+Unit tests for chat turn handling and session consistency.
+"""
+
+import fakeredis
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.agents.conversation_state import ConversationIntent, IntentClassificationResult
+from app.agents.session_manager import SessionManager
+from app.chat_endpoints import create_chat_router
+
+
+class FakeAgent:
+    """Conversational agent that asks for clarification, or fails at a given step."""
+    
+    llm = None
+    
+    def __init__(self):
+        # "classify", "respond" or None
+        self.fail = None
+    
+    def classify_intent(self, message, session):
+        if self.fail == "classify":
+            raise RuntimeError("LLM unavailable")
+        return IntentClassificationResult(
+            intent=ConversationIntent.CLARIFICATION_NEEDED,
+            confidence=0.5,
+            context={"current_focus": message},
+            needs_clarification=True,
+            clarifying_questions=["Which role?"]
+        )
+    
+    def handle_clarification(self, intent_result):
+        if self.fail == "respond":
+            raise RuntimeError("LLM unavailable")
+        return "Which role are you hiring for?"
+
+
+@pytest.fixture(scope="module")
+def chat_app():
+    """Chat app on a fake Redis; the chat router is module-global, so build it once."""
+    session_manager = SessionManager(redis_url="redis://localhost:1/0")
+    session_manager.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    session_manager.use_redis = True
+    
+    agent = FakeAgent()
+    app = FastAPI()
+    app.include_router(create_chat_router(session_manager, lambda: agent), prefix="/api/ai")
+    return TestClient(app), session_manager, agent
+
+
+@pytest.fixture
+def chat(chat_app):
+    """Fresh session on the chat app; returns (client, session manager, agent, session id)."""
+    client, session_manager, agent = chat_app
+    agent.fail = None
+    session_id = client.post("/api/ai/chat/start", json={}).json()["session_id"]
+    return client, session_manager, agent, session_id
+
+
+def stored_history(client, session_manager, session_id):
+    """Message contents and context as persisted in Redis, bypassing the cache."""
+    session_manager.invalidate(session_id)
+    history = client.get(f"/api/ai/chat/history/{session_id}").json()
+    return [message["content"] for message in history["messages"]], history["context"]
+
+
+class TestChatTurns:
+    """Tests that failed turns leave no trace in the cached session."""
+    
+    def test_successful_turn_is_persisted(self, chat):
+        """Test that a turn reaches both the cache and Redis."""
+        client, session_manager, _, session_id = chat
+        
+        response = client.post("/api/ai/chat/message", json={"session_id": session_id, "message": "hi"})
+        
+        assert response.status_code == 200
+        cached = session_manager._session_cache[session_id]
+        assert [m.content for m in cached.messages] == ["hi", "Which role are you hiring for?"]
+        assert stored_history(client, session_manager, session_id)[0] == ["hi", "Which role are you hiring for?"]
+    
+    @pytest.mark.parametrize("step", ["classify", "respond"])
+    def test_failed_turn_leaves_cache_unchanged(self, chat, step):
+        """Test that a turn failing mid-way doesn't leave a phantom message or context."""
+        client, session_manager, agent, session_id = chat
+        agent.fail = step
+        
+        response = client.post("/api/ai/chat/message", json={"session_id": session_id, "message": "lost"})
+        assert response.status_code == 500
+        
+        cached = session_manager._session_cache[session_id]
+        assert list(cached.messages) == []
+        assert cached.context.current_focus is None
+        
+        agent.fail = None
+        client.post("/api/ai/chat/message", json={"session_id": session_id, "message": "hi"})
+        history = client.get(f"/api/ai/chat/history/{session_id}").json()
+        assert [m["content"] for m in history["messages"]] == ["hi", "Which role are you hiring for?"]
+    
+    def test_failed_persist_invalidates_cache(self, chat, monkeypatch):
+        """Test that the cache re-reads Redis when a turn couldn't be saved."""
+        client, session_manager, _, session_id = chat
+        
+        async def failing_append(session, messages):
+            return False
+        
+        monkeypatch.setattr(session_manager, "append_messages", failing_append)
+        response = client.post("/api/ai/chat/message", json={"session_id": session_id, "message": "hi"})
+        
+        assert response.status_code == 200
+        assert session_id not in session_manager._session_cache
+        assert stored_history(client, session_manager, session_id)[0] == []
+
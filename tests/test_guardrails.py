@@ -48,6 +48,38 @@ class TestPIIDetector:
         
         assert "555-123-4567" not in redacted
     
+    def test_scan_batch_caches_only_unrestricted_results(self, monkeypatch):
+        """Test that entity-restricted batch results aren't reused by redact()."""
+        from types import SimpleNamespace
+        from app.guardrails import pii_detector
+        
+        class FakeAnalyzer:
+            """Finds every email and phone number, honoring the requested entities."""
+            
+            def analyze(self, text, entities, language):
+                found = [
+                    SimpleNamespace(entity_type=entity, start=m.start(), end=m.end(), score=1.0)
+                    for entity, pattern in (
+                        ("EMAIL_ADDRESS", pii_detector._EMAIL_RE),
+                        ("PHONE_NUMBER", pii_detector._PHONE_RE),
+                    )
+                    for m in pattern.finditer(text)
+                ]
+                return [r for r in found if r.entity_type in entities]
+        
+        detector = PIIDetector()
+        detector.analyzer = FakeAnalyzer()
+        monkeypatch.setattr(pii_detector, "PRESIDIO_AVAILABLE", True)
+        monkeypatch.setattr(pii_detector, "RecognizerResult", SimpleNamespace, raising=False)
+        
+        restricted = "Mail jane@example.com or call 555-123-4567"
+        unrestricted = "Mail john@example.com"
+        detector.scan_batch([restricted, unrestricted], [["EMAIL_ADDRESS"], None])
+        
+        assert detector._recall_results(restricted) is None
+        cached = detector._recall_results(unrestricted)
+        assert [(r.entity_type, r.start, r.end) for r in cached] == [("EMAIL_ADDRESS", 5, 21)]
+    
     def test_redact_dict(self):
         """Test dictionary redaction."""
         data = {
@@ -91,6 +123,29 @@ class TestBiasDetector:
         assert len(findings) > 0
         assert any(f.category == "disability" for f in findings)
     
+    def test_keyword_match_is_case_insensitive(self):
+        """Test keywords match regardless of case and report lowercase keyword."""
+        analysis = {"summary": "Seeking a Recent Graduate who is ENERGETIC"}
+        detector = BiasDetector()
+        findings = detector.scan(analysis)
+        
+        keywords = {f.keyword for f in findings}
+        assert "recent graduate" in keywords
+        assert "energetic" in keywords
+    
+    def test_repeated_keyword_reported_once(self):
+        """Test repeated keywords collapse into one finding with a count."""
+        analysis = {
+            "summary": "He is strong and he knows it",
+            "missing_skills": ["He lacks Kubernetes"]
+        }
+        detector = BiasDetector()
+        findings = detector.scan(analysis)
+        
+        he_findings = [f for f in findings if f.keyword == "he"]
+        assert len(he_findings) == 1
+        assert he_findings[0].occurrences == 3
+    
     def test_no_bias_in_neutral_text(self):
         """Test that neutral text doesn't trigger false positives."""
         analysis = {"summary": "Candidate has strong Python and Django skills"}
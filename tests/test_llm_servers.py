@@ -0,0 +1,125 @@
+"""
+Unit tests for the llama.cpp prompt cache.
+"""
+
+import asyncio
+import json
+
+import httpx
+
+from app.llm_servers import LlamaCppLLM, LlamaCppSlotCache
+
+
+class FakeLlamaServer:
+    """Records llama-server requests and writes saved slot files to cache_dir."""
+    
+    def __init__(self, cache_dir, slots=2):
+        self.cache_dir = cache_dir
+        self.slots = slots
+        self.requests = []
+        # asyncio.Event that async completions wait on, if set
+        self.gate = None
+    
+    def handle(self, request):
+        if request.method == "GET":
+            return httpx.Response(200, json=[{"id": i} for i in range(self.slots)])
+        
+        body = json.loads(request.content)
+        action = request.url.params.get("action")
+        slot_id = int(request.url.path.rsplit("/", 1)[1]) if action else body["id_slot"]
+        self.requests.append((action or "completion", slot_id, body.get("filename")))
+        if action == "save":
+            (self.cache_dir / body["filename"]).write_bytes(b"kv" * 16)
+        if action:
+            return httpx.Response(200, json={})
+        return httpx.Response(200, json={"content": "ok"})
+    
+    async def ahandle(self, request):
+        if self.gate is not None and request.url.path == "/completion":
+            await self.gate.wait()
+        return self.handle(request)
+    
+    def client(self, **kwargs):
+        llm = LlamaCppLLM(**kwargs)
+        llm._client = httpx.Client(base_url=llm.base_url, transport=httpx.MockTransport(self.handle))
+        llm._async_client = httpx.AsyncClient(
+            base_url=llm.base_url, transport=httpx.MockTransport(self.ahandle)
+        )
+        return llm
+
+
+class TestLlamaCppSlotCache:
+    """Tests for per-key KV cache persistence."""
+    
+    def test_slot_count_from_server(self, tmp_path):
+        """Test that the slot count defaults to the server's."""
+        server = FakeLlamaServer(tmp_path, slots=4)
+        cache = LlamaCppSlotCache(server.client(), tmp_path)
+        
+        assert cache._free_slots.qsize() == 4
+    
+    def test_saves_then_reuses_slot(self, tmp_path):
+        """Test that the first call saves and later calls reuse the slot."""
+        server = FakeLlamaServer(tmp_path, slots=1)
+        cache = LlamaCppSlotCache(server.client(), tmp_path).bind(cache_key="jd1")
+        
+        assert cache.invoke("prompt") == "ok"
+        assert cache.invoke("prompt") == "ok"
+        assert server.requests == [
+            ("completion", 0, None), ("save", 0, "jd1.bin"), ("completion", 0, None)
+        ]
+    
+    def test_restores_saved_cache(self, tmp_path):
+        """Test that a new process restores a cache saved by another."""
+        server = FakeLlamaServer(tmp_path, slots=1)
+        asyncio.run(LlamaCppSlotCache(server.client(), tmp_path).ainvoke("p", cache_key="jd1"))
+        server.requests.clear()
+        
+        fresh = LlamaCppSlotCache(server.client(), tmp_path)
+        assert asyncio.run(fresh.ainvoke("p", cache_key="jd1")) == "ok"
+        assert server.requests == [("restore", 0, "jd1.bin"), ("completion", 0, None)]
+    
+    def test_concurrent_requests_use_all_slots(self, tmp_path):
+        """Test that concurrent calls run on distinct slots and save once per key."""
+        server = FakeLlamaServer(tmp_path, slots=2)
+        cache = LlamaCppSlotCache(server.client(), tmp_path)
+        
+        async def run():
+            return await asyncio.gather(*(cache.ainvoke("p", cache_key="jd1") for _ in range(5)))
+        
+        assert asyncio.run(run()) == ["ok"] * 5
+        saves = [r for r in server.requests if r[0] == "save"]
+        assert len(saves) == 1
+        assert cache._free_slots.qsize() == 2
+    
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that old cache files are deleted once over the size budget."""
+        server = FakeLlamaServer(tmp_path, slots=1)
+        cache = LlamaCppSlotCache(server.client(), tmp_path, max_bytes=40)
+        
+        for key in ("jd1", "jd2", "jd3"):
+            cache.invoke("p", cache_key=key)
+        
+        assert [f.name for f in tmp_path.iterdir()] == ["jd3.bin"]
+    
+    def test_cancelled_waiter_does_not_leak_slot(self, tmp_path):
+        """Test that cancelling a call waiting for a slot leaves the slot pool intact."""
+        server = FakeLlamaServer(tmp_path, slots=1)
+        cache = LlamaCppSlotCache(server.client(), tmp_path)
+        
+        async def run():
+            server.gate = asyncio.Event()
+            holder = asyncio.create_task(cache.ainvoke("p", cache_key="jd1"))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.create_task(cache.ainvoke("p", cache_key="jd1"))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            server.gate.set()
+            await holder
+            
+            assert cache._free_slots.qsize() == 1
+            return await asyncio.wait_for(cache.ainvoke("p", cache_key="jd1"), timeout=1)
+        
+        assert asyncio.run(run()) == "ok"
+        assert cache._free_slots.qsize() == 1
+        assert not cache._waiters
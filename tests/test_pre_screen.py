@@ -0,0 +1,93 @@
+"""
+Unit tests for the keyword pre-screen.
+"""
+
+from app.pre_screen import PreScreener, extract_skills
+
+JOB_DESCRIPTION = (
+    "We are hiring a backend engineer to build payment services. "
+    "Requirements: Python, Django, PostgreSQL, Redis, Docker, Kubernetes, "
+    "AWS, Kafka, Terraform and Celery."
+)
+
+UNRELATED_RESUME = (
+    "Pastry chef with eight years in hotel kitchens. Created seasonal dessert "
+    "menus, trained apprentices and managed ingredient ordering."
+)
+
+
+class TestExtractSkills:
+    """Tests for skill matching boundaries and aliases."""
+    
+    def test_java_vs_javascript(self):
+        """Test that Java and JavaScript are told apart."""
+        assert extract_skills("JavaScript developer") == ["javascript"]
+        assert extract_skills("Java and JavaScript") == ["java", "javascript"]
+    
+    def test_c_family(self):
+        """Test C++ and C# matching."""
+        assert extract_skills("C++ and C# (10 years)") == ["c++", "c#"]
+    
+    def test_dotnet(self):
+        """Test that .NET matches but a bare "net" doesn't."""
+        assert extract_skills("Built .NET services") == [".net"]
+        assert extract_skills("net revenue grew") == []
+        assert extract_skills("ASP.NET MVC") == [".net"]
+    
+    def test_postgres_aliases(self):
+        """Test that Postgres and PostgreSQL are one skill."""
+        assert extract_skills("Postgres") == ["postgresql"]
+        assert extract_skills("PostgreSQL, postgres") == ["postgresql"]
+    
+    def test_node_aliases(self):
+        """Test that node.js spellings are one skill."""
+        assert extract_skills("NodeJS") == ["node.js"]
+        assert extract_skills("Node.js and nodejs") == ["node.js"]
+    
+    def test_trailing_punctuation(self):
+        """Test skills at the end of a sentence."""
+        assert extract_skills("Strong in Python.") == ["python"]
+    
+    def test_order_of_first_mention(self):
+        """Test that skills are deduplicated in order of first mention."""
+        assert extract_skills("Docker, AWS, docker, Python") == ["docker", "aws", "python"]
+
+
+class TestPreScreener:
+    """Tests for local rejection of obvious mismatches."""
+    
+    def test_rejects_obvious_mismatch(self):
+        """Test that an unrelated resume is rejected locally."""
+        response = PreScreener().screen(JOB_DESCRIPTION, UNRELATED_RESUME)
+        
+        assert response is not None
+        assert response.match_score <= 10
+        assert response.missing_skills == extract_skills(JOB_DESCRIPTION)
+        assert len(response.interview_questions) == 3
+    
+    def test_too_few_required_skills(self):
+        """Test that job descriptions with fewer than MIN_REQUIRED_SKILLS skills go to the LLM."""
+        job_description = "Backend engineer with Python and Django experience."
+        
+        assert len(extract_skills(job_description)) < PreScreener.MIN_REQUIRED_SKILLS
+        assert PreScreener().screen(job_description, UNRELATED_RESUME) is None
+    
+    def test_coverage_threshold(self):
+        """Test that the resume must mention at most max_coverage of the skills."""
+        # 1 of 10 skills: coverage 0.1, not above the default threshold
+        one_skill = UNRELATED_RESUME + " Automated bakery orders with Python."
+        assert PreScreener().screen(JOB_DESCRIPTION, one_skill) is not None
+        
+        # 2 of 10 skills: coverage 0.2
+        two_skills = one_skill + " Hosted it on AWS."
+        assert PreScreener().screen(JOB_DESCRIPTION, two_skills) is None
+        assert PreScreener(max_coverage=0.2).screen(JOB_DESCRIPTION, two_skills) is not None
+    
+    def test_similarity_threshold(self):
+        """Test that a resume sharing the job's vocabulary goes to the LLM."""
+        resume = (
+            "Backend engineer who spent five years building payment services "
+            "for a fintech startup, hiring and mentoring engineers."
+        )
+        assert PreScreener().screen(JOB_DESCRIPTION, resume) is None
+        assert PreScreener(max_similarity=1.0).screen(JOB_DESCRIPTION, resume) is not None
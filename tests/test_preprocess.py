@@ -0,0 +1,94 @@
+"""
+Unit tests for screening input pre-processing.
+"""
+
+from app.preprocess import clean, shrink
+
+
+class WordEncoder:
+    """Whitespace tokenizer standing in for a tiktoken encoding."""
+    
+    def encode(self, text, disallowed_special=()):
+        return text.split(' ')
+    
+    def decode(self, tokens):
+        return ' '.join(tokens)
+
+
+class TestClean:
+    """Tests for boilerplate removal."""
+    
+    def test_removes_urls_and_emails(self):
+        """Test URL and email removal."""
+        text = "Jane Doe jane@example.com https://github.com/jane\nPython developer"
+        cleaned = clean(text)
+        
+        assert "jane@example.com" not in cleaned
+        assert "github.com" not in cleaned
+        assert cleaned == "Jane Doe\nPython developer"
+    
+    def test_removes_page_markers_and_references(self):
+        """Test page number and references line removal."""
+        text = "Acme Corp\nPage 1 of 2\nPython\n2 of 3\nReferences available upon request."
+        
+        assert clean(text) == "Acme Corp\nPython"
+    
+    def test_keeps_dates(self):
+        """Test that date-only lines are not mistaken for page numbers."""
+        text = "Acme\n03/2019\nPython\n2019/2021\n- 2021 -"
+        
+        assert clean(text) == text
+    
+    def test_no_fake_paragraph_breaks(self):
+        """Test that removed lines don't leave blank lines behind."""
+        assert clean("Acme\nPage 2\nPython") == "Acme\nPython"
+        assert clean("Jane\njane@example.com\nExperience") == "Jane\nExperience"
+    
+    def test_collapses_whitespace(self):
+        """Test whitespace normalization keeps paragraph breaks."""
+        text = "Skills:   Python\t Django\n\n\n\nEducation"
+        
+        assert clean(text) == "Skills: Python Django\n\nEducation"
+
+
+class TestShrink:
+    """Tests for fitting text into a token budget."""
+    
+    def test_under_budget_unchanged(self):
+        """Test that short text is only cleaned."""
+        assert shrink("Python  developer", 100, WordEncoder()) == "Python developer"
+    
+    def test_hard_truncation_without_query(self):
+        """Test truncation to the budget without a query."""
+        text = " ".join(f"word{i}" for i in range(50))
+        
+        assert shrink(text, 10, WordEncoder()) == " ".join(f"word{i}" for i in range(10))
+    
+    def test_keeps_relevant_sections(self):
+        """Test that sections relevant to the query are preferred."""
+        text = (
+            "Hobbies: chess hiking baking painting knitting\n\n"
+            "Experience: Python Django AWS backend services\n\n"
+            "Interests: gardening travel photography music film"
+        )
+        shrunk = shrink(text, 12, WordEncoder(), query="Python Django AWS engineer")
+        
+        assert "Experience: Python Django AWS" in shrunk
+    
+    def test_long_relevant_section_is_truncated_not_dropped(self):
+        """Test that an over-budget top section is cut to fit rather than dropped."""
+        experience = "Experience: " + " ".join(["Python Django AWS services"] * 200)
+        text = f"Jane Doe\n\nHobbies: chess, hiking\n\n{experience}\n\nEducation: BSc"
+        shrunk = shrink(text, 100, WordEncoder(), query="Python Django AWS backend engineer")
+        
+        assert "Python Django AWS" in shrunk
+        assert len(WordEncoder().encode(shrunk)) <= 100
+        assert len(WordEncoder().encode(shrunk)) >= 50
+    
+    def test_without_encoder(self):
+        """Test the character-based estimate when no encoder is available."""
+        text = "Experience: " + "Python Django AWS " * 500
+        shrunk = shrink(text, 100, query="Python Django")
+        
+        assert 0 < len(shrunk) <= 400
+        assert shrunk.startswith("Experience: Python")
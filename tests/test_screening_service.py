@@ -0,0 +1,272 @@
+"""
+Unit tests for the screening service's streaming, caching and batching.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.cache import ResponseCache
+from app.prompts import BATCH_RESUME_SCREENING_PROMPT
+from app.semantic_cache import SemanticCache
+from app.screening_service import ResumeScreeningService, _JSONObjectScanner
+
+# No server listens here, so caches fall back to in-process storage
+UNREACHABLE_REDIS = "redis://localhost:1/0"
+
+SCREENING_ITEM = {
+    "match_score": 70,
+    "summary": "Good fit for the role. Solid Python background.",
+    "missing_skills": ["Go"],
+    "interview_questions": [
+        {
+            "question": question,
+            "category": "technical",
+            "difficulty": "medium",
+            "expected_answer_points": ["Concrete example", "Trade-offs considered"],
+        }
+        for question in (
+            "Describe a Python service you designed end to end.",
+            "How do you approach testing asynchronous code?",
+            "What would you change in your last project's architecture?",
+        )
+    ],
+}
+
+
+def scan(*chunks):
+    """Feed chunks to a new scanner, returning the first completed object."""
+    scanner = _JSONObjectScanner()
+    for chunk in chunks:
+        result = scanner.feed(chunk)
+        if result is not None:
+            return result
+    return None
+
+
+class TestJSONObjectScanner:
+    """Tests for cutting a streamed response at the end of its JSON object."""
+    
+    def test_single_chunk(self):
+        """Test an object that arrives in one chunk."""
+        assert scan('{"a": 1}\n\n   ') == '{"a": 1}'
+    
+    def test_split_chunks(self):
+        """Test an object streamed one character at a time."""
+        text = '{"a": {"b": [1, 2]}, "c": "d"}'
+        assert scan(*text) == text
+    
+    def test_braces_inside_strings(self):
+        """Test that braces inside strings don't change the depth."""
+        text = '{"summary": "uses {templates} and }", "x": 1}'
+        assert scan(text + " trailing") == text
+    
+    def test_escaped_quotes(self):
+        """Test that escaped quotes don't end a string."""
+        text = r'{"summary": "said \"}\" twice \\", "x": "{"}'
+        assert scan(text[:12], text[12:25], text[25:]) == text
+    
+    def test_markdown_fence(self):
+        """Test an object wrapped in a markdown code fence."""
+        assert scan('```json\n{"a": 1}\n```') == '{"a": 1}'
+    
+    def test_prose_before_object(self):
+        """Test that braces in leading prose are skipped."""
+        assert scan('Here is the {JSON}: {"a": 1}') == '{"a": 1}'
+        assert scan('Here is the {JSON', '}: {"a"', ': "{x}"}') == '{"a": "{x}"}'
+    
+    def test_incomplete_object(self):
+        """Test that an unclosed object returns None."""
+        scanner = _JSONObjectScanner()
+        assert scanner.feed('{"a": {"b": 1}') is None
+        assert scanner.text == '{"a": {"b": 1}'
+
+
+class TestResponseCache:
+    """Tests for the in-memory fallback of the response cache."""
+    
+    def test_get_set(self):
+        """Test storing and reading back a value."""
+        cache = ResponseCache(redis_url=UNREACHABLE_REDIS)
+        
+        async def run():
+            assert await cache.get("k") is None
+            await cache.set("k", "v")
+            return await cache.get("k")
+        
+        assert cache.redis_client is None
+        assert asyncio.run(run()) == "v"
+    
+    def test_local_maxsize(self):
+        """Test that the fallback cache is bounded."""
+        cache = ResponseCache(redis_url=UNREACHABLE_REDIS, local_maxsize=2)
+        
+        async def run():
+            for key in ("a", "b", "c"):
+                await cache.set(key, key)
+            return [await cache.get(key) for key in ("a", "b", "c")]
+        
+        assert asyncio.run(run()) == [None, "b", "c"]
+
+
+class FakeEmbeddingService:
+    """Embeds texts as bag-of-words counts over a fixed vocabulary."""
+    
+    VOCABULARY = ("python", "django", "java", "spring", "senior", "junior", "aws")
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def generate_batch_embeddings(self, texts):
+        self.calls += 1
+        return [
+            [float(text.split().count(word)) + 0.01 for word in self.VOCABULARY]
+            for text in texts
+        ]
+
+
+class TestSemanticCache:
+    """Tests for similarity-based response reuse."""
+    
+    def test_hit_for_near_duplicate(self):
+        """Test that whitespace and case variants hit."""
+        cache = SemanticCache(embedding_service=FakeEmbeddingService())
+        
+        response, query = cache.lookup("Senior Python", "python django aws")
+        assert response is None
+        cache.add(query, "cached")
+        
+        response, _ = cache.lookup("senior   python", "Python\nDjango  AWS")
+        assert response == "cached"
+    
+    def test_miss_when_either_field_differs(self):
+        """Test that both the job description and the resume must match."""
+        cache = SemanticCache(embedding_service=FakeEmbeddingService())
+        _, query = cache.lookup("senior python", "python django aws")
+        cache.add(query, "cached")
+        
+        assert cache.lookup("senior python", "java spring")[0] is None
+        assert cache.lookup("junior java", "python django aws")[0] is None
+    
+    def test_ring_buffer_overwrites_oldest(self):
+        """Test that the oldest entry is replaced once full."""
+        cache = SemanticCache(embedding_service=FakeEmbeddingService(), max_entries=2)
+        for resume in ("python", "java", "aws"):
+            _, query = cache.lookup("senior", resume)
+            cache.add(query, resume)
+        
+        assert cache.lookup("senior", "python")[0] is None
+        assert cache.lookup("senior", "aws")[0] == "aws"
+    
+    def test_disabled_after_embedding_failure(self):
+        """Test that a failing embedding service is not retried."""
+        class FailingService(FakeEmbeddingService):
+            def generate_batch_embeddings(self, texts):
+                self.calls += 1
+                raise RuntimeError("model not available")
+        
+        service = FailingService()
+        cache = SemanticCache(embedding_service=service)
+        
+        assert cache.lookup("a", "b") == (None, None)
+        assert cache.lookup("a", "b") == (None, None)
+        assert service.calls == 1
+
+
+@pytest.fixture
+def llamacpp_service(monkeypatch):
+    """Screening service on a mocked llama-server; returns (service, request bodies)."""
+    monkeypatch.setenv("LLM_PROVIDER", "llamacpp")
+    monkeypatch.setenv("REDIS_URL", UNREACHABLE_REDIS)
+    monkeypatch.delenv("LLM_CACHE_DIR", raising=False)
+    monkeypatch.delenv("PRE_SCREEN_ENABLED", raising=False)
+    monkeypatch.delenv("SEMANTIC_CACHE_ENABLED", raising=False)
+    
+    service = ResumeScreeningService()
+    requests = []
+    
+    def handler(request):
+        body = json.loads(request.content)
+        requests.append(body)
+        if "results" in json.dumps(body.get("json_schema", {})):
+            count = body["prompt"].count("## Resume ")
+            results = [dict(SCREENING_ITEM, match_score=10 * k) for k in range(1, count + 1)]
+            if "short batch" in body["prompt"]:
+                results = results[:1]
+            if "invalid item" in body["prompt"]:
+                results[1] = {"match_score": "high", "summary": None}
+            return httpx.Response(200, json={"content": json.dumps({"results": results})})
+        return httpx.Response(200, json={"content": json.dumps(SCREENING_ITEM)})
+    
+    service.llm._async_client = httpx.AsyncClient(
+        base_url=service.llm.base_url, transport=httpx.MockTransport(handler)
+    )
+    return service, requests
+
+
+class TestBatchScreening:
+    """Tests for chunking and batch analysis."""
+    
+    def test_chunk_respects_max_resumes(self, llamacpp_service):
+        """Test that chunks hold at most BATCH_MAX_RESUMES resumes."""
+        service, _ = llamacpp_service
+        service.BATCH_MAX_RESUMES = 3
+        resumes = [f"resume {k}" for k in range(7)]
+        
+        chunks = service._chunk_resumes("Python developer", resumes)
+        
+        assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+        assert sum(chunks, []) == resumes
+    
+    def test_chunk_respects_token_budget(self, llamacpp_service):
+        """Test that long resumes are split across chunks by token budget."""
+        service, _ = llamacpp_service
+        # Room for two resumes at RESUME_MAX_TOKENS plus their output, not three
+        per_resume = service.RESUME_MAX_TOKENS + service.BATCH_OUTPUT_TOKENS_PER_RESUME
+        service.BATCH_MAX_TOKENS = (
+            service._count_tokens(BATCH_RESUME_SCREENING_PROMPT)
+            + service._count_tokens("Python developer")
+            + 2 * per_resume + per_resume // 2
+        )
+        long_resume = "python " * 20000
+        
+        chunks = service._chunk_resumes("Python developer", [long_resume] * 4)
+        
+        assert [len(chunk) for chunk in chunks] == [2, 2]
+    
+    def test_duplicates_screened_once(self, llamacpp_service):
+        """Test that identical resumes share one result and later calls hit the cache."""
+        service, requests = llamacpp_service
+        resumes = ["resume one python", "resume two python", "resume one python"]
+        
+        results = asyncio.run(service.analyze_batch("Python developer", resumes))
+        
+        assert len(requests) == 1
+        assert requests[0]["prompt"].count("## Resume ") == 2
+        assert [r.match_score for r in results] == [10, 20, 10]
+        
+        asyncio.run(service.analyze_batch("Python developer", resumes))
+        assert len(requests) == 1
+    
+    def test_falls_back_to_single_calls(self, llamacpp_service):
+        """Test per-resume screening when the batch result count is wrong."""
+        service, requests = llamacpp_service
+        resumes = ["short batch one", "short batch two"]
+        
+        results = asyncio.run(service.analyze_batch("Python developer", resumes))
+        
+        assert len(requests) == 3
+        assert [r.match_score for r in results] == [70, 70]
+    
+    def test_invalid_item_rescreened_alone(self, llamacpp_service):
+        """Test that one invalid batch result doesn't discard the others."""
+        service, requests = llamacpp_service
+        resumes = ["invalid item one", "invalid item two", "invalid item three"]
+        
+        results = asyncio.run(service.analyze_batch("Python developer", resumes))
+        
+        assert len(requests) == 2
+        assert "invalid item two" in requests[1]["prompt"]
+        assert [r.match_score for r in results] == [10, 70, 30]